@@ -0,0 +1,98 @@
+#! /usr/bin/env python
+
+"""Compare the client-side time spent getting, popping and constructing jobs
+with each of the installed JSON codecs. Jobs are given long histories, since
+that's where decoding dominates."""
+
+import argparse
+import time
+import uuid
+from typing import Any, Callable
+
+import reqless
+from reqless.codec import CODECS, JSONCodec, get_codec
+
+
+parser = argparse.ArgumentParser(
+    description="Benchmark reqless job decoding with each installed JSON codec."
+)
+parser.add_argument(
+    "--host",
+    dest="host",
+    default="redis://localhost:6379",
+    help="The redis:// url to connect to",
+)
+parser.add_argument(
+    "--jobs",
+    dest="numJobs",
+    default=200,
+    type=int,
+    help="How many jobs to use in each mode",
+)
+parser.add_argument(
+    "--history",
+    dest="history",
+    default=100,
+    type=int,
+    help="How many times to move each job between queues to grow its history",
+)
+parser.add_argument(
+    "--no-flush",
+    dest="flush",
+    default=True,
+    action="store_false",
+    help="Don't flush the remote data structure server after running",
+)
+args = parser.parse_args()
+
+
+def timed(label: str, calls: int, function: Callable[[], Any]) -> None:
+    started = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - started
+    print("  %-16s %8.2f usec/call" % (label, elapsed * 1000000 / max(calls, 1)))
+
+
+def run(codec: JSONCodec) -> None:
+    """Get, construct and pop jobs with long histories using a codec"""
+    print("%s:" % codec.name)
+    client = reqless.Client(args.host, hostname="codec-bench", codec=codec)
+    queue = client.queues["codec-bench-" + uuid.uuid4().hex]
+    client.config["max-job-history"] = args.history
+    jids = [queue.put("reqless.Job", "{}") for _ in range(args.numJobs)]
+    for _ in range(args.history):
+        for jid in jids:
+            client(
+                "queue.put", client.worker_name, queue.name, jid, "reqless.Job", "{}", 0
+            )
+
+    timed("Jobs.get", len(jids), lambda: [client.jobs[jid] for jid in jids])
+
+    raw = [client("job.get", jid) for jid in jids] * 10
+    # Once to warm up, and once to measure
+    for _ in range(2):
+        started = time.perf_counter()
+        for data in raw:
+            reqless.Job(client, **codec.loads(data))
+        elapsed = time.perf_counter() - started
+    print("  %-16s %8.2f usec/call" % ("Job.__init__", elapsed * 1000000 / len(raw)))
+
+    timed("Queue.pop", len(jids), lambda: [queue.pop() for _ in jids])
+
+
+setup = reqless.Client(args.host, hostname="codec-bench")
+if len(setup.database.keys("*")):
+    print("Must begin with empty data structure server")
+    exit(1)
+
+try:
+    for name in CODECS:
+        try:
+            codec = get_codec(name)
+        except ImportError:
+            print("%s: not installed" % name)
+            continue
+        run(codec)
+finally:
+    if args.flush:
+        setup.database.flushdb()
@@ -0,0 +1,88 @@
+#! /usr/bin/env python
+
+"""Compare the server CPU spent per reqless command when it's run with EVALSHA
+against when it's run as a function with FCALL. Both are measured with the
+server's own per-command statistics."""
+
+import argparse
+import time
+import uuid
+from typing import Dict
+
+import reqless
+
+
+parser = argparse.ArgumentParser(
+    description="Benchmark per-command server CPU for EVALSHA and FCALL."
+)
+parser.add_argument(
+    "--host",
+    dest="host",
+    default="redis://localhost:6379",
+    help="The redis:// url to connect to",
+)
+parser.add_argument(
+    "--jobs",
+    dest="numJobs",
+    default=1000,
+    type=int,
+    help="How many jobs to put, pop, heartbeat and complete in each mode",
+)
+parser.add_argument(
+    "--no-flush",
+    dest="flush",
+    default=True,
+    action="store_false",
+    help="Don't flush the remote data structure server after running",
+)
+args = parser.parse_args()
+
+
+def command_stats(client: reqless.Client, command: str) -> Dict[str, float]:
+    """The server's statistics for a command"""
+    stats: Dict[str, float] = client.database.info("commandstats").get(
+        "cmdstat_" + command, {"calls": 0, "usec": 0}
+    )
+    return stats
+
+
+def run(client: reqless.Client, command: str) -> None:
+    """Put, pop, heartbeat and complete jobs, and report the server CPU spent"""
+    queue = client.queues["functions-bench-" + uuid.uuid4().hex]
+    client.database.config_resetstat()
+    started = time.time()
+    for _ in range(args.numJobs):
+        queue.put("reqless.Job", "{}")
+    for _ in range(args.numJobs):
+        job = queue.pop()
+        assert job is not None and not isinstance(job, list)
+        job.heartbeat()
+        job.complete()
+    elapsed = time.time() - started
+    stats = command_stats(client, command)
+    print(
+        "%7s: %6i calls, %8.2f usec/call on the server, %8.2f usec/call overall"
+        % (
+            command.upper(),
+            stats["calls"],
+            stats["usec"] / max(stats["calls"], 1),
+            elapsed * 1000000 / max(stats["calls"], 1),
+        )
+    )
+
+
+evalsha = reqless.Client(args.host, hostname="functions-bench")
+if len(evalsha.database.keys("*")):
+    print("Must begin with empty data structure server")
+    exit(1)
+
+try:
+    run(evalsha, "evalsha")
+    fcall = reqless.Client(args.host, hostname="functions-bench", use_functions=True)
+    if not fcall.uses_functions:
+        print("  FCALL: not supported by this server")
+    else:
+        run(fcall, "fcall")
+finally:
+    if args.flush:
+        evalsha.database.flushdb()
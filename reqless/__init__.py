@@ -1,14 +1,16 @@
 """Main reqless business"""
 
-import json
 import pkgutil
 import socket
 import time
-from typing import Any, Callable, Dict, List, Optional, Type, Union
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type, Union
 
 import decorator
 from redis import Redis, ResponseError
+from redis.client import Pipeline
 from redis.commands.core import Script
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
 
 from reqless.abstract import (
     AbstractClient,
@@ -21,14 +23,19 @@ from reqless.abstract import (
     AbstractThrottles,
     AbstractWorkers,
 )
-from reqless.config import Config
+from reqless.batch import Batch, Command
+from reqless.codec import JSONCodec, get_codec
+from reqless.config import CachedConfig, Config
 from reqless.events import Events
 from reqless.exceptions import ReqlessError
-from reqless.job import Job, RecurringJob
+from reqless.functions import build_library, prune_libraries
+from reqless.job import Job, RecurringJob, encode_fields
 from reqless.logger import logger
 from reqless.queue import Queue
 from reqless.queue_patterns import QueuePatterns
+from reqless.replicas import READ_ONLY_COMMANDS, Replicas
 from reqless.throttle import Throttle
+from reqless.tracking import CACHEABLE_COMMANDS, INVALIDATING_COMMANDS, TrackingCache
 
 
 def retry(*excepts: Type[Exception]) -> Callable:
@@ -55,18 +62,18 @@ class Jobs(AbstractJobs):
     def complete(self, offset: int = 0, count: int = 25) -> List[str]:
         """Return the paginated jids of complete jobs"""
         response_json = self.client("jobs.completed", offset, count)
-        response: List[str] = json.loads(response_json)
+        response: List[str] = self.client.codec.loads(response_json)
         return response
 
     def tracked(self) -> Dict[str, List[Any]]:
         """Return an array of job objects that are being tracked"""
-        results: Dict[str, Any] = json.loads(self.client("jobs.tracked"))
+        results: Dict[str, Any] = self.client.codec.loads(self.client("jobs.tracked"))
         results["jobs"] = [Job(self.client, **job) for job in results["jobs"]]
         return results
 
     def tagged(self, tag: str, offset: int = 0, count: int = 25) -> Dict[str, Any]:
         """Return the paginated jids of jobs tagged with a tag"""
-        response: Dict[str, Any] = json.loads(
+        response: Dict[str, Any] = self.client.codec.loads(
             self.client("jobs.tagged", tag, offset, count)
         )
         return response
@@ -82,20 +89,41 @@ class Jobs(AbstractJobs):
         paginated job objects affected by that kind of failure."""
         results: Dict[str, Any]
         if not group:
-            results = json.loads(self.client("failureGroups.counts"))
+            results = self.client.codec.loads(self.client("failureGroups.counts"))
         else:
-            results = json.loads(self.client("jobs.failedByGroup", group, start, limit))
+            results = self.client.codec.loads(
+                self.client("jobs.failedByGroup", group, start, limit)
+            )
             results["jobs"] = self.get(*results["jobs"])
         return results
 
-    def get(self, *jids: str) -> List[AbstractJob]:
-        """Return jobs objects for all the jids"""
-        if jids:
-            return [
-                Job(self.client, **j)
-                for j in json.loads(self.client("job.getMulti", *jids))
-            ]
-        return []
+    def get(
+        self, *jids: str, fields: Optional[Iterable[str]] = None, lite: bool = False
+    ) -> List[AbstractJob]:
+        """Return jobs objects for all the jids. See `Queue.pop` for `fields`
+        and `lite`."""
+        if not jids:
+            return []
+        if fields is None and not lite:
+            response = self.client("job.getMulti", *jids)
+        else:
+            response = self.client(
+                "job.getMultiFields",
+                encode_fields(self.client.codec, fields, lite),
+                *jids,
+            )
+        return [Job(self.client, **j) for j in self.client.codec.loads(response)]
+
+    def heartbeat(self, *jids: str) -> Dict[str, float]:
+        """Renew this client's locks on all the jids in a single call,
+        returning the new expiration of each job whose lock was renewed. Jobs
+        whose locks have been lost are left out."""
+        if not jids:
+            return {}
+        response: Dict[str, float] = self.client.codec.loads(
+            self.client("jobs.heartbeat", self.client.worker_name, *jids)
+        )
+        return response
 
     def __getitem__(self, jid: str) -> Optional[Union[Job, RecurringJob]]:
         """Get a job object corresponding to that jid, or ``None`` if it
@@ -105,8 +133,8 @@ class Jobs(AbstractJobs):
             results = self.client("recurringJob.get", jid)
             if not results:
                 return None
-            return RecurringJob(self.client, **json.loads(results))
-        return Job(self.client, **json.loads(results))
+            return RecurringJob(self.client, **self.client.codec.loads(results))
+        return Job(self.client, **self.client.codec.loads(results))
 
 
 class Workers(AbstractWorkers):
@@ -117,16 +145,28 @@ class Workers(AbstractWorkers):
 
     @property
     def counts(self) -> Dict[str, Any]:
-        counts: Dict[str, Any] = json.loads(self.client("workers.counts"))
+        counts: Dict[str, Any] = self.client.codec.loads(self.client("workers.counts"))
         return counts
 
     def __getitem__(self, worker_name: str) -> Dict[str, Any]:
         """Which jobs does a particular worker have running"""
-        result: Dict[str, Any] = json.loads(self.client("worker.jobs", worker_name))
+        result: Dict[str, Any] = self.client.codec.loads(
+            self.client("worker.jobs", worker_name)
+        )
         result["jobs"] = result["jobs"] or []
         result["stalled"] = result["stalled"] or []
         return result
 
+    def lease(self, worker_name: str, ttl: float) -> None:
+        """Renew a worker's liveness lease for another `ttl` seconds. Once a
+        worker with a lease lets it run out, the maintainer treats the locks
+        on all of its jobs as expired, and `counts` reports it as not alive."""
+        self.client("worker.lease", worker_name, ttl)
+
+    def unlease(self, worker_name: str) -> None:
+        """Give up a worker's liveness lease, as when it shuts down cleanly"""
+        self.client("worker.unlease", worker_name)
+
 
 class Queues(AbstractQueues):
     """Class for accessing queues lazily"""
@@ -136,13 +176,80 @@ class Queues(AbstractQueues):
 
     @property
     def counts(self) -> Dict:
-        counts: Dict = json.loads(self.client("queues.counts"))
+        counts: Dict = self.client.codec.loads(self.client("queues.counts"))
         return counts
 
+    def counts_page(
+        self, cursor: int = 0, count: int = 500
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """The counts of up to `count` queues starting at `cursor`, and the
+        cursor to pass to get the next page, which is 0 after the last one.
+        Each call only looks at the queues on its page."""
+        page: Dict[str, Any] = self.client.codec.loads(
+            self.client("queues.countsPage", cursor, count)
+        )
+        # An empty list is encoded as an empty object
+        return int(page["cursor"]), page["counts"] or []
+
+    @property
+    def names(self) -> List[str]:
+        """The names of all known queues. This is much cheaper than `counts`
+        when only the names are needed."""
+        names: List[str] = self.client.codec.loads(self.client("queues.names"))
+        return names
+
+    @property
+    def version(self) -> int:
+        """A number that changes whenever a queue is added or forgotten, so
+        that resolved queue names can be reused until it does"""
+        return int(self.client("queues.version"))
+
     def __getitem__(self, queue_name: str) -> AbstractQueue:
         """Get a queue object associated with the provided queue name"""
         return Queue(queue_name, self.client, self.client.worker_name)
 
+    def next_due(self, *queue_names: str) -> Optional[float]:
+        """When a job in any of the queues will next become available on its
+        own (a scheduled job comes due, a recurring job spawns or a lock
+        expires), or None if none will"""
+        if not queue_names:
+            return None
+        due = self.client("queues.nextDue", *queue_names)
+        return None if due is None else float(due)
+
+    def wake_on_put(self, ttl: float, *queue_names: str) -> None:
+        """Publish to `ql:available:<queue>` when jobs are put in any of the
+        queues, for the next `ttl` seconds"""
+        if queue_names:
+            self.client("queues.wakeOnPut", ttl, *queue_names)
+
+    def pop(
+        self,
+        queue_names: Iterable[str],
+        count: int = 1,
+        fields: Optional[Iterable[str]] = None,
+        lite: bool = False,
+    ) -> List[AbstractJob]:
+        """Pop up to `count` jobs from the queues in a single call. Queues are
+        popped from in order, and later queues only when the earlier ones
+        don't have enough jobs. Each job's `queue_name` is where it came from.
+        See `Queue.pop` for `fields` and `lite`."""
+        names = list(queue_names)
+        if not names:
+            return []
+        return [
+            Job(self.client, **job)
+            for job in self.client.codec.loads(
+                self.client(
+                    "queues.pop",
+                    self.client.worker_name,
+                    count,
+                    encode_fields(self.client.codec, fields, lite),
+                    *names,
+                )
+            )
+        ]
+
 
 class Throttles(AbstractThrottles):
     def __init__(self, client: AbstractClient):
@@ -162,19 +269,50 @@ class Client(AbstractClient):
         self,
         url: str = "redis://localhost:6379",
         hostname: Optional[str] = None,
+        use_functions: bool = False,
+        replicas: Optional[List[str]] = None,
+        codec: Union[str, JSONCodec, None] = None,
+        config_ttl: Optional[float] = None,
+        cache_size: Optional[int] = None,
         **kwargs: Any,
     ):
         # This is our unique identifier as a worker
         self._worker_name: str = hostname or socket.gethostname()
+        # How the JSON exchanged with the Lua script is encoded and decoded
+        self._codec: JSONCodec = (
+            codec if isinstance(codec, JSONCodec) else get_codec(codec)
+        )
         kwargs["decode_responses"] = True
+        # How we connect, so that other clients can connect the same way
+        self._url: str = url
+        self._connection_kwargs: Dict[str, Any] = dict(kwargs)
+        self._options: Dict[str, Any] = {
+            "use_functions": use_functions,
+            "replicas": replicas,
+            "codec": self._codec,
+            "config_ttl": config_ttl,
+            "cache_size": cache_size,
+        }
         # This is just the data structure server instance we're connected to
         # conceivably someone might want to work with multiple instances
         # simultaneously.
         self._database: Redis = Redis.from_url(url, **kwargs)
+        # With a size, slowly-changing reads are cached until the server says
+        # they've changed
+        self._cache: Optional[TrackingCache] = (
+            None
+            if cache_size is None
+            else TrackingCache(self._database, self._codec, cache_size)
+        )
+        # Replicas that read-only commands are spread across
+        self._replicas: Replicas = Replicas(replicas or [], **kwargs)
         self._jobs: AbstractJobs = Jobs(self)
         self._queues: AbstractQueues = Queues(self)
         self._throttles: AbstractThrottles = Throttles(self)
-        self._config: AbstractConfig = Config(self)
+        # With a ttl, the config is cached locally until it changes
+        self._config: AbstractConfig = (
+            Config(self) if config_ttl is None else CachedConfig(self, config_ttl)
+        )
         self._workers: AbstractWorkers = Workers(self)
         self._events: Optional[Events] = None
         self._queue_patterns: AbstractQueuePatterns = QueuePatterns(self)
@@ -184,6 +322,22 @@ class Client(AbstractClient):
         if data is None:
             raise RuntimeError("Failed to load reqless lua!")
         self._lua: Script = self.database.register_script(data)
+        # When the server supports it, the script can instead be loaded once
+        # as a function library, so that calls skip re-running its setup
+        self._library: Optional[Tuple[str, str]] = None
+        self._function: Optional[str] = None
+        if use_functions:
+            self._library = build_library(data)
+            self._load_library()
+
+    @property
+    def cache(self) -> Optional[TrackingCache]:
+        """The client-side cache of slowly-changing reads, if enabled"""
+        return self._cache
+
+    @property
+    def codec(self) -> JSONCodec:
+        return self._codec
 
     @property
     def config(self) -> AbstractConfig:
@@ -205,6 +359,24 @@ class Client(AbstractClient):
     def database(self) -> Redis:
         return self._database
 
+    @property
+    def url(self) -> str:
+        """The URL this client connected to"""
+        return self._url
+
+    @property
+    def connection_kwargs(self) -> Dict[str, Any]:
+        """The connection options this client was made with, besides its URL"""
+        return dict(self._connection_kwargs)
+
+    def with_worker_name(self, worker_name: str) -> "Client":
+        return Client(
+            self._url,
+            hostname=worker_name,
+            **self._options,
+            **self._connection_kwargs,
+        )
+
     @property
     def throttles(self) -> AbstractThrottles:
         return self._throttles
@@ -227,14 +399,143 @@ class Client(AbstractClient):
             self._events = Events(self.database)
         return self._events
 
+    @property
+    def uses_functions(self) -> bool:
+        """Whether commands are run as a function rather than with EVALSHA"""
+        return self._function is not None
+
+    def _load_library(self) -> None:
+        """Load the reqless function library, falling back to EVALSHA if the
+        server doesn't support functions"""
+        assert self._library is not None
+        name, code = self._library
+        try:
+            self.database.execute_command("FUNCTION", "LOAD", "REPLACE", code)
+            self._function = name
+        except ResponseError as exc:
+            logger.warning("Falling back to EVALSHA: %s" % exc)
+            self._function = None
+            return
+        prune_libraries(self.database, name, time.time())
+
     def __call__(self, command: str, *args: Any) -> Any:
-        lua_args = [command, repr(time.time())]
-        lua_args.extend(args)
+        if self._cache is not None:
+            if command in CACHEABLE_COMMANDS:
+                return self._cache.get(command, args, lambda: self._call(command, args))
+            if command in INVALIDATING_COMMANDS:
+                try:
+                    return self._call(command, args)
+                finally:
+                    self._cache.invalidate()
+        return self._call(command, args)
+
+    def _call(self, command: str, args: Tuple[Any, ...]) -> Any:
+        """Run a command, on a replica if it's read-only and there is one"""
+        if command in READ_ONLY_COMMANDS:
+            replica = self._replicas.choose()
+            if replica is not None:
+                try:
+                    return self._invoke_replica(replica, command, args)
+                except (RedisConnectionError, RedisTimeoutError):
+                    logger.warning("Replica failed, reading from the primary")
+                    self._replicas.mark_down(replica)
+                except ResponseError as exc:
+                    raise ReqlessError(str(exc))
         try:
-            return self._lua(keys=[], args=lua_args)
+            try:
+                return self._invoke(self.database, command, args)
+            except ResponseError as exc:
+                # The library is gone if the server was restarted or flushed
+                if self._function is None or "Function not found" not in str(exc):
+                    raise
+                self._load_library()
+                return self._invoke(self.database, command, args)
         except ResponseError as exc:
             raise ReqlessError(str(exc))
 
+    def _invoke(
+        self,
+        database: Union[Redis, Pipeline],
+        command: str,
+        args: Tuple[Any, ...],
+    ) -> Any:
+        """Invoke a reqless command against the given database or pipeline"""
+        lua_args = [command, repr(time.time())]
+        lua_args.extend(args)
+        if self._function is not None:
+            return database.execute_command("FCALL", self._function, 0, *lua_args)
+        return self._lua(keys=[], args=lua_args, client=database)
+
+    def _invoke_replica(
+        self, replica: Union[Redis, Pipeline], command: str, args: Tuple[Any, ...]
+    ) -> Any:
+        """Invoke a read-only command on a replica. Replicas refuse to FCALL
+        functions that may write, so this always uses EVALSHA."""
+        lua_args = [command, repr(time.time())]
+        lua_args.extend(args)
+        return self._lua(keys=[], args=lua_args, client=replica)
+
+    def batch(self) -> Batch:
+        """Create a batch that buffers reqless commands and sends them to the
+        server in a single round trip when executed:
+
+            with client.batch() as batch:
+                futures = [batch("job.addTag", jid, "urgent") for jid in jids]
+            tags = [future.result() for future in futures]
+        """
+        return Batch(self._send_batch)
+
+    def _send_batch(self, commands: List[Command]) -> List[Any]:
+        """Send commands in a single pipeline, returning each one's response
+        or `ResponseError`. Like single commands, a batch of only read-only
+        commands goes to a replica if there is one, and the cache is cleared
+        once a batch with commands that invalidate it has run."""
+        if all(command in READ_ONLY_COMMANDS for command, _ in commands):
+            replica = self._replicas.choose()
+            if replica is not None:
+                try:
+                    return self._pipelined(replica, self._invoke_replica, commands)
+                except (RedisConnectionError, RedisTimeoutError):
+                    logger.warning("Replica failed, reading from the primary")
+                    self._replicas.mark_down(replica)
+        try:
+            responses = self._pipelined(self.database, self._invoke, commands)
+            # As with single commands, reload the library if the server lost
+            # it, and retry the commands that failed because of that
+            missing = [
+                index
+                for index, response in enumerate(responses)
+                if self._function is not None
+                and isinstance(response, ResponseError)
+                and "Function not found" in str(response)
+            ]
+            if missing:
+                self._load_library()
+                retried = self._pipelined(
+                    self.database, self._invoke, [commands[i] for i in missing]
+                )
+                for index, response in zip(missing, retried):
+                    responses[index] = response
+            return responses
+        finally:
+            if self._cache is not None and any(
+                command in INVALIDATING_COMMANDS for command, _ in commands
+            ):
+                self._cache.invalidate()
+
+    def _pipelined(
+        self,
+        database: Redis,
+        invoke: Callable[[Pipeline, str, Tuple[Any, ...]], Any],
+        commands: List[Command],
+    ) -> List[Any]:
+        """Invoke commands in a pipeline, stamping them with the time now"""
+        pipeline = database.pipeline(transaction=False)
+        for command, args in commands:
+            invoke(pipeline, command, args)
+        responses: List[Any] = pipeline.execute(raise_on_error=False)
+        return responses
+
     def track(self, jid: str) -> bool:
         """Begin tracking this job"""
         response: str = self("job.track", jid)
@@ -247,7 +548,7 @@ class Client(AbstractClient):
 
     def tags(self, offset: int = 0, count: int = 100) -> List[str]:
         """The most common tags among jobs"""
-        tags: List[str] = json.loads(self("tags.top", offset, count))
+        tags: List[str] = self.codec.loads(self("tags.top", offset, count))
         return tags
 
     def unfail(self, group: str, queue: str, count: int = 500) -> int:
@@ -255,8 +556,36 @@ class Client(AbstractClient):
         unfail_count = self("queue.unfail", queue, group, count)
         return int(unfail_count)
 
+    def gc(self, limit: int = 1000) -> int:
+        """Delete up to `limit` completed jobs whose data has expired,
+        returning how many were deleted. Completing a job only deletes a few
+        (`jobs-gc-on-complete`), so this catches up on any backlog, a bounded
+        amount at a time."""
+        return int(self("jobs.gc", limit))
+
+    def release_dependents(self, limit: int = 1000) -> int:
+        """Release up to `limit` dependents of completed jobs, returning how
+        many were released. Completing a job, and popping, only release a
+        batch of them (`dependents-release-batch`), so that jobs with very
+        many dependents don't block the server. This works off the rest."""
+        return int(self("jobs.releaseDependents", limit))
+
+    def maintain(self, limit: int = 1000) -> int:
+        """Do the housekeeping that popping a queue otherwise does first
+        (invalidating expired locks, spawning recurring jobs and making
+        scheduled jobs available) for the queues that are due, handling up to
+        `limit` jobs, and returning how many were handled. With
+        `maintain-on-pop` set to 0, popping skips it and this must be run."""
+        return int(self("queues.maintain", limit))
+
+    def next_maintenance(self) -> Optional[float]:
+        """When the next queue is due for housekeeping, or None if none is"""
+        due = self("queues.nextMaintenance")
+        return None if due is None else float(due)
+
 
 __all__ = [
+    "Batch",
     "Client",
     "Config",
     "Events",
@@ -1,13 +1,16 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, List, Optional
 
 from redis import Redis
 
 from reqless.abstract.abstract_config import AbstractConfig
 from reqless.abstract.abstract_jobs import AbstractJobs
+from reqless.abstract.abstract_queue_patterns import AbstractQueuePatterns
 from reqless.abstract.abstract_queues import AbstractQueues
 from reqless.abstract.abstract_throttles import AbstractThrottles
 from reqless.abstract.abstract_workers import AbstractWorkers
+from reqless.codec import JSONCodec
+from reqless.tracking import TrackingCache
 
 
 class AbstractClient(ABC):
@@ -15,6 +18,39 @@ class AbstractClient(ABC):
     def __call__(self, command: str, *args: Any) -> Any:  # pragma: no cover
         pass
 
+    @abstractmethod
+    def gc(self, limit: int = 1000) -> int:  # pragma: no cover
+        """Delete up to `limit` completed jobs whose data has expired,
+        returning how many were deleted"""
+        pass
+
+    @abstractmethod
+    def release_dependents(self, limit: int = 1000) -> int:  # pragma: no cover
+        """Release up to `limit` dependents of completed jobs, returning how
+        many were released"""
+        pass
+
+    @abstractmethod
+    def maintain(self, limit: int = 1000) -> int:  # pragma: no cover
+        """Do the housekeeping for queues that are due, handling up to `limit`
+        jobs, and returning how many were handled"""
+        pass
+
+    @abstractmethod
+    def next_maintenance(self) -> Optional[float]:  # pragma: no cover
+        """When the next queue is due for housekeeping, or None if none is"""
+        pass
+
+    @property
+    def cache(self) -> Optional[TrackingCache]:
+        """The client-side cache of slowly-changing reads, if enabled"""
+        return None
+
+    @property
+    @abstractmethod
+    def codec(self) -> JSONCodec:  # pragma: no cover
+        pass
+
     @property
     @abstractmethod
     def config(self) -> AbstractConfig:  # pragma: no cover
@@ -35,6 +71,17 @@ class AbstractClient(ABC):
     def database(self) -> Redis:  # pragma: no cover
         pass
 
+    @property
+    def databases(self) -> List[Redis]:
+        """Every server this client's jobs live on, so that their events can
+        be listened to"""
+        return [self.database]
+
+    @property
+    @abstractmethod
+    def queue_patterns(self) -> AbstractQueuePatterns:  # pragma: no cover
+        pass
+
     @property
     @abstractmethod
     def throttles(self) -> AbstractThrottles:  # pragma: no cover
@@ -45,6 +92,19 @@ class AbstractClient(ABC):
     def worker_name(self) -> str:  # pragma: no cover
         pass
 
+    @worker_name.setter
+    @abstractmethod
+    def worker_name(self, value: str) -> None:  # pragma: no cover
+        pass
+
+    @abstractmethod
+    def with_worker_name(
+        self, worker_name: str
+    ) -> "AbstractClient":  # pragma: no cover
+        """A client like this one, with connections of its own, that works as
+        another worker"""
+        pass
+
     @property
     @abstractmethod
     def workers(self) -> AbstractWorkers:  # pragma: no cover
@@ -3,6 +3,8 @@ from typing import List, Optional, Type, Union
 
 
 class AbstractBaseJob(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def cancel(self) -> List[str]:  # pragma: no cover
         pass
@@ -62,6 +64,8 @@ class AbstractBaseJob(ABC):
 
 
 class AbstractJob(AbstractBaseJob):
+    __slots__ = ()
+
     @abstractmethod
     def complete(
         self,
@@ -89,6 +93,16 @@ class AbstractJob(AbstractBaseJob):
     def heartbeat(self) -> float:  # pragma: no cover
         pass
 
+    @abstractmethod
+    def halt(self) -> None:  # pragma: no cover
+        """Ask the code processing this job to stop"""
+        pass
+
+    @property
+    @abstractmethod
+    def halted(self) -> bool:  # pragma: no cover
+        pass
+
     @property
     @abstractmethod
     def klass(self) -> Type:  # pragma: no cover
@@ -99,6 +113,15 @@ class AbstractJob(AbstractBaseJob):
     def klass(self, value: Type) -> None:  # pragma: no cover
         pass
 
+    @abstractmethod
+    def move(
+        self,
+        queue: str,
+        delay: Optional[int] = 0,
+        depends: Optional[List[str]] = None,
+    ) -> str:  # pragma: no cover
+        pass
+
     @abstractmethod
     def process(self) -> None:  # pragma: no cover
         pass
@@ -158,6 +181,8 @@ class AbstractJob(AbstractBaseJob):
 
 
 class AbstractRecurringJob(AbstractBaseJob):
+    __slots__ = ()
+
     @property
     @abstractmethod
     def next(self) -> Optional[float]:  # pragma: no cover
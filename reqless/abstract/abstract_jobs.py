@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Union
+from typing import Dict, Iterable, List, Optional, Union
 
 from reqless.abstract.abstract_job import AbstractJob, AbstractRecurringJob
 
@@ -23,7 +23,13 @@ class AbstractJobs(ABC):
         pass
 
     @abstractmethod
-    def get(self, *jids: str) -> List[AbstractJob]:  # pragma: no cover
+    def get(
+        self, *jids: str, fields: Optional[Iterable[str]] = None, lite: bool = False
+    ) -> List[AbstractJob]:  # pragma: no cover
+        pass
+
+    @abstractmethod
+    def heartbeat(self, *jids: str) -> Dict[str, float]:  # pragma: no cover
         pass
 
     @abstractmethod
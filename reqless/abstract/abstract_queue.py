@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Type, Union
+from typing import Any, Dict, Iterable, List, Optional, Type, Union
 
 from reqless.abstract.abstract_job import AbstractJob
 from reqless.abstract.abstract_queue_jobs import AbstractQueueJobs
@@ -38,13 +38,20 @@ class AbstractQueue(ABC):
 
     @abstractmethod
     def peek(
-        self, offset: Optional[int] = None, count: Optional[int] = None
+        self,
+        offset: Optional[int] = None,
+        count: Optional[int] = None,
+        fields: Optional[Iterable[str]] = None,
+        lite: bool = False,
     ) -> Union[AbstractJob, List[AbstractJob], None]:  # pragma: no cover
         pass
 
     @abstractmethod
     def pop(
-        self, count: Optional[int] = None
+        self,
+        count: Optional[int] = None,
+        fields: Optional[Iterable[str]] = None,
+        lite: bool = False,
     ) -> Union[AbstractJob, List[AbstractJob], None]:  # pragma: no cover
         pass
 
@@ -63,6 +70,15 @@ class AbstractQueue(ABC):
     ) -> str:  # pragma: no cover
         pass
 
+    @abstractmethod
+    def put_many(
+        self,
+        jobs: Iterable[Dict[str, Any]],
+        chunk_size: int = 500,
+        budget: Optional[float] = 0.01,
+    ) -> List[str]:  # pragma: no cover
+        pass
+
     @abstractmethod
     def requeue(
         self,
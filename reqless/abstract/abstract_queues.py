@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+from reqless.abstract.abstract_job import AbstractJob
 from reqless.abstract.abstract_queue import AbstractQueue
 
 
@@ -10,6 +11,49 @@ class AbstractQueues(ABC):
     def counts(self) -> Dict:  # pragma: no cover
         pass
 
+    @abstractmethod
+    def counts_page(
+        self, cursor: int = 0, count: int = 500
+    ) -> Tuple[int, List[Dict[str, Any]]]:  # pragma: no cover
+        """A page of counts, and the cursor of the next page (0 after the last)"""
+        pass
+
+    @property
+    @abstractmethod
+    def names(self) -> List[str]:  # pragma: no cover
+        """The names of all known queues"""
+        pass
+
+    @property
+    @abstractmethod
+    def version(self) -> int:  # pragma: no cover
+        """A number that changes whenever a queue is added or forgotten"""
+        pass
+
     @abstractmethod
     def __getitem__(self, queue_name: str) -> AbstractQueue:  # pragma: no cover
         pass
+
+    @abstractmethod
+    def next_due(self, *queue_names: str) -> Optional[float]:  # pragma: no cover
+        """When a job in any of the queues will next become available on its
+        own, or None if none will"""
+        pass
+
+    @abstractmethod
+    def wake_on_put(self, ttl: float, *queue_names: str) -> None:  # pragma: no cover
+        """Publish to `ql:available:<queue>` when jobs are put in any of the
+        queues, for the next `ttl` seconds"""
+        pass
+
+    @abstractmethod
+    def pop(
+        self,
+        queue_names: Iterable[str],
+        count: int = 1,
+        fields: Optional[Iterable[str]] = None,
+        lite: bool = False,
+    ) -> List[AbstractJob]:  # pragma: no cover
+        """Pop up to `count` jobs from the queues in a single call, preferring
+        earlier queues"""
+        pass
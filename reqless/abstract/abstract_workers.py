@@ -11,3 +11,13 @@ class AbstractWorkers(ABC):
     @abstractmethod
     def __getitem__(self, queue_name: str) -> Dict:  # pragma: no cover
         pass
+
+    @abstractmethod
+    def lease(self, worker_name: str, ttl: float) -> None:  # pragma: no cover
+        """Renew a worker's liveness lease for another `ttl` seconds"""
+        pass
+
+    @abstractmethod
+    def unlease(self, worker_name: str) -> None:  # pragma: no cover
+        """Give up a worker's liveness lease"""
+        pass
@@ -0,0 +1,310 @@
+"""An asyncio reqless client built on `redis.asyncio`"""
+
+import pkgutil
+import socket
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from redis import ResponseError
+from redis.asyncio import Redis
+from redis.commands.core import AsyncScript
+
+from reqless.aio.config import Config
+from reqless.aio.events import Events
+from reqless.aio.job import Job, RecurringJob
+from reqless.aio.queue import Queue
+from reqless.codec import JSONCodec, get_codec
+from reqless.exceptions import ReqlessError
+from reqless.job import encode_fields
+
+
+class Jobs:
+    """Class for accessing jobs and job information lazily"""
+
+    def __init__(self, client: "Client"):
+        self.client: "Client" = client
+
+    async def complete(self, offset: int = 0, count: int = 25) -> List[str]:
+        """Return the paginated jids of complete jobs"""
+        response: List[str] = self.client.codec.loads(
+            await self.client("jobs.completed", offset, count)
+        )
+        return response
+
+    async def tracked(self) -> Dict[str, List[Any]]:
+        """Return an array of job objects that are being tracked"""
+        results: Dict[str, Any] = self.client.codec.loads(
+            await self.client("jobs.tracked")
+        )
+        results["jobs"] = [Job(self.client, **job) for job in results["jobs"]]
+        return results
+
+    async def tagged(
+        self, tag: str, offset: int = 0, count: int = 25
+    ) -> Dict[str, Any]:
+        """Return the paginated jids of jobs tagged with a tag"""
+        response: Dict[str, Any] = self.client.codec.loads(
+            await self.client("jobs.tagged", tag, offset, count)
+        )
+        return response
+
+    async def failed(
+        self,
+        group: Optional[str] = None,
+        start: int = 0,
+        limit: int = 25,
+    ) -> Dict[str, Any]:
+        """If no group is provided, this returns the counts of the various
+        groups of failures known. If a group is provided, returns paginated
+        job objects affected by that kind of failure."""
+        results: Dict[str, Any]
+        if not group:
+            results = self.client.codec.loads(await self.client("failureGroups.counts"))
+        else:
+            results = self.client.codec.loads(
+                await self.client("jobs.failedByGroup", group, start, limit)
+            )
+            results["jobs"] = await self.get(*results["jobs"])
+        return results
+
+    async def get(
+        self, *jids: str, fields: Optional[Iterable[str]] = None, lite: bool = False
+    ) -> List[Job]:
+        """Return jobs objects for all the jids. See `reqless.Queue.pop` for
+        `fields` and `lite`."""
+        if not jids:
+            return []
+        if fields is None and not lite:
+            response = await self.client("job.getMulti", *jids)
+        else:
+            response = await self.client(
+                "job.getMultiFields",
+                encode_fields(self.client.codec, fields, lite),
+                *jids,
+            )
+        return [Job(self.client, **j) for j in self.client.codec.loads(response)]
+
+    async def heartbeat(self, *jids: str) -> Dict[str, float]:
+        """Renew this client's locks on all the jids in a single call. See
+        `reqless.Jobs.heartbeat`."""
+        if not jids:
+            return {}
+        response: Dict[str, float] = self.client.codec.loads(
+            await self.client("jobs.heartbeat", self.client.worker_name, *jids)
+        )
+        return response
+
+    async def __getitem__(self, jid: str) -> Optional[Union[Job, RecurringJob]]:
+        """Get a job object corresponding to that jid, or ``None`` if it
+        doesn't exist:
+
+            job = await client.jobs[jid]
+        """
+        results = await self.client("job.get", jid)
+        if not results:
+            results = await self.client("recurringJob.get", jid)
+            if not results:
+                return None
+            return RecurringJob(self.client, **self.client.codec.loads(results))
+        return Job(self.client, **self.client.codec.loads(results))
+
+
+class Queues:
+    """Class for accessing queues lazily"""
+
+    def __init__(self, client: "Client"):
+        self.client: "Client" = client
+
+    async def counts(self) -> List[Dict[str, Any]]:
+        """The job counts of every known queue"""
+        counts: List[Dict[str, Any]] = self.client.codec.loads(
+            await self.client("queues.counts")
+        )
+        return counts
+
+    async def counts_page(
+        self, cursor: int = 0, count: int = 500
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """The counts of up to `count` queues starting at `cursor`, and the
+        cursor of the next page, which is 0 after the last one"""
+        page: Dict[str, Any] = self.client.codec.loads(
+            await self.client("queues.countsPage", cursor, count)
+        )
+        return int(page["cursor"]), page["counts"] or []
+
+    async def names(self) -> List[str]:
+        """The names of all known queues"""
+        names: List[str] = self.client.codec.loads(await self.client("queues.names"))
+        return names
+
+    async def version(self) -> int:
+        """A number that changes whenever a queue is added or forgotten"""
+        return int(await self.client("queues.version"))
+
+    def __getitem__(self, queue_name: str) -> Queue:
+        """Get a queue object associated with the provided queue name"""
+        return Queue(queue_name, self.client, self.client.worker_name)
+
+    async def next_due(self, *queue_names: str) -> Optional[float]:
+        """When a job in any of the queues will next become available on its
+        own, or None if none will"""
+        if not queue_names:
+            return None
+        due = await self.client("queues.nextDue", *queue_names)
+        return None if due is None else float(due)
+
+    async def wake_on_put(self, ttl: float, *queue_names: str) -> None:
+        """Publish to `ql:available:<queue>` when jobs are put in any of the
+        queues, for the next `ttl` seconds"""
+        if queue_names:
+            await self.client("queues.wakeOnPut", ttl, *queue_names)
+
+    async def pop(
+        self,
+        queue_names: Iterable[str],
+        count: int = 1,
+        fields: Optional[Iterable[str]] = None,
+        lite: bool = False,
+    ) -> List[Job]:
+        """Pop up to `count` jobs from the queues in a single call. See
+        `reqless.Queues.pop`."""
+        names = list(queue_names)
+        if not names:
+            return []
+        return [
+            Job(self.client, **job)
+            for job in self.client.codec.loads(
+                await self.client(
+                    "queues.pop",
+                    self.client.worker_name,
+                    count,
+                    encode_fields(self.client.codec, fields, lite),
+                    *names,
+                )
+            )
+        ]
+
+
+class Client:
+    """Asynchronous reqless client object. It runs the same Lua script as
+    `reqless.Client`, so the two can be used side by side against the same
+    database."""
+
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379",
+        hostname: Optional[str] = None,
+        codec: Union[str, JSONCodec, None] = None,
+        **kwargs: Any,
+    ):
+        # This is our unique identifier as a worker
+        self.worker_name: str = hostname or socket.gethostname()
+        self.codec: JSONCodec = (
+            codec if isinstance(codec, JSONCodec) else get_codec(codec)
+        )
+        kwargs["decode_responses"] = True
+        self._database: Redis = Redis.from_url(url, **kwargs)
+        self._jobs: Jobs = Jobs(self)
+        self._queues: Queues = Queues(self)
+        self._config: Config = Config(self)
+        self._events: Optional[Events] = None
+
+        data = pkgutil.get_data("reqless", "lua/reqless.lua")
+        if data is None:
+            raise RuntimeError("Failed to load reqless lua!")
+        self._lua: AsyncScript = self._database.register_script(data)
+
+    @property
+    def config(self) -> Config:
+        return self._config
+
+    @property
+    def database(self) -> Redis:
+        return self._database
+
+    @property
+    def events(self) -> Events:
+        if self._events is None:
+            self._events = Events(self.database)
+        return self._events
+
+    @property
+    def jobs(self) -> Jobs:
+        return self._jobs
+
+    @property
+    def queues(self) -> Queues:
+        return self._queues
+
+    async def __call__(self, command: str, *args: Any) -> Any:
+        lua_args = [command, repr(time.time())]
+        lua_args.extend(args)
+        try:
+            return await self._lua(keys=[], args=lua_args)
+        except ResponseError as exc:
+            raise ReqlessError(str(exc))
+
+    async def close(self) -> None:
+        """Release the connections held by this client"""
+        if self._events is not None:
+            await self._events.close()
+        # types-redis predates aclose, which deprecated close in redis 5.0.1
+        await self._database.aclose()  # type: ignore[attr-defined]
+
+    async def __aenter__(self) -> "Client":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def track(self, jid: str) -> bool:
+        """Begin tracking this job"""
+        response: str = await self("job.track", jid)
+        return response == "1"
+
+    async def untrack(self, jid: str) -> bool:
+        """Stop tracking this job"""
+        response: str = await self("job.untrack", jid)
+        return response == "1"
+
+    async def tags(self, offset: int = 0, count: int = 100) -> List[str]:
+        """The most common tags among jobs"""
+        tags: List[str] = self.codec.loads(await self("tags.top", offset, count))
+        return tags
+
+    async def unfail(self, group: str, queue: str, count: int = 500) -> int:
+        """Move jobs from the failed group to the provided queue"""
+        unfail_count = await self("queue.unfail", queue, group, count)
+        return int(unfail_count)
+
+    async def gc(self, limit: int = 1000) -> int:
+        """Delete up to `limit` completed jobs whose data has expired,
+        returning how many were deleted"""
+        return int(await self("jobs.gc", limit))
+
+    async def release_dependents(self, limit: int = 1000) -> int:
+        """Release up to `limit` dependents of completed jobs, returning how
+        many were released"""
+        return int(await self("jobs.releaseDependents", limit))
+
+    async def maintain(self, limit: int = 1000) -> int:
+        """Do the housekeeping for queues that are due, handling up to
+        `limit` jobs, and returning how many were handled"""
+        return int(await self("queues.maintain", limit))
+
+    async def next_maintenance(self) -> Optional[float]:
+        """When the next queue is due for housekeeping, or None if none is"""
+        due = await self("queues.nextMaintenance")
+        return None if due is None else float(due)
+
+
+__all__ = [
+    "Client",
+    "Config",
+    "Events",
+    "Job",
+    "Jobs",
+    "Queue",
+    "Queues",
+    "RecurringJob",
+]
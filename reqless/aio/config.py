@@ -0,0 +1,50 @@
+"""Asynchronous configuration operations"""
+
+from typing import TYPE_CHECKING, Any, Dict
+
+
+if TYPE_CHECKING:  # pragma: no cover
+    from reqless.aio import Client
+
+
+class Config:
+    """A class that allows us to change and manipulate reqless config"""
+
+    def __init__(self, client: "Client"):
+        self._client: "Client" = client
+
+    async def all(self) -> Dict[str, Any]:
+        """All config options and their values"""
+        response: Dict[str, Any] = self._client.codec.loads(
+            await self._client("config.getAll")
+        )
+        return response
+
+    async def get(self, option: str, default: Any = None) -> Any:
+        """Get a particular option, or the default if it's missing"""
+        result = await self._client("config.get", option)
+        if not result:
+            return default
+        try:
+            return self._client.codec.loads(result)
+        except (TypeError, ValueError):
+            return result
+
+    async def set(self, option: str, value: Any) -> None:
+        """Set an option"""
+        await self._client("config.set", option, value)
+
+    async def unset(self, option: str) -> None:
+        """Remove an option, restoring its default if it has one"""
+        await self._client("config.unset", option)
+
+    async def pop(self, option: str, default: Any = None) -> Any:
+        """Just like `dict.pop`"""
+        value = await self.get(option, default)
+        await self.unset(option)
+        return value
+
+    async def clear(self) -> None:
+        """Remove all keys"""
+        for key in await self.all():
+            await self.unset(key)
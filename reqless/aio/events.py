@@ -0,0 +1,80 @@
+import asyncio
+import inspect
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, Callable, Dict, Optional, Tuple
+
+from redis.asyncio import Redis
+
+from reqless.aio.listener import Listener
+
+
+logger = logging.getLogger("reqless")
+
+
+class Events:
+    """A class for handling reqless events on an event loop. Callbacks may be
+    plain functions or coroutine functions."""
+
+    namespace = "ql:"
+    events: Tuple[str, ...] = (
+        "canceled",
+        "completed",
+        "failed",
+        "popped",
+        "put",
+        "stalled",
+        "track",
+        "untrack",
+    )
+
+    def __init__(self, database: Redis):
+        self._listener = Listener(
+            channels=[self.namespace + event for event in self.events],
+            database=database,
+        )
+        self._callbacks: Dict[str, Optional[Callable]] = {k: None for k in self.events}
+
+    async def listen(self) -> None:
+        """Listen for events"""
+        async for message in self._listener.listen():
+            logger.debug("Message: %s", message)
+            # Strip off the 'namespace' from the channel
+            channel = message["channel"][len(self.namespace) :]
+            func = self._callbacks.get(channel)
+            if func:
+                result = func(message["data"])
+                if inspect.isawaitable(result):
+                    await result
+
+    def on(self, evt: str, func: Optional[Callable]) -> None:
+        """Set a callback handler for a pubsub event"""
+        if evt not in self._callbacks:
+            raise NotImplementedError('callback "%s"' % evt)
+        else:
+            self._callbacks[evt] = func
+
+    def off(self, evt: str) -> Optional[Callable]:
+        """Deactivate the callback for a pubsub event"""
+        return self._callbacks.pop(evt, None)
+
+    def unlisten(self) -> None:
+        """Stop listening for events"""
+        self._listener.unlisten()
+
+    @asynccontextmanager
+    async def task(self) -> AsyncGenerator["Events", None]:
+        """Listen in a background task for the duration of the block"""
+        task = asyncio.create_task(self.listen())
+        # Wait for the listener to start listening to ensure we don't miss
+        # events published from within the block.
+        await self._listener.wait_until_listening()
+        try:
+            yield self
+        finally:
+            self.unlisten()
+            await task
+
+    async def close(self) -> None:
+        """Release the pubsub connection"""
+        await self._listener.close()
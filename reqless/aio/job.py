@@ -0,0 +1,417 @@
+"""Asynchronous versions of the Job and RecurringJob classes"""
+
+import inspect
+import time
+import traceback
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Type, Union
+
+from reqless.exceptions import LostLockError, ReqlessError
+from reqless.importer import Importer
+from reqless.job import complete_args, move_args, retry_args
+from reqless.logger import logger
+
+
+if TYPE_CHECKING:  # pragma: no cover
+    from reqless.aio import Client
+    from reqless.aio.queue import Queue
+
+
+class BaseJob:
+    # Like `reqless.job.BaseJob`, these read fields from the record they were
+    # decoded from as they're accessed
+    __slots__ = ("client", "_klass", "_record", "_sandbox")
+
+    def __init__(self, client: "Client", **kwargs: Any):
+        self.client: "Client" = client
+        self._klass: Optional[Type] = None
+        self._record: Dict[str, Any] = kwargs
+        self._sandbox: Optional[str] = None
+
+    def _list(self, key: str) -> List[Any]:
+        """A list field of the record, raising a KeyError like other fields if
+        it was left out. Because of how Lua parses JSON, empty lists come
+        through as {}, so they're replaced on first access."""
+        value = self._record[key]
+        if not isinstance(value, list):
+            value = self._record[key] = []
+        return value
+
+    @property
+    def data(self) -> str:
+        data: str = self._record["data"]
+        return data
+
+    @data.setter
+    def data(self, value: str) -> None:
+        self._record["data"] = value
+
+    @property
+    def jid(self) -> str:
+        jid: str = self._record["jid"]
+        return jid
+
+    @property
+    def klass(self) -> Type:
+        if self._klass is None:
+            self._klass = Importer.import_class(class_name=self.klass_name)
+
+        return self._klass
+
+    @property
+    def klass_name(self) -> str:
+        klass_name: str = self._record["klass"]
+        return klass_name
+
+    @property
+    def priority(self) -> int:
+        priority: int = self._record["priority"]
+        return priority
+
+    @property
+    def queue(self) -> "Queue":
+        return self.client.queues[self.queue_name]
+
+    @property
+    def queue_name(self) -> str:
+        queue_name: str = self._record["queue"]
+        return queue_name
+
+    @property
+    def sandbox(self) -> Optional[str]:
+        return self._sandbox
+
+    @sandbox.setter
+    def sandbox(self, value: Optional[str]) -> None:
+        self._sandbox = value
+
+    @property
+    def tags(self) -> List[str]:
+        return self._list("tags")
+
+    @property
+    def throttles(self) -> List[str]:
+        return self._list("throttles")
+
+    async def cancel(self) -> List[str]:
+        """Cancel a job. It will be deleted from the system, the thinking
+        being that if you don't want to do any work on it, it shouldn't be in
+        the queuing system."""
+        response: List[str] = await self.client("job.cancel", self.jid)
+        return response
+
+    async def tag(self, *tags: str) -> List[str]:
+        """Tag a job with additional tags"""
+        response_json: str = await self.client("job.addTag", self.jid, *tags)
+        response: List[str] = self.client.codec.loads(response_json)
+        self._record["tags"] = response
+        return response
+
+    async def untag(self, *tags: str) -> List[str]:
+        """Remove tags from a job"""
+        response_json: str = await self.client("job.removeTag", self.jid, *tags)
+        response: List[str] = self.client.codec.loads(response_json)
+        self._record["tags"] = response
+        return response
+
+
+class Job(BaseJob):
+    """The asynchronous Job class"""
+
+    __slots__ = ()
+
+    @property
+    def dependencies(self) -> List[str]:
+        return self._list("dependencies")
+
+    @property
+    def dependents(self) -> List[str]:
+        return self._list("dependents")
+
+    @property
+    def expires_at(self) -> float:
+        expires_at: float = self._record["expires"]
+        return expires_at
+
+    @property
+    def failure(self) -> Optional[Dict]:
+        failure: Optional[Dict] = self._record["failure"]
+        return failure
+
+    @property
+    def history(self) -> List[Dict]:
+        return self._list("history")
+
+    @property
+    def original_retries(self) -> int:
+        retries: int = self._record["retries"]
+        return retries
+
+    @property
+    def retries_left(self) -> int:
+        retries_left: int = self._record["remaining"]
+        return retries_left
+
+    @property
+    def state(self) -> str:
+        state: str = self._record["state"]
+        return state
+
+    @property
+    def ttl(self) -> float:
+        return self.expires_at - time.time()
+
+    @property
+    def tracked(self) -> bool:
+        tracked: bool = self._record["tracked"]
+        return tracked
+
+    @property
+    def worker_name(self) -> str:
+        worker_name: str = self._record["worker"]
+        return worker_name
+
+    def __repr__(self) -> str:
+        return "<%s %s>" % (self.klass_name, self.jid)
+
+    async def process(self) -> None:
+        """Load the module containing your class, and run the appropriate
+        method, awaiting it if it is a coroutine function. Like
+        `reqless.Job.process`, a method named after the queue is preferred
+        over `process`."""
+        try:
+            method = getattr(
+                self.klass, self.queue_name, getattr(self.klass, "process", None)
+            )
+        except Exception as exc:
+            # We failed to import the module containing this class
+            logger.exception("Failed to import %s", self.klass_name)
+            await self.fail(
+                self.queue_name + "-" + exc.__class__.__name__,
+                "Failed to import %s" % self.klass_name,
+            )
+            return
+
+        if not method:
+            logger.error(
+                'Failed %s : %s is missing a method "%s" or "process"',
+                self.jid,
+                self.klass_name,
+                self.queue_name,
+            )
+            await self.fail(
+                self.queue_name + "-method-missing",
+                self.klass_name
+                + ' is missing a method "'
+                + self.queue_name
+                + '" or "process"',
+            )
+            return
+
+        try:
+            logger.info("Processing %s in %s", self.jid, self.queue_name)
+            result = method(self)
+            if inspect.isawaitable(result):
+                await result
+            logger.info("Completed %s in %s", self.jid, self.queue_name)
+        except Exception as exc:
+            # Make error type based on exception type
+            logger.exception(
+                "Failed %s in %s: %s", self.jid, self.queue_name, repr(method)
+            )
+            await self.fail(
+                self.queue_name + "-" + exc.__class__.__name__,
+                traceback.format_exc(),
+            )
+
+    async def set_priority(self, value: int) -> None:
+        """Change the priority of this job"""
+        await self.client("job.setPriority", self.jid, value)
+        self._record["priority"] = value
+
+    async def move(
+        self,
+        queue: str,
+        delay: Optional[int] = 0,
+        depends: Optional[List[str]] = None,
+    ) -> str:
+        """Move this job out of its existing state and into another queue"""
+        logger.info("Moving %s to %s from %s", self.jid, queue, self.queue_name)
+        response: str = await self.client(
+            *move_args(
+                self.client.codec,
+                self.worker_name,
+                queue,
+                self.jid,
+                self.klass_name,
+                self.data,
+                delay,
+                depends,
+                self.throttles,
+            )
+        )
+        return response
+
+    async def complete(
+        self,
+        next_queue: Optional[str] = None,
+        delay: Optional[int] = None,
+        depends: Optional[List[str]] = None,
+    ) -> bool:
+        """Turn this job in as complete, optionally advancing it to another
+        queue"""
+        if next_queue:
+            logger.info(
+                "Advancing %s to %s from %s",
+                self.jid,
+                next_queue,
+                self.queue_name,
+            )
+        else:
+            logger.info("Completing %s", self.jid)
+        return bool(
+            await self.client(
+                *complete_args(
+                    self.client.codec,
+                    self.jid,
+                    self.client.worker_name,
+                    self.queue_name,
+                    self.data,
+                    next_queue,
+                    delay,
+                    depends,
+                )
+            )
+        )
+
+    async def heartbeat(self) -> float:
+        """Renew the heartbeat, if possible, and optionally update the job's
+        user data."""
+        logger.debug("Heartbeating %s (ttl = %s)", self.jid, self.ttl)
+        try:
+            self._record["expires"] = float(
+                await self.client(
+                    "job.heartbeat",
+                    self.jid,
+                    self.client.worker_name,
+                    self.data,
+                )
+                or 0
+            )
+        except ReqlessError:
+            raise LostLockError(self.jid)
+        logger.debug("Heartbeated %s (ttl = %s)", self.jid, self.ttl)
+        return self.expires_at
+
+    async def fail(self, group: str, message: str) -> bool:
+        """Mark the particular job as failed, with the provided group, and a
+        more specific message. See `reqless.Job.fail`."""
+        logger.warning("Failing %s (%s): %s", self.jid, group, message)
+        response: str = await self.client(
+            "job.fail",
+            self.jid,
+            self.client.worker_name,
+            group,
+            message,
+            self.data,
+        )
+        return bool(response)
+
+    async def track(self) -> bool:
+        """Begin tracking this job"""
+        response: str = await self.client("job.track", self.jid)
+        return response == "1"
+
+    async def untrack(self) -> bool:
+        """Stop tracking this job"""
+        response: str = await self.client("job.untrack", self.jid)
+        return response == "1"
+
+    async def retry(
+        self,
+        delay: int = 0,
+        group: Optional[str] = None,
+        message: Optional[str] = None,
+    ) -> int:
+        """Retry this job in a little bit, in the same queue"""
+        response: int = await self.client(
+            *retry_args(
+                self.jid, self.queue_name, self.worker_name, delay, group, message
+            )
+        )
+        return response
+
+    async def depend(self, *args: str) -> bool:
+        """If and only if a job already has other dependencies, this will add
+        more jids to the list of this job's dependencies."""
+        return bool(await self.client("job.addDependency", self.jid, *args))
+
+    async def undepend(self, *args: str, **kwargs: bool) -> bool:
+        """Remove specific (or all) job dependencies from this job"""
+        if kwargs.get("all", False):
+            return bool(await self.client("job.removeDependency", self.jid, "all"))
+        return bool(await self.client("job.removeDependency", self.jid, *args))
+
+    async def timeout(self) -> None:
+        """Time out this job"""
+        await self.client("job.timeout", self.jid)
+
+
+class RecurringJob(BaseJob):
+    """The asynchronous Recurring Job class"""
+
+    __slots__ = ()
+
+    @property
+    def count(self) -> int:
+        count: int = self._record["count"]
+        return count
+
+    @property
+    def interval(self) -> int:
+        interval: int = self._record["interval"]
+        return interval
+
+    @property
+    def retries(self) -> int:
+        retries: int = self._record["retries"]
+        return retries
+
+    async def update(self, **kwargs: Union[str, int]) -> None:
+        """Update any of the `count`, `data`, `interval`, `klass`, `priority`,
+        `queue` or `retries` of this recurring job"""
+        args: List[Union[str, int]] = []
+        for key, value in kwargs.items():
+            args.extend([key, value])
+        await self.client("recurringJob.update", self.jid, *args)
+        for key, value in kwargs.items():
+            if key == "klass":
+                self._klass = None
+            self._record[key] = value
+
+    async def next(self) -> Optional[float]:
+        """When this recurring job will next spawn a job"""
+        response: Optional[float] = await self.client.database.zscore(
+            "ql:q:" + self.queue_name + "-recur", self.jid
+        )
+        return response
+
+    async def cancel(self) -> List[str]:
+        """Cancel all future recurring jobs"""
+        await self.client("recurringJob.cancel", self.jid)
+        return [self.jid]
+
+    async def tag(self, *tags: str) -> List[str]:
+        """Add tags to this recurring job"""
+        response: List[str] = self.client.codec.loads(
+            await self.client("recurringJob.addTag", self.jid, *tags)
+        )
+        self._record["tags"] = response
+        return response
+
+    async def untag(self, *tags: str) -> List[str]:
+        """Remove tags from this job"""
+        response: List[str] = self.client.codec.loads(
+            await self.client("recurringJob.removeTag", self.jid, *tags)
+        )
+        self._record["tags"] = response
+        return response
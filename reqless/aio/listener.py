@@ -0,0 +1,51 @@
+"""An asynchronous listener for pubsub channels that can unlisten"""
+
+import asyncio
+from typing import Any, AsyncGenerator, Dict, List
+
+from redis.asyncio import Redis
+
+
+class Listener:
+    """A class that listens to pubsub channels and can unlisten"""
+
+    def __init__(self, database: Redis, channels: List[str]):
+        self._pubsub = database.pubsub()
+        self._channels: List[str] = channels
+        self._listening: asyncio.Event = asyncio.Event()
+        self.is_listening: bool = False
+
+    async def listen(self) -> AsyncGenerator[Dict[str, Any], None]:
+        """Listen for events as they come in"""
+        await self._pubsub.subscribe(*self._channels)
+        self.is_listening = True
+        self._listening.set()
+        try:
+            while True:
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=0.1
+                )
+                if message is not None:
+                    if message["type"] == "message":
+                        yield message
+                elif not self.is_listening:
+                    # Only stop once anything already delivered is drained
+                    break
+        finally:
+            self.is_listening = False
+            self._listening.clear()
+            await self._pubsub.unsubscribe(*self._channels)
+
+    async def wait_until_listening(self) -> None:
+        """Wait until listening has begun"""
+        await self._listening.wait()
+
+    def unlisten(self) -> None:
+        """Stop listening for events. The listen loop stops once it has
+        drained the messages already delivered to it."""
+        self.is_listening = False
+
+    async def close(self) -> None:
+        """Release the pubsub connection"""
+        # types-redis predates aclose, which deprecated close in redis 5.0.1
+        await self._pubsub.aclose()  # type: ignore[attr-defined]
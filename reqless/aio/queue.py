@@ -0,0 +1,245 @@
+"""Asynchronous versions of our Queue and supporting classes"""
+
+import time
+import uuid
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Type, Union
+
+from reqless.aio.job import Job
+from reqless.job import encode_fields
+from reqless.queue import class_string, put_args, put_many_chunks, recur_args
+
+
+if TYPE_CHECKING:  # pragma: no cover
+    from reqless.aio import Client
+
+
+class Jobs:
+    """A proxy object for queue-specific job information"""
+
+    def __init__(self, name: str, client: "Client"):
+        self.name: str = name
+        self.client: "Client" = client
+
+    async def depends(self, offset: int = 0, count: int = 25) -> List[str]:
+        """Return all the currently dependent jobs"""
+        return await self._jobs("depends", offset, count)
+
+    async def recurring(self, offset: int = 0, count: int = 25) -> List[str]:
+        """Return all the recurring jobs"""
+        return await self._jobs("recurring", offset, count)
+
+    async def running(self, offset: int = 0, count: int = 25) -> List[str]:
+        """Return all the currently-running jobs"""
+        return await self._jobs("running", offset, count)
+
+    async def scheduled(self, offset: int = 0, count: int = 25) -> List[str]:
+        """Return all the currently-scheduled jobs"""
+        return await self._jobs("scheduled", offset, count)
+
+    async def stalled(self, offset: int = 0, count: int = 25) -> List[str]:
+        """Return all the currently-stalled jobs"""
+        return await self._jobs("stalled", offset, count)
+
+    async def _jobs(self, state: str, offset: int, count: int) -> List[str]:
+        response: List[str] = self.client.codec.loads(
+            await self.client("queue.jobsByState", state, self.name, offset, count)
+        )
+        return response
+
+
+class Queue:
+    """The asynchronous Queue class"""
+
+    def __init__(self, name: str, client: "Client", worker_name: str):
+        self.name: str = name
+        self.client: "Client" = client
+        self.worker_name: str = worker_name
+        self.jobs: Jobs = Jobs(name, client)
+
+    def class_string(self, klass: Union[str, Type]) -> str:
+        """Return a string representative of the class"""
+        return class_string(klass)
+
+    def new_jid(self) -> str:
+        """Generate the jid of a job put in this queue without one"""
+        return uuid.uuid4().hex
+
+    async def counts(self) -> Dict[str, Any]:
+        """Return the job counts of this queue"""
+        response: Dict[str, Any] = self.client.codec.loads(
+            await self.client("queue.counts", self.name)
+        )
+        return response
+
+    async def get_heartbeat(self) -> int:
+        """Get the heartbeat interval of jobs in this queue"""
+        config = await self.client.config.all()
+        return int(config.get(self.name + "-heartbeat", config.get("heartbeat", 60)))
+
+    async def set_heartbeat(self, value: int) -> None:
+        """Set the heartbeat interval of jobs in this queue"""
+        await self.client.config.set(self.name + "-heartbeat", value)
+
+    async def pause(self) -> None:
+        await self.client("queue.pause", self.name)
+
+    async def unpause(self) -> None:
+        await self.client("queue.unpause", self.name)
+
+    async def put(
+        self,
+        klass: Union[str, Type],
+        data: str,
+        priority: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        delay: Optional[int] = None,
+        retries: Optional[int] = None,
+        jid: Optional[str] = None,
+        depends: Optional[List[str]] = None,
+        throttles: Optional[List[str]] = None,
+    ) -> str:
+        """Either create a new job in the provided queue with the provided
+        attributes, or move that job into that queue. See
+        `reqless.Queue.put`."""
+        response: str = await self.client(
+            "queue.put",
+            self.worker_name,
+            self.name,
+            *put_args(
+                self.client.codec,
+                jid or self.new_jid(),
+                klass,
+                data,
+                priority,
+                tags,
+                delay,
+                retries,
+                depends,
+                throttles,
+            ),
+        )
+        return response
+
+    async def put_many(
+        self,
+        jobs: Iterable[Dict[str, Any]],
+        chunk_size: int = 500,
+        budget: Optional[float] = 0.01,
+    ) -> List[str]:
+        """Put many jobs into this queue, returning their jids in order. See
+        `reqless.Queue.put_many`."""
+        jids: List[str] = []
+        for chunk in put_many_chunks(jobs, chunk_size, self.new_jid):
+            jids.extend(await self._put_chunk(chunk, budget))
+        return jids
+
+    async def _put_chunk(
+        self, chunk: List[Dict[str, Any]], budget: Optional[float]
+    ) -> List[str]:
+        jids: List[str] = []
+        while chunk:
+            put: List[str] = self.client.codec.loads(
+                await self.client(
+                    "queue.putMulti",
+                    self.worker_name,
+                    self.name,
+                    self.client.codec.dumps(chunk),
+                    budget or 0,
+                )
+            )
+            jids.extend(put)
+            chunk = chunk[len(put) :]
+        return jids
+
+    async def recur(
+        self,
+        klass: Union[str, Type],
+        data: str,
+        interval: Optional[int] = None,
+        offset: Optional[int] = 0,
+        priority: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        retries: Optional[int] = None,
+        jid: Optional[str] = None,
+        throttles: Optional[List[str]] = None,
+    ) -> str:
+        """Place a recurring job in this queue"""
+        response: str = await self.client(
+            "queue.recurAtInterval",
+            self.name,
+            *recur_args(
+                self.client.codec,
+                jid or self.new_jid(),
+                klass,
+                data,
+                interval,
+                offset,
+                priority,
+                tags,
+                retries,
+                throttles,
+            ),
+        )
+        return response
+
+    async def pop(
+        self,
+        count: Optional[int] = None,
+        fields: Optional[Iterable[str]] = None,
+        lite: bool = False,
+    ) -> Union[Job, List[Job], None]:
+        """Pop jobs from this queue, locking them to this worker. Returns a
+        single job (or `None`) when no count is given. See `reqless.Queue.pop`
+        for `fields` and `lite`."""
+        results: List[Job] = [
+            Job(self.client, **job)
+            for job in self.client.codec.loads(
+                await self.client(
+                    "queue.pop",
+                    self.name,
+                    self.worker_name,
+                    count or 1,
+                    encode_fields(self.client.codec, fields, lite),
+                )
+            )
+        ]
+        if count is None:
+            return (len(results) and results[0]) or None
+        return results
+
+    async def peek(
+        self,
+        offset: Optional[int] = None,
+        count: Optional[int] = None,
+        fields: Optional[Iterable[str]] = None,
+        lite: bool = False,
+    ) -> Union[Job, List[Job], None]:
+        """Similar to the pop command, except that it merely peeks at the next
+        items. See `reqless.Queue.pop` for `fields` and `lite`."""
+        results: List[Job] = [
+            Job(self.client, **rec)
+            for rec in self.client.codec.loads(
+                await self.client(
+                    "queue.peek",
+                    self.name,
+                    offset or 0,
+                    count or 1,
+                    encode_fields(self.client.codec, fields, lite),
+                )
+            )
+        ]
+        if count is None:
+            return (len(results) and results[0]) or None
+        return results
+
+    async def stats(self, date: Optional[str] = None) -> Dict:
+        """Return the current statistics for this queue on a given date"""
+        response: Dict = self.client.codec.loads(
+            await self.client("queue.stats", self.name, date or repr(time.time()))
+        )
+        return response
+
+    async def length(self) -> int:
+        """The number of jobs in this queue"""
+        response: int = await self.client("queue.length", self.name)
+        return response
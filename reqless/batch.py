@@ -0,0 +1,97 @@
+"""Queue up several reqless commands and send them in a single round trip"""
+
+from types import TracebackType
+from typing import Any, Callable, List, Optional, Tuple, Type
+
+from redis import ResponseError
+
+from reqless.exceptions import ReqlessError
+from reqless.future import Future
+
+
+Command = Tuple[str, Tuple[Any, ...]]
+
+
+class Batch:
+    """A collection of reqless commands that are buffered and sent to the
+    server together in a single pipeline when executed. Each queued command
+    returns a `Future` that is resolved once the batch is executed. Commands
+    that fail on the server resolve their future with a `ReqlessError` rather
+    than aborting the rest of the batch.
+
+    Nothing is sent until the batch is executed, and `send` is given all of
+    the queued commands at once, so that they're stamped with the time they
+    actually run at and routed the way the client routes single commands.
+
+    When used as a context manager, the batch is executed on exit unless the
+    block raised, in which case the queued commands are discarded."""
+
+    def __init__(self, send: Callable[[List[Command]], List[Any]]):
+        self._send: Callable[[List[Command]], List[Any]] = send
+        self._commands: List[Command] = []
+        self._futures: List[Future[Any]] = []
+
+    def __call__(self, command: str, *args: Any) -> Future[Any]:
+        """Queue a reqless command, returning a future for its result"""
+        self._commands.append((command, args))
+        future = Future[Any]()
+        self._futures.append(future)
+        return future
+
+    def __len__(self) -> int:
+        return len(self._futures)
+
+    def execute(self, raise_on_error: bool = True) -> List[Any]:
+        """Send all queued commands to the server and resolve their futures.
+        Returns the results in the order the commands were queued, with any
+        failed command represented by its `ReqlessError`. If `raise_on_error`
+        is set, the first such error is raised after all of the futures have
+        been resolved."""
+        commands, self._commands = self._commands, []
+        futures, self._futures = self._futures, []
+        if not futures:
+            return []
+
+        try:
+            responses = self._send(commands)
+        except Exception as exc:
+            for future in futures:
+                future.set_exception(exc)
+            raise
+
+        results: List[Any] = []
+        first_error: Optional[ReqlessError] = None
+        for future, response in zip(futures, responses):
+            if isinstance(response, ResponseError):
+                error = ReqlessError(str(response))
+                future.set_exception(error)
+                results.append(error)
+                first_error = first_error or error
+            else:
+                future.set_result(response)
+                results.append(response)
+
+        if raise_on_error and first_error is not None:
+            raise first_error
+        return results
+
+    def reset(self) -> None:
+        """Discard all queued commands without sending them"""
+        self._commands = []
+        discarded, self._futures = self._futures, []
+        for future in discarded:
+            future.set_exception(ReqlessError("Batch was discarded"))
+
+    def __enter__(self) -> "Batch":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        exc_trace: Optional[TracebackType],
+    ) -> None:
+        if exc_type is None:
+            self.execute()
+        else:
+            self.reset()
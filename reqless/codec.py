@@ -0,0 +1,73 @@
+"""Encoding and decoding the JSON exchanged with the Lua scripts, with the
+standard library unless a faster JSON library is asked for"""
+
+import json
+from typing import Any, Callable, Dict, Optional, Union
+
+
+class JSONCodec:
+    """JSON with the standard library"""
+
+    name: str = "json"
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        return json.dumps(obj)
+
+
+class OrjsonCodec(JSONCodec):
+    """JSON with orjson"""
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+
+        self._loads: Callable[[Union[str, bytes]], Any] = orjson.loads
+        self._dumps: Callable[[Any], bytes] = orjson.dumps
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return self._loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        return self._dumps(obj).decode("utf-8")
+
+
+class MsgspecCodec(JSONCodec):
+    """JSON with msgspec"""
+
+    name = "msgspec"
+
+    def __init__(self) -> None:
+        import msgspec
+
+        self._decoder = msgspec.json.Decoder()
+        self._encoder = msgspec.json.Encoder()
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return self._decoder.decode(data)
+
+    def dumps(self, obj: Any) -> str:
+        result: bytes = self._encoder.encode(obj)
+        return result.decode("utf-8")
+
+
+CODECS: Dict[str, Callable[[], JSONCodec]] = {
+    "json": JSONCodec,
+    "orjson": OrjsonCodec,
+    "msgspec": MsgspecCodec,
+}
+
+
+def get_codec(name: Optional[str] = None) -> JSONCodec:
+    """The named codec, or the standard library's if no name is given. The
+    others encode some data differently, like dicts with keys that aren't
+    strings, so they're only used when asked for. Raises ImportError if the
+    named codec's library isn't installed."""
+    if name is None:
+        return JSONCodec()
+    if name not in CODECS:
+        raise ValueError("Unknown JSON codec %s" % name)
+    return CODECS[name]()
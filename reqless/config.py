@@ -1,10 +1,24 @@
 """All our configuration operations"""
 
-import json
-from typing import Any, Dict, ItemsView, Iterable, Iterator, KeysView, ValuesView
+import os
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import (
+    Any,
+    Dict,
+    ItemsView,
+    Iterable,
+    Iterator,
+    KeysView,
+    Optional,
+    ValuesView,
+)
 
 from reqless.abstract.abstract_client import AbstractClient
 from reqless.abstract.abstract_config import AbstractConfig
+from reqless.listener import Listener
+from reqless.logger import logger
 
 
 class Config(AbstractConfig):
@@ -15,18 +29,23 @@ class Config(AbstractConfig):
 
     @property
     def all(self) -> Dict[str, Any]:
-        response: Dict[str, Any] = json.loads(self._client("config.getAll"))
+        response: Dict[str, Any] = self._client.codec.loads(
+            self._client("config.getAll")
+        )
         return response
 
     def __len__(self) -> int:
         return len(self.all)
 
     def __getitem__(self, option: str) -> Any:
-        result = self._client("config.get", option)
+        return self._decode(self._client("config.get", option))
+
+    def _decode(self, result: Any) -> Any:
+        """Decode a config value"""
         if not result:
             return None
         try:
-            return json.loads(result)
+            return self._client.codec.loads(result)
         except TypeError:
             return result
 
@@ -76,3 +95,90 @@ class Config(AbstractConfig):
     def values(self) -> ValuesView:
         """Just like `dict.values`"""
         return self.all.values()
+
+
+class CachedConfig(Config):
+    """Config that's read from a local copy of all of it. The copy is dropped
+    whenever any client changes the config, which the server announces on the
+    `ql:config` channel, and after `ttl` seconds in case an announcement is
+    missed. Changes made through this client drop it right away."""
+
+    channel = "ql:config"
+
+    def __init__(self, client: AbstractClient, ttl: float = 60.0):
+        super().__init__(client)
+        self.ttl: float = ttl
+        self._cache: Optional[Dict[str, Any]] = None
+        self._expires_at: float = 0.0
+        # Bumped on every invalidation, so that a copy fetched while the
+        # config changed isn't kept
+        self._generation: int = 0
+        self._lock: threading.Lock = threading.Lock()
+        # The process the listener thread was started in, since it doesn't
+        # survive forking
+        self._listener_pid: Optional[int] = None
+
+    @property
+    def all(self) -> Dict[str, Any]:
+        cache = self._cache
+        if cache is not None and time.time() < self._expires_at:
+            return cache
+        self._ensure_listening()
+        generation = self._generation
+        cache = super().all
+        with self._lock:
+            if generation == self._generation:
+                self._cache = cache
+                self._expires_at = time.time() + self.ttl
+        return cache
+
+    def invalidate(self) -> None:
+        """Drop the local copy of the config"""
+        with self._lock:
+            self._generation += 1
+            self._cache = None
+
+    def _ensure_listening(self) -> None:
+        """Start listening for config changes in a background thread, if this
+        process isn't already"""
+        pid = os.getpid()
+        if self._listener_pid == pid:
+            return
+        with self._lock:
+            if self._listener_pid == pid:
+                return
+            self._listener_pid = pid
+        listener = Listener(database=self._client.database, channels=[self.channel])
+        thread = threading.Thread(
+            target=self._listen, args=(listener,), name="reqless-config", daemon=True
+        )
+        thread.start()
+        try:
+            listener.wait_until_listening(timeout=5.0)
+        except FutureTimeoutError:
+            logger.warning("Timed out waiting to listen for config changes")
+
+    def _listen(self, listener: Listener) -> None:
+        try:
+            for _ in listener.listen():
+                self.invalidate()
+        except Exception:
+            # The ttl still bounds how stale the config can get
+            logger.exception("Stopped listening for config changes")
+            with self._lock:
+                self._listener_pid = None
+
+    def __getitem__(self, option: str) -> Any:
+        return self._decode(self.all.get(option))
+
+    def __setitem__(self, option: str, value: Any) -> None:
+        super().__setitem__(option, value)
+        self.invalidate()
+
+    def __delitem__(self, option: str) -> None:
+        super().__delitem__(option)
+        self.invalidate()
+
+    def clear(self) -> None:
+        super().clear()
+        self.invalidate()
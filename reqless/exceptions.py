@@ -11,3 +11,9 @@ class LostLockError(ReqlessError):
     """Lost lock on a job"""
 
     pass
+
+
+class CrossShardError(ReqlessError):
+    """A job can't be moved to a queue on another shard"""
+
+    pass
@@ -0,0 +1,84 @@
+"""Loading the reqless Lua library as a Redis function library"""
+
+import hashlib
+from typing import List, Tuple
+
+from redis import Redis, ResponseError
+
+
+# Everything from here on in reqless.lua dispatches a single EVALSHA call
+DISPATCH_MARKER = "\nif #KEYS > 0 then"
+
+# When each reqless library on the server was last loaded
+LIBRARIES_KEY = "ql:functions"
+
+# How long a library can go without being loaded before it's deleted
+LIBRARY_MAX_AGE = 24 * 60 * 60
+
+
+def build_library(script: bytes) -> Tuple[str, str]:
+    """Turn the reqless script into a function library, returning the name of
+    the function that dispatches commands and the code to load. The library
+    and function are named after the script's digest, so that clients with
+    different versions of the script can share a server."""
+    source = script.decode("utf-8")
+    index = source.rfind(DISPATCH_MARKER)
+    if index == -1:
+        raise ValueError("Unable to find the command dispatch in reqless.lua")
+
+    name = "reqless_" + hashlib.sha1(script).hexdigest()
+    code = "\n".join(
+        [
+            "#!lua name=" + name,
+            source[:index],
+            "redis.register_function('" + name + "', function(keys, args)",
+            "  if #keys > 0 then error('No Keys should be provided') end",
+            "  local command_name = assert(table.remove(args, 1),",
+            "    'Must provide a command')",
+            "  local command = assert(",
+            "    ReqlessAPI[command_name], 'Unknown command ' .. command_name)",
+            "  -- The library's state outlives each call, unlike a script's",
+            "  Reqless.config.forget()",
+            "  Reqless.available = {}",
+            "  local now = tonumber(table.remove(args, 1))",
+            "  now = assert(",
+            "    now, 'Arg \"now\" missing or not a number: ' .. (now or 'nil'))",
+            "  return command(now, unpack(args))",
+            "end)",
+            "",
+        ]
+    )
+    return name, code
+
+
+def prune_libraries(
+    database: Redis, name: str, now: float, max_age: float = LIBRARY_MAX_AGE
+) -> List[str]:
+    """Record that the library `name` was just loaded, and delete the other
+    reqless libraries that no client has loaded in `max_age` seconds, so that
+    libraries of old versions of the script don't pile up. A client that's
+    still using a deleted library loads it again when it finds it missing.
+    Returns the names of the libraries that were deleted."""
+    loaded = database.hgetall(LIBRARIES_KEY)
+    loaded[name] = now
+    # Libraries loaded before we kept track start aging now
+    for library in database.execute_command("FUNCTION", "LIST"):
+        info = dict(zip(library[::2], library[1::2]))
+        if info["library_name"].startswith("reqless_"):
+            loaded.setdefault(info["library_name"], now)
+    database.hset(LIBRARIES_KEY, mapping=loaded)
+
+    stale = [
+        library
+        for library, at in loaded.items()
+        if library != name and float(at) < now - max_age
+    ]
+    for library in stale:
+        try:
+            database.execute_command("FUNCTION", "DELETE", library)
+        except ResponseError:
+            # Another client deleted it first
+            pass
+    if stale:
+        database.hdel(LIBRARIES_KEY, *stale)
+    return stale
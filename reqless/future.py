@@ -24,3 +24,8 @@ class Future(Generic[T]):
     def set_result(self, result: T) -> None:
         """Set the result of the future."""
         self._future.set_result(result)
+
+    def set_exception(self, exception: BaseException) -> None:
+        """Resolve the future with an exception that will be raised by any
+        subsequent call to `result`."""
+        self._future.set_exception(exception)
@@ -1,9 +1,8 @@
 """Both the regular Job and RecurringJob classes"""
 
-import json
 import time
 import traceback
-from typing import Any, Dict, List, Optional, Type, Union
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, Union
 
 from reqless.abstract import (
     AbstractBaseJob,
@@ -12,41 +11,154 @@ from reqless.abstract import (
     AbstractQueue,
     AbstractRecurringJob,
 )
+from reqless.codec import JSONCodec
 from reqless.exceptions import LostLockError, ReqlessError
 from reqless.importer import Importer
 from reqless.logger import logger
 
 
+# The fields of a job that are needed to process it. Lite jobs leave out its
+# history, dependents and dependencies, which can be large.
+LITE_FIELDS: Tuple[str, ...] = (
+    "jid",
+    "klass",
+    "state",
+    "queue",
+    "worker",
+    "tracked",
+    "priority",
+    "expires",
+    "retries",
+    "remaining",
+    "data",
+    "tags",
+    "failure",
+    "throttles",
+    "spawned_from_jid",
+)
+
+
+def encode_fields(
+    codec: JSONCodec, fields: Optional[Iterable[str]] = None, lite: bool = False
+) -> str:
+    """The argument that limits the fields of the job records returned by
+    commands like `queue.pop`. It's empty to return every field."""
+    if lite:
+        fields = LITE_FIELDS + tuple(fields or ())
+    if fields is None:
+        return ""
+    return codec.dumps(list(fields))
+
+
+def move_args(
+    codec: JSONCodec,
+    worker_name: str,
+    queue: str,
+    jid: str,
+    klass_name: str,
+    data: str,
+    delay: Optional[int] = 0,
+    depends: Optional[List[str]] = None,
+    throttles: Optional[List[str]] = None,
+) -> Tuple[Any, ...]:
+    """The arguments of the `queue.put` that moves a job to another queue"""
+    return (
+        "queue.put",
+        worker_name,
+        queue,
+        jid,
+        klass_name,
+        data,
+        delay,
+        "depends",
+        codec.dumps(depends or []),
+        "throttles",
+        codec.dumps(throttles or []),
+    )
+
+
+def complete_args(
+    codec: JSONCodec,
+    jid: str,
+    worker_name: str,
+    queue_name: str,
+    data: str,
+    next_queue: Optional[str] = None,
+    delay: Optional[int] = None,
+    depends: Optional[List[str]] = None,
+) -> Tuple[Any, ...]:
+    """The arguments of the command that completes a job, advancing it to
+    `next_queue` if there is one"""
+    if next_queue:
+        return (
+            "job.completeAndRequeue",
+            jid,
+            worker_name,
+            queue_name,
+            data,
+            next_queue,
+            "delay",
+            delay or 0,
+            "depends",
+            codec.dumps(depends or []),
+        )
+    return ("job.complete", jid, worker_name, queue_name, data)
+
+
+def retry_args(
+    jid: str,
+    queue_name: str,
+    worker_name: str,
+    delay: int = 0,
+    group: Optional[str] = None,
+    message: Optional[str] = None,
+) -> Tuple[Any, ...]:
+    """The arguments of `job.retry`"""
+    args: Tuple[Any, ...] = ("job.retry", jid, queue_name, worker_name, str(delay))
+    if group is not None and message is not None:
+        args += (group, message)
+    return args
+
+
 class BaseJob(AbstractBaseJob):
+    # Jobs are often created by the hundred just to be listed, so rather than
+    # copying every field into an instance dict, they keep the record they
+    # were decoded from and read fields from it as they're accessed
+    __slots__ = ("client", "_klass", "_queue", "_record", "_sandbox")
+
     def __init__(self, client: AbstractClient, **kwargs: Any):
         self.client: AbstractClient = client
-        self._data: str = kwargs["data"]
-        self._jid: str = kwargs["jid"]
         self._klass: Optional[Type] = None
-        self._klass_name: str = kwargs["klass"]
-        self._priority: int = kwargs["priority"]
         self._queue: Optional[AbstractQueue] = None
-        self._queue_name: str = kwargs["queue"]
+        self._record: Dict[str, Any] = kwargs
         self._sandbox: Optional[str] = None
-        # Because of how Lua parses JSON, empty tags comes through as {}
-        self._tags: List[str] = kwargs.get("tags") or []
-        self._throttles: List[str] = kwargs.get("throttles") or []
+
+    def _list(self, key: str) -> List[Any]:
+        """A list field of the record, raising a KeyError like other fields if
+        it was left out. Because of how Lua parses JSON, empty lists come
+        through as {}, so they're replaced on first access."""
+        value = self._record[key]
+        if not isinstance(value, list):
+            value = self._record[key] = []
+        return value
 
     @property
     def data(self) -> str:
-        return self._data
+        data: str = self._record["data"]
+        return data
 
     @data.setter
     def data(self, value: str) -> None:
-        self._data = value
+        self._record["data"] = value
 
     @property
     def jid(self) -> str:
-        return self._jid
+        jid: str = self._record["jid"]
+        return jid
 
     @jid.setter
     def jid(self, value: str) -> None:
-        self._jid = value
+        self._record["jid"] = value
 
     @property
     def klass(self) -> Type:
@@ -59,24 +171,26 @@ class BaseJob(AbstractBaseJob):
     def klass(self, value: Type) -> None:
         self._klass = value
         name = value.__module__ + "." + value.__name__
-        self._klass_name = name
+        self._record["klass"] = name
 
     @property
     def klass_name(self) -> str:
-        return self._klass_name
+        klass_name: str = self._record["klass"]
+        return klass_name
 
     @klass_name.setter
     def klass_name(self, value: str) -> None:
-        self._klass_name = value
+        self._record["klass"] = value
 
     @property
     def priority(self) -> int:
-        return self._priority
+        priority: int = self._record["priority"]
+        return priority
 
     @priority.setter
     def priority(self, value: int) -> None:
         self.client("job.setPriority", self.jid, value)
-        self._priority = value
+        self._record["priority"] = value
 
     @property
     def queue(self) -> AbstractQueue:
@@ -86,11 +200,12 @@ class BaseJob(AbstractBaseJob):
 
     @property
     def queue_name(self) -> str:
-        return self._queue_name
+        queue_name: str = self._record["queue"]
+        return queue_name
 
     @queue_name.setter
     def queue_name(self, value: str) -> None:
-        self._queue_name = value
+        self._record["queue"] = value
 
     @property
     def sandbox(self) -> Optional[str]:
@@ -102,19 +217,19 @@ class BaseJob(AbstractBaseJob):
 
     @property
     def tags(self) -> List[str]:
-        return self._tags
+        return self._list("tags")
 
     @tags.setter
     def tags(self, value: List[str]) -> None:
-        self._tags = value
+        self._record["tags"] = value
 
     @property
     def throttles(self) -> List[str]:
-        return self._throttles
+        return self._list("throttles")
 
     @throttles.setter
     def throttles(self, value: List[str]) -> None:
-        self._throttles = value
+        self._record["throttles"] = value
 
     def cancel(self) -> List[str]:
         """Cancel a job. It will be deleted from the system, the thinking
@@ -126,77 +241,80 @@ class BaseJob(AbstractBaseJob):
     def tag(self, *tags: str) -> List[str]:
         """Tag a job with additional tags"""
         response_json: str = self.client("job.addTag", self.jid, *tags)
-        response: List[str] = json.loads(response_json)
+        response: List[str] = self.client.codec.loads(response_json)
         return response
 
     def untag(self, *tags: str) -> List[str]:
         """Remove tags from a job"""
         response_json: str = self.client("job.removeTag", self.jid, *tags)
-        response: List[str] = json.loads(response_json)
+        response: List[str] = self.client.codec.loads(response_json)
         return response
 
 
 class Job(BaseJob, AbstractJob):
     """The Job class"""
 
+    __slots__ = ("_halted",)
+
     def __init__(self, client: AbstractClient, **kwargs: Any):
         super().__init__(client, **kwargs)
-        self.client: AbstractClient = client
-        self._state: str = kwargs["state"]
-        self._failure: Optional[Dict] = kwargs["failure"]
-        # Because of how Lua parses JSON, empty lists come through as {}
-        self._dependents: List[str] = kwargs["dependents"] or []
-        self._dependencies: List[str] = kwargs["dependencies"] or []
-        self._tracked: bool = kwargs["tracked"]
-        self._worker_name: str = kwargs["worker"]
-        self._retries_left: int = kwargs["remaining"]
-        self._expires_at: float = kwargs["expires"]
-        self._original_retires: int = kwargs["retries"]
-        self._history: List[Dict] = kwargs["history"] or []
+        # Set when whatever is processing this job should stop
+        self._halted: bool = False
 
     @property
     def dependencies(self) -> List[str]:
-        return self._dependencies
+        return self._list("dependencies")
 
     @dependencies.setter
     def dependencies(self, value: List[str]) -> None:
-        self._dependencies = value
+        self._record["dependencies"] = value
 
     @property
     def dependents(self) -> List[str]:
-        return self._dependents
+        """The jobs that depend on this one. Once it's complete, these are
+        the dependents that are still to be released."""
+        return self._list("dependents")
 
     @property
     def expires_at(self) -> float:
-        return self._expires_at
+        expires_at: float = self._record["expires"]
+        return expires_at
 
     @expires_at.setter
     def expires_at(self, value: float) -> None:
-        self._expires_at = value
+        self._record["expires"] = value
 
     @property
     def failure(self) -> Optional[Dict]:
-        return self._failure
+        failure: Optional[Dict] = self._record["failure"]
+        return failure
 
     @failure.setter
     def failure(self, value: Optional[Dict]) -> None:
-        self._failure = value
+        self._record["failure"] = value
 
     @property
     def history(self) -> List[Dict]:
-        return self._history
+        return self._list("history")
+
+    @property
+    def halted(self) -> bool:
+        return self._halted
 
     @property
     def original_retries(self) -> int:
-        return self._original_retires
+        retries: int = self._record["retries"]
+        return retries
 
     @property
     def retries_left(self) -> int:
-        return self._retries_left
+        remaining: int = self._record["remaining"]
+        return remaining
 
     @property
     def state(self) -> str:
-        return self._state
+        state: str = self._record["state"]
+        return state
 
     @property
     def ttl(self) -> float:
@@ -204,11 +322,13 @@ class Job(BaseJob, AbstractJob):
 
     @property
     def tracked(self) -> bool:
-        return self._tracked
+        tracked: bool = self._record["tracked"]
+        return tracked
 
     @property
     def worker_name(self) -> str:
-        return self._worker_name
+        worker_name: str = self._record["worker"]
+        return worker_name
 
     def __repr__(self) -> str:
         return "<%s %s>" % (self.klass_name, self.jid)
@@ -273,17 +393,17 @@ class Job(BaseJob, AbstractJob):
         delay, and dependencies"""
         logger.info("Moving %s to %s from %s", self.jid, queue, self.queue_name)
         response: str = self.client(
-            "queue.put",
-            self.worker_name,
-            queue,
-            self.jid,
-            self.klass_name,
-            self.data,
-            delay,
-            "depends",
-            json.dumps(depends or []),
-            "throttles",
-            json.dumps(self.throttles or []),
+            *move_args(
+                self.client.codec,
+                self.worker_name,
+                queue,
+                self.jid,
+                self.klass_name,
+                self.data,
+                delay,
+                depends,
+                self.throttles,
+            )
         )
         return response
 
@@ -303,34 +423,23 @@ class Job(BaseJob, AbstractJob):
                 next_queue,
                 self.queue_name,
             )
-            return bool(
-                self.client(
-                    "job.completeAndRequeue",
-                    self.jid,
-                    self.client.worker_name,
-                    self.queue_name,
-                    self.data,
-                    "next",
-                    next_queue,
-                    "delay",
-                    delay or 0,
-                    "depends",
-                    json.dumps(depends or []),
-                )
-                or False
-            )
         else:
             logger.info("Completing %s", self.jid)
-            return (
-                self.client(
-                    "job.complete",
+        return bool(
+            self.client(
+                *complete_args(
+                    self.client.codec,
                     self.jid,
                     self.client.worker_name,
                     self.queue_name,
                     self.data,
+                    next_queue,
+                    delay,
+                    depends,
                 )
-                or False
             )
+            or False
+        )
 
     def heartbeat(self) -> float:
         """Renew the heartbeat, if possible, and optionally update the job's
@@ -351,6 +460,13 @@ class Job(BaseJob, AbstractJob):
         logger.debug("Heartbeated %s (ttl = %s)", self.jid, self.ttl)
         return self.expires_at
 
+    def halt(self) -> None:
+        """Ask the code processing this job to stop. Workers that can't
+        interrupt a job, like those running jobs in threads, call this when
+        they lose the job's lock. Long-running jobs should check `halted`
+        periodically and return early once it is set."""
+        self._halted = True
+
     def fail(self, group: str, message: str) -> Union[bool, str]:
         """Mark the particular job as failed, with the provided group, and a
         more specific message. By `group`, we mean some phrase that might be
@@ -398,17 +514,11 @@ class Job(BaseJob, AbstractJob):
     ) -> int:
         """Retry this job in a little bit, in the same queue. This is meant
         for the times when you detect a transient failure yourself"""
-        args: List[str] = [
-            "job.retry",
-            self.jid,
-            self.queue_name,
-            self.worker_name,
-            str(delay),
-        ]
-        if group is not None and message is not None:
-            args.append(group)
-            args.append(message)
-        response: int = self.client(*args)
+        response: int = self.client(
+            *retry_args(
+                self.jid, self.queue_name, self.worker_name, delay, group, message
+            )
+        )
         return response
 
     def depend(self, *args: str) -> bool:
@@ -434,15 +544,12 @@ class Job(BaseJob, AbstractJob):
 class RecurringJob(BaseJob, AbstractRecurringJob):
     """Recurring Job object"""
 
-    def __init__(self, client: AbstractClient, **kwargs: Any):
-        super().__init__(client, **kwargs)
-        self._retries: int = kwargs["retries"]
-        self._interval: int = kwargs["interval"]
-        self._count: int = kwargs["count"]
+    __slots__ = ()
 
     @property
     def count(self) -> int:
-        return self._count
+        count: int = self._record["count"]
+        return count
 
     @count.setter
     def count(self, value: int) -> None:
@@ -450,25 +557,28 @@ class RecurringJob(BaseJob, AbstractRecurringJob):
 
     @property
     def data(self) -> str:
-        return self._data
+        data: str = self._record["data"]
+        return data
 
     @data.setter
     def data(self, value: str) -> None:
-        self._data = value
+        self._record["data"] = value
         self.client("recurringJob.update", self.jid, "data", self.data)
 
     @property
     def interval(self) -> int:
-        return self._interval
+        interval: int = self._record["interval"]
+        return interval
 
     @interval.setter
     def interval(self, value: int) -> None:
-        self._interval = value
+        self._record["interval"] = value
         self.client("recurringJob.update", self.jid, "interval", value)
 
     @property
     def priority(self) -> int:
-        return self._priority
+        priority: int = self._record["priority"]
+        return priority
 
     @priority.setter
     def priority(self, value: int) -> None:
@@ -476,7 +586,8 @@ class RecurringJob(BaseJob, AbstractRecurringJob):
 
     @property
     def retries(self) -> int:
-        return self._retries
+        retries: int = self._record["retries"]
+        return retries
 
     @retries.setter
     def retries(self, value: int) -> None:
@@ -491,7 +602,7 @@ class RecurringJob(BaseJob, AbstractRecurringJob):
         name = value.__module__ + "." + value.__name__
         self.client("recurringJob.update", self.jid, "klass", name)
         self._klass = value
-        self._klass_name = name
+        self._record["klass"] = name
 
     @property
     def next(self) -> Optional[float]:
@@ -1,8 +1,9 @@
 """A class that listens to pubsub channels and can unlisten"""
 
 import logging
+import uuid
 from threading import RLock
-from typing import Any, Dict, Generator, List
+from typing import Any, Dict, Generator, List, Optional
 
 from redis import Redis
 from redis.client import PubSub
@@ -17,8 +18,14 @@ class Listener:
     """A class that listens to pubsub channels and can unlisten"""
 
     def __init__(self, database: Redis, channels: List[str]):
+        self._database: Redis = database
         self._pubsub: PubSub = database.pubsub()
         self._channels: List[str] = channels
+        # The pubsub connection is only used by the listening thread, so when
+        # other threads change the channels or unlisten, it's woken on its own
+        # channel to change its subscriptions to match
+        self._control: str = "ql:listener:" + uuid.uuid4().hex
+        self._subscribed: List[str] = []
         self._lock: RLock = RLock()
         self._listening_future: Future[bool] = Future[bool]()
         self.is_listening: bool = False
@@ -26,28 +33,75 @@ class Listener:
     def listen(self) -> Generator[Dict[str, Any], None, None]:
         """Listen for events as they come in"""
         with self._lock:
-            self._pubsub.subscribe(*self._channels)
+            self._subscribed = list(self._channels)
+            self._pubsub.subscribe(self._control, *self._subscribed)
+            # We can only be woken once the server has subscribed us
+            subscribed = ("subscribe", self._control)
+            message: Optional[Dict[str, Any]] = None
+            while (
+                message is None or (message["type"], message["channel"]) != subscribed
+            ):
+                message = self._pubsub.get_message(
+                    timeout=None  # type: ignore[arg-type]
+                )
             self._listening_future.set_result(True)
             self.is_listening = True
 
         for message in self._pubsub.listen():  # type: ignore[no-untyped-call]
             if message["type"] == "message":
-                yield message
+                if message["channel"] == self._control:
+                    self._resubscribe()
+                else:
+                    yield message
             if not self.is_listening:
                 break
 
-    def wait_until_listening(self) -> None:
+        with self._lock:
+            self._pubsub.unsubscribe(self._control, *self._subscribed)
+
+    def wait_until_listening(self, timeout: Optional[float] = None) -> None:
         """Block until listening has begun. Intended for multi-thread scenarios
         where one thread is listening and another thread wants to know when
-        listening has begun."""
+        listening has begun. Raises `concurrent.futures.TimeoutError` if
+        listening hasn't begun within `timeout` seconds."""
+
+        self._listening_future.result(timeout)
+
+    def subscribe(self, *channels: str) -> None:
+        """Start listening to more channels. This can be called from any
+        thread, and the listening thread subscribes to them shortly after."""
+        with self._lock:
+            channels = tuple(c for c in channels if c not in self._channels)
+            self._channels.extend(channels)
+            if self.is_listening and channels:
+                self._database.publish(self._control, "")
+
+    def unsubscribe(self, *channels: str) -> None:
+        """Stop listening to some of the channels. This can be called from any
+        thread, and the listening thread unsubscribes shortly after."""
+        with self._lock:
+            channels = tuple(c for c in channels if c in self._channels)
+            self._channels = [c for c in self._channels if c not in channels]
+            if self.is_listening and channels:
+                self._database.publish(self._control, "")
 
-        self._listening_future.result()
+    def _resubscribe(self) -> None:
+        """In the listening thread, make the subscriptions match the channels"""
+        with self._lock:
+            added = [c for c in self._channels if c not in self._subscribed]
+            removed = [c for c in self._subscribed if c not in self._channels]
+            if added:
+                self._pubsub.subscribe(*added)
+            # Unsubscribing from nothing would unsubscribe from everything
+            if removed:
+                self._pubsub.unsubscribe(*removed)
+            self._subscribed = list(self._channels)
 
     def unlisten(self) -> None:
         """Stop listening for events"""
         with self._lock:
             if self.is_listening:
-                self._pubsub.unsubscribe(*self._channels)
+                self._database.publish(self._control, "")
                 self.is_listening = False
                 # Reset the future so the listener can listen again.
                 self._listening_future = Future[bool]()
@@ -35,7 +35,10 @@ ReqlessJob.__index = ReqlessJob
 
 -- throttle forward declaration
 local ReqlessThrottle = {
-  ns = Reqless.ns .. 'th:'
+  ns = Reqless.ns .. 'th:',
+  -- Bumped whenever a throttle's settings change, apart from its locks and
+  -- pending jobs, so clients can track just the settings
+  version_ns = Reqless.ns .. 'thv:'
 }
 ReqlessThrottle.__index = ReqlessThrottle
 
@@ -46,6 +49,9 @@ ReqlessRecurringJob.__index = ReqlessRecurringJob
 -- Config forward declaration
 Reqless.config = {}
 
+-- The queues that workers have been told have work during this call
+Reqless.available = {}
+
 -- Extend a table. This comes up quite frequently
 local function table_extend(self, other)
   for _, v in ipairs(other) do
@@ -53,12 +59,129 @@ local function table_extend(self, other)
   end
 end
 
+-- The server's time in seconds, for measuring how long a command has taken.
+-- Unlike `now`, which is the time the command was sent at, this advances.
+function Reqless.clock()
+  local time = redis.call('time')
+  return tonumber(time[1]) + tonumber(time[2]) / 1000000
+end
+
 -- This is essentially the same as redis' publish, but it prefixes the channel
 -- with the Reqless namespace
 function Reqless.publish(channel, message)
   redis.call('publish', Reqless.ns .. channel, message)
 end
 
+-- Tell workers waiting on a queue that a job was added to it. This is only
+-- done while a worker's request to be woken for the queue hasn't expired (see
+-- `ReqlessQueue.wake_on_put`), and only for the first job added to each queue
+-- in a call, however many jobs are added.
+function Reqless.publish_available(now, queue_name, jid)
+  if Reqless.available[queue_name] then
+    return
+  end
+  Reqless.available[queue_name] = true
+  local expires = redis.call('zscore', 'ql:available', queue_name)
+  if expires and tonumber(expires) > now then
+    Reqless.publish('available:' .. queue_name, jid)
+  end
+end
+
+-- Delete up to `limit` completed jobs whose data has expired, either because
+-- they were completed more than `jobs-history` seconds ago, or because they
+-- aren't among the last `jobs-history-count` completed. Returns how many were
+-- deleted, so that callers can tell whether there may be more.
+function Reqless.gc(now, limit)
+  local count = tonumber(Reqless.config.get('jobs-history-count') or 50000)
+  local time  = tonumber(Reqless.config.get('jobs-history') or 7 * 24 * 60 * 60)
+
+  local jids = redis.call(
+    'zrangebyscore', 'ql:completed', 0, now - time, 'LIMIT', 0, limit)
+  for _, jid in ipairs(jids) do
+    Reqless.job(jid):delete()
+    redis.call('zrem', 'ql:completed', jid)
+  end
+  local deleted = #jids
+
+  -- Then the oldest beyond the most recent `count`, with what's left
+  local excess = math.min(
+    redis.call('zcard', 'ql:completed') - count, limit - deleted)
+  if excess > 0 then
+    jids = redis.call('zrange', 'ql:completed', 0, excess - 1)
+    for _, jid in ipairs(jids) do
+      Reqless.job(jid):delete()
+    end
+    redis.call('zremrangebyrank', 'ql:completed', 0, excess - 1)
+    deleted = deleted + #jids
+  end
+
+  return deleted
+end
+
+-- How many dependents of completed jobs to release at once, when completing
+-- a job, and when popping
+function Reqless.release_batch()
+  return tonumber(Reqless.config.get('dependents-release-batch', 100))
+end
+
+-- Release up to `limit` of the dependents of completed jobs that are still
+-- waiting to be released, in the order those jobs completed. Returns how many
+-- were released, so that callers can tell whether there may be more.
+function Reqless.release(now, limit)
+  local released = 0
+  while released < limit do
+    local jid = redis.call('lindex', 'ql:releasing', 0)
+    if not jid then
+      break
+    end
+    released = released + Reqless.job(jid):release_dependents(now, limit - released)
+  end
+  return released
+end
+
+-- Note in the due index that a queue will need housekeeping at `when` (a
+-- scheduled job comes due, a recurring job spawns or a lock expires), if
+-- that's sooner than it already knew of. Entries may be early, since they
+-- aren't moved when a job is removed, but never late.
+function Reqless.due(name, when)
+  local current = redis.call('zscore', 'ql:due', name)
+  if current == false or tonumber(when) < tonumber(current) then
+    redis.call('zadd', 'ql:due', when, name)
+  end
+end
+
+-- Whether popping a queue should first do its housekeeping, which can be
+-- turned off when a maintainer is running `Reqless.maintain`
+function Reqless.maintain_on_pop()
+  return tonumber(Reqless.config.get('maintain-on-pop', 1)) ~= 0
+end
+
+-- Do the housekeeping for the queues in the due index that are due, handling
+-- at most `limit` jobs across them: the locks of dead workers are expired,
+-- expired locks are invalidated and their jobs made available again,
+-- recurring jobs spawned and scheduled jobs made available. Returns how many
+-- jobs were handled, so that callers can tell whether there may be more.
+function Reqless.maintain(now, limit)
+  -- The locks held by workers whose leases have run out are expired first, so
+  -- that their queues' housekeeping below takes care of them
+  local handled = ReqlessWorker.reap(now, limit)
+  local names = redis.call(
+    'zrangebyscore', 'ql:due', '-inf', now, 'LIMIT', 0, limit)
+  for _, name in ipairs(names) do
+    if handled >= limit then
+      break
+    end
+    handled = handled + Reqless.queue(name):maintain(now, limit - handled)
+  end
+  return handled
+end
+
+-- When the next queue is due for housekeeping, or nil if none is
+function Reqless.next_maintenance()
+  local first = redis.call('zrange', 'ql:due', 0, 0, 'WITHSCORES')
+  return first[2]
+end
+
 -- Return a job object given its job id
 function Reqless.job(jid)
   assert(jid, 'Job(): no jid provided')
@@ -436,6 +559,7 @@ function Reqless.cancel(now, ...)
       for _, j in ipairs(redis.call(
         'smembers', ReqlessJob.ns .. jid .. '-dependencies')) do
         redis.call('srem', ReqlessJob.ns .. j .. '-dependents', jid)
+        redis.call('srem', ReqlessJob.ns .. j .. '-releasing', jid)
       end
 
       -- If we're in the failed state, remove all of our data
@@ -466,6 +590,49 @@ function Reqless.cancel(now, ...)
 
   return arg
 end
+
+-- Heartbeat(now, worker, jid, [jid, ...])
+-- ---------------------------------------
+-- Renew the locks that a worker holds on several jobs at once. Returns a table
+-- mapping the jid of each renewed job to its new expiration. Jobs that can't
+-- be renewed, because they no longer exist, aren't running, or were given to
+-- another worker, are left out.
+function Reqless.heartbeat(now, worker, ...)
+  assert(worker, 'Heartbeat(): Arg "worker" missing')
+
+  local renewed = {}
+  for _, jid in ipairs(arg) do
+    local ok, expires = pcall(ReqlessJob.heartbeat, Reqless.job(jid), now, worker)
+    if ok then
+      renewed[jid] = expires
+    end
+  end
+  return renewed
+end
+
+-- Pop(now, worker, limit, queue, [queue, ...])
+-- --------------------------------------------
+-- Pop up to `limit` jobs from several queues at once. The queues are visited in
+-- the order provided, and each is only popped from if the queues before it
+-- didn't have enough jobs to meet the limit. Returns the popped jids.
+function Reqless.pop(now, worker, limit, ...)
+  assert(worker, 'Pop(): Arg "worker" missing')
+  limit = assert(tonumber(limit),
+    'Pop(): Arg "limit" missing or not a number: ' .. tostring(limit))
+
+  local popped = {}
+  for _, queue_name in ipairs(arg) do
+    if #popped >= limit then
+      break
+    end
+    local jids = Reqless.queue(queue_name):pop(now, worker, limit - #popped)
+    for _, jid in ipairs(jids) do
+      table.insert(popped, jid)
+    end
+  end
+  return popped
+end
+
 -------------------------------------------------------------------------------
 -- Configuration interactions
 -------------------------------------------------------------------------------
@@ -486,16 +653,39 @@ Reqless.config.defaults = {
 -- Get one or more of the keys
 Reqless.config.get = function(key, default)
   if key then
-    return redis.call('hget', 'ql:config', key) or
-      Reqless.config.defaults[key] or default
+    local memo = Reqless.config.memo
+    local value = memo and memo[key]
+    if value == nil then
+      value = redis.call('hget', 'ql:config', key)
+      if memo then
+        memo[key] = value
+      end
+    end
+    return value or Reqless.config.defaults[key] or default
   end
 
   -- Inspired by redis-lua https://github.com/nrk/redis-lua/blob/version-2.0/src/redis.lua
+  -- The defaults are copied rather than updated, since as a function library
+  -- they would otherwise keep values that have since been unset
+  local config = {}
+  for key, value in pairs(Reqless.config.defaults) do
+    config[key] = value
+  end
   local reply = redis.call('hgetall', 'ql:config')
   for i = 1, #reply, 2 do
-    Reqless.config.defaults[reply[i]] = reply[i + 1]
+    config[reply[i]] = reply[i + 1]
   end
-  return Reqless.config.defaults
+  return config
+end
+
+-- Remember the values of the keys that are read until `forget` is called, for
+-- commands that would otherwise read the same keys many times over
+Reqless.config.memoize = function()
+  Reqless.config.memo = {}
+end
+
+Reqless.config.forget = function()
+  Reqless.config.memo = nil
 end
 
 -- Set a configuration variable
@@ -508,8 +698,11 @@ Reqless.config.set = function(option, value)
     option = option,
     value  = value
   }))
+  -- Let clients caching the config know that it changed
+  Reqless.publish('config', option)
 
   redis.call('hset', 'ql:config', option, value)
+  Reqless.config.forget()
 end
 
 -- Unset a configuration option
@@ -520,8 +713,10 @@ Reqless.config.unset = function(option)
     event  = 'config_unset',
     option = option
   }))
+  Reqless.publish('config', option)
 
   redis.call('hdel', 'ql:config', option)
+  Reqless.config.forget()
 end
 -------------------------------------------------------------------------------
 -- Job Class
@@ -529,44 +724,113 @@ end
 -- It returns an object that represents the job with the provided JID
 -------------------------------------------------------------------------------
 
--- This gets all the data associated with the job with the provided id. If the
--- job is not found, it returns nil. If found, it returns an object with the
--- appropriate properties
-function ReqlessJob:data(...)
-  local job = redis.call(
-      'hmget', ReqlessJob.ns .. self.jid, 'jid', 'klass', 'state', 'queue',
-      'worker', 'priority', 'expires', 'retries', 'remaining', 'data',
-      'tags', 'failure', 'throttles', 'spawned_from_jid')
+local function identity(value)
+  return value
+end
+
+-- The fields of a job's record that are stored in its hash, and how each is
+-- parsed from what's stored
+ReqlessJob.stored_fields = {
+  jid = identity,
+  klass = identity,
+  state = identity,
+  queue = identity,
+  worker = function(value) return value or '' end,
+  priority = tonumber,
+  expires = function(value) return tonumber(value) or 0 end,
+  retries = tonumber,
+  remaining = function(value) return math.floor(tonumber(value)) end,
+  data = identity,
+  tags = cjson.decode,
+  failure = function(value) return cjson.decode(value or '{}') end,
+  throttles = function(value) return cjson.decode(value or '[]') end,
+  spawned_from_jid = identity,
+}
+
+-- The fields of a job's record that need more than its hash to be found
+ReqlessJob.derived_fields = {
+  tracked = function(job)
+    return redis.call('zscore', 'ql:tracked', job.jid) ~= false
+  end,
+  history = function(job)
+    return job:history()
+  end,
+  dependents = function(job)
+    -- Including those that are still to be released after it completed
+    return redis.call('sunion',
+      ReqlessJob.ns .. job.jid .. '-dependents',
+      ReqlessJob.ns .. job.jid .. '-releasing')
+  end,
+  dependencies = function(job)
+    return redis.call('smembers', ReqlessJob.ns .. job.jid .. '-dependencies')
+  end,
+}
+
+-- Every field of a job's record
+ReqlessJob.fields = {
+  'jid', 'klass', 'state', 'queue', 'worker', 'tracked', 'priority', 'expires',
+  'retries', 'remaining', 'data', 'tags', 'history', 'failure', 'throttles',
+  'spawned_from_jid', 'dependents', 'dependencies',
+}
+
+-- Like data(), but the record only includes the named fields (and the jid),
+-- so that heavy fields like history can be left out. Fields that are left out
+-- aren't looked up at all. Unknown fields are ignored.
+function ReqlessJob:project(fields)
+  local stored = {'jid'}
+  for _, field in ipairs(fields) do
+    if field ~= 'jid' and ReqlessJob.stored_fields[field] then
+      table.insert(stored, field)
+    end
+  end
+
+  local values = redis.call('hmget', ReqlessJob.ns .. self.jid, unpack(stored))
 
   -- Return nil if we haven't found it
-  if not job[1] then
+  if not values[1] then
     return nil
   end
 
-  local data = {
-    jid = job[1],
-    klass = job[2],
-    state = job[3],
-    queue = job[4],
-    worker = job[5] or '',
-    tracked = redis.call('zscore', 'ql:tracked', self.jid) ~= false,
-    priority = tonumber(job[6]),
-    expires = tonumber(job[7]) or 0,
-    retries = tonumber(job[8]),
-    remaining = math.floor(tonumber(job[9])),
-    data = job[10],
-    tags = cjson.decode(job[11]),
-    history = self:history(),
-    failure = cjson.decode(job[12] or '{}'),
-    throttles = cjson.decode(job[13] or '[]'),
-    spawned_from_jid = job[14],
-    dependents = redis.call('smembers', ReqlessJob.ns .. self.jid .. '-dependents'),
-    dependencies = redis.call('smembers', ReqlessJob.ns .. self.jid .. '-dependencies'),
-  }
+  local data = {}
+  for index, field in ipairs(stored) do
+    data[field] = ReqlessJob.stored_fields[field](values[index])
+  end
+  for _, field in ipairs(fields) do
+    local derive = ReqlessJob.derived_fields[field]
+    if derive then
+      data[field] = derive(self)
+    end
+  end
+  return data
+end
+
+-- The record of this job, projected to `fields` if they're provided
+function ReqlessJob:record(fields)
+  if fields then
+    return self:project(fields)
+  end
+  return self:data()
+end
 
+-- Decode a JSON array of the fields to include in job records. A missing or
+-- empty argument means all of them.
+function ReqlessJob.decode_fields(fields)
+  if fields == nil or fields == '' then
+    return nil
+  end
+  return cjson.decode(fields)
+end
+
+-- This gets all the data associated with the job with the provided id. If the
+-- job is not found, it returns nil. If found, it returns an object with the
+-- appropriate properties. If fields are provided, it instead returns a list
+-- of just the values of those fields.
+function ReqlessJob:data(...)
   if #arg > 0 then
-    -- This section could probably be optimized, but I wanted the interface
-    -- in place first
+    local data = self:project(arg)
+    if not data then
+      return nil
+    end
     local response = {}
     for _, key in ipairs(arg) do
       table.insert(response, data[key])
@@ -574,7 +838,7 @@ function ReqlessJob:data(...)
     return response
   end
 
-  return data
+  return self:project(ReqlessJob.fields)
 end
 
 -- Complete a job and optionally put it in another queue, either scheduled or
@@ -682,9 +946,7 @@ function ReqlessJob:complete(now, worker, queue_name, raw_data, ...)
 
     -- We're going to make sure that this queue is in the
     -- set of known queues
-    if redis.call('zscore', 'ql:queues', next_queue_name) == false then
-      redis.call('zadd', 'ql:queues', now, next_queue_name)
-    end
+    ReqlessQueue.register(now, next_queue_name)
 
     redis.call('hmset', ReqlessJob.ns .. self.jid,
       'state', 'waiting',
@@ -742,62 +1004,71 @@ function ReqlessJob:complete(now, worker, queue_name, raw_data, ...)
     'expires', 0,
     'remaining', tonumber(retries))
 
-  -- Do the completion dance
-  local count = Reqless.config.get('jobs-history-count')
-  local time  = Reqless.config.get('jobs-history')
-
-  -- These are the default values
-  count = tonumber(count or 50000)
-  time  = tonumber(time  or 7 * 24 * 60 * 60)
-
   -- Schedule this job for destructination eventually
   redis.call('zadd', 'ql:completed', now, self.jid)
 
-  -- Now look at the expired job data. First, based on the current time
-  local jids = redis.call('zrangebyscore', 'ql:completed', 0, now - time)
-  -- Any jobs that need to be expired... delete
-  for _, jid in ipairs(jids) do
-    Reqless.job(jid):delete()
+  -- Delete only a few expired jobs, so that completing a job never blocks for
+  -- long, no matter how many have expired. This is enough to keep up with
+  -- completions, and `jobs.gc` catches up on any backlog.
+  Reqless.gc(now, tonumber(Reqless.config.get('jobs-gc-on-complete', 2)))
+
+  -- Alright, if this has any dependents, then we should go ahead and unstick
+  -- those guys. There may be very many of them, so they're set aside and
+  -- released a bounded number at a time, starting with a first batch now.
+  local dependents = ReqlessJob.ns .. self.jid .. '-dependents'
+  if redis.call('exists', dependents) == 1 then
+    local releasing = ReqlessJob.ns .. self.jid .. '-releasing'
+    if redis.call('exists', releasing) == 0 then
+      redis.call('rename', dependents, releasing)
+      redis.call('rpush', 'ql:releasing', self.jid)
+    else
+      -- It completed before, and some of those dependents are still waiting
+      redis.call('sunionstore', releasing, releasing, dependents)
+      redis.call('del', dependents)
+    end
+    self:release_dependents(now, Reqless.release_batch())
   end
 
-  -- And now remove those from the queued-for-cleanup queue
-  redis.call('zremrangebyscore', 'ql:completed', 0, now - time)
-
-  -- Now take the all by the most recent 'count' ids
-  jids = redis.call('zrange', 'ql:completed', 0, (-1-count))
-  for _, jid in ipairs(jids) do
-    Reqless.job(jid):delete()
-  end
-  redis.call('zremrangebyrank', 'ql:completed', 0, (-1-count))
+  return 'complete'
+end
 
-  -- Alright, if this has any dependents, then we should go ahead
-  -- and unstick those guys.
-  for _, j in ipairs(redis.call(
-    'smembers', ReqlessJob.ns .. self.jid .. '-dependents')) do
+-- Release up to `limit` of the dependents set aside when this job completed,
+-- queueing each one that no longer depends on anything. Returns how many were
+-- released.
+function ReqlessJob:release_dependents(now, limit)
+  local releasing = ReqlessJob.ns .. self.jid .. '-releasing'
+  local dependents = redis.call('spop', releasing, limit)
+  for _, j in ipairs(dependents) do
     redis.call('srem', ReqlessJob.ns .. j .. '-dependencies', self.jid)
-    if redis.call(
-      'scard', ReqlessJob.ns .. j .. '-dependencies') == 0 then
-      local other_queue_name, priority, scheduled = unpack(
-        redis.call('hmget', ReqlessJob.ns .. j, 'queue', 'priority', 'scheduled'))
-      if other_queue_name then
-        local other_queue = Reqless.queue(other_queue_name)
-        other_queue.depends.remove(j)
-        if scheduled then
-          other_queue.scheduled.add(scheduled, j)
-          redis.call('hset', ReqlessJob.ns .. j, 'state', 'scheduled')
-          redis.call('hdel', ReqlessJob.ns .. j, 'scheduled')
-        else
-          other_queue.work.add(now, priority, j)
-          redis.call('hset', ReqlessJob.ns .. j, 'state', 'waiting')
-        end
+    local state, other_queue_name, priority, scheduled = unpack(
+      redis.call('hmget', ReqlessJob.ns .. j,
+        'state', 'queue', 'priority', 'scheduled'))
+    -- While it was waiting to be released, the dependent may have been put
+    -- again, moved, cancelled or stopped depending on anything, so it's only
+    -- queued if it's still waiting on its dependencies in its queue
+    local other_queue = other_queue_name and Reqless.queue(other_queue_name)
+    if state == 'depends' and other_queue
+      and other_queue.depends.score(j)
+      and redis.call(
+        'scard', ReqlessJob.ns .. j .. '-dependencies') == 0 then
+      other_queue.depends.remove(j)
+      if scheduled then
+        other_queue.scheduled.add(scheduled, j)
+        redis.call('hset', ReqlessJob.ns .. j, 'state', 'scheduled')
+        redis.call('hdel', ReqlessJob.ns .. j, 'scheduled')
+      else
+        other_queue.work.add(now, priority, j)
+        redis.call('hset', ReqlessJob.ns .. j, 'state', 'waiting')
       end
     end
   end
 
-  -- Delete our dependents key
-  redis.call('del', ReqlessJob.ns .. self.jid .. '-dependents')
-
-  return 'complete'
+  -- Once they've all been released (spop deletes the emptied set), this job
+  -- is no longer waiting for its dependents to be released
+  if redis.call('exists', releasing) == 0 then
+    redis.call('lrem', 'ql:releasing', 1, self.jid)
+  end
+  return #dependents
 end
 
 -- Fail(now, worker, group, message, [data])
@@ -1071,6 +1342,7 @@ function ReqlessJob:depends(now, command, ...)
     for _, j in ipairs(redis.call(
       'smembers', ReqlessJob.ns .. self.jid .. '-dependencies')) do
       redis.call('srem', ReqlessJob.ns .. j .. '-dependents', self.jid)
+      redis.call('srem', ReqlessJob.ns .. j .. '-releasing', self.jid)
     end
     redis.call('del', ReqlessJob.ns .. self.jid .. '-dependencies')
     local queue_name, priority = unpack(redis.call(
@@ -1084,6 +1356,7 @@ function ReqlessJob:depends(now, command, ...)
   else
     for _, j in ipairs(arg) do
       redis.call('srem', ReqlessJob.ns .. j .. '-dependents', self.jid)
+      redis.call('srem', ReqlessJob.ns .. j .. '-releasing', self.jid)
       redis.call(
         'srem', ReqlessJob.ns .. self.jid .. '-dependencies', j)
       if redis.call('scard',
@@ -1286,20 +1559,51 @@ function ReqlessJob:history(now, what, item)
   end
 
   -- Append to the history. If the length of the history should be limited,
-  -- then we'll truncate it.
+  -- then we'll collapse the oldest entries into a summary once it's full.
   local count = tonumber(Reqless.config.get('max-job-history', 100))
   if count > 0 then
-    -- We'll always keep the first item around
-    local obj = redis.call('lpop', ReqlessJob.ns .. self.jid .. '-history')
-    redis.call('ltrim', ReqlessJob.ns .. self.jid .. '-history', -count + 2, -1)
-    if obj ~= nil and obj ~= false then
-      redis.call('lpush', ReqlessJob.ns .. self.jid .. '-history', obj)
-    end
+    self:collapse_history(math.max(count, 3) - 1)
   end
   return redis.call('rpush', ReqlessJob.ns .. self.jid .. '-history',
     cjson.encode({math.floor(now), what, item}))
 end
 
+-- Make room in this job's history so that it has at most `count` entries.
+-- The first entry is always kept, and is followed by a 'collapsed' entry
+-- that counts the entries dropped since, by what they were, and when the
+-- earliest and latest of them happened. Only the entries being dropped are
+-- decoded, so this is cheap however long the history is.
+function ReqlessJob:collapse_history(count)
+  local key = ReqlessJob.ns .. self.jid .. '-history'
+  local length = redis.call('llen', key)
+  if length <= count then
+    return
+  end
+
+  local first = redis.call('lindex', key, 0)
+  local head = 1
+  local summary = {count = 0, counts = {}}
+  local second = cjson.decode(redis.call('lindex', key, 1))
+  if second[2] == 'collapsed' then
+    head = 2
+    summary = second[3]
+  end
+
+  -- Keep the first entry, the summary and the most recent entries
+  local drop = length - count + (head == 1 and 1 or 0)
+  local last = nil
+  for _, value in ipairs(redis.call('lrange', key, head, head + drop - 1)) do
+    value = cjson.decode(value)
+    summary.first = summary.first or value[1]
+    summary.count = summary.count + 1
+    summary.counts[value[2]] = (summary.counts[value[2]] or 0) + 1
+    last = value[1]
+  end
+
+  redis.call('ltrim', key, head + drop, -1)
+  redis.call('lpush', key, cjson.encode({last, 'collapsed', summary}), first)
+end
+
 function ReqlessJob:throttles_release(now)
   local throttles = redis.call('hget', ReqlessJob.ns .. self.jid, 'throttles')
   throttles = cjson.decode(throttles or '[]')
@@ -1423,8 +1727,11 @@ function Reqless.queue(name)
         return redis.call('zrem', queue:prefix('work'), unpack(arg))
       end
     end, add = function(now, priority, jid)
-      return redis.call('zadd',
+      local added = redis.call('zadd',
         queue:prefix('work'), priority - (now / 10000000000), jid)
+      -- Wake up any workers waiting on work in this queue
+      Reqless.publish_available(now, queue.name, jid)
+      return added
     end, score = function(jid)
       return redis.call('zscore', queue:prefix('work'), jid)
     end, length = function()
@@ -1442,6 +1749,7 @@ function Reqless.queue(name)
         now, math.huge, 'LIMIT', offset, limit)
     end, add = function(expires, jid)
       redis.call('zadd', queue:prefix('locks'), expires, jid)
+      Reqless.due(queue.name, expires)
     end, remove = function(...)
       if #arg > 0 then
         return redis.call('zrem', queue:prefix('locks'), unpack(arg))
@@ -1470,6 +1778,8 @@ function Reqless.queue(name)
       if #arg > 0 then
         return redis.call('zrem', queue:prefix('depends'), unpack(arg))
       end
+    end, score = function(jid)
+      return redis.call('zscore', queue:prefix('depends'), jid)
     end, length = function()
       return redis.call('zcard', queue:prefix('depends'))
     end
@@ -1505,6 +1815,7 @@ function Reqless.queue(name)
         queue:prefix('scheduled'), 0, now, 'LIMIT', offset, limit)
     end, add = function(when, jid)
       redis.call('zadd', queue:prefix('scheduled'), when, jid)
+      Reqless.due(queue.name, when)
     end, remove = function(...)
       if #arg > 0 then
         return redis.call('zrem', queue:prefix('scheduled'), unpack(arg))
@@ -1522,12 +1833,14 @@ function Reqless.queue(name)
     end, ready = function(now, offset, limit)
     end, add = function(when, jid)
       redis.call('zadd', queue:prefix('recur'), when, jid)
+      Reqless.due(queue.name, when)
     end, remove = function(...)
       if #arg > 0 then
         return redis.call('zrem', queue:prefix('recur'), unpack(arg))
       end
     end, update = function(increment, jid)
-      redis.call('zincrby', queue:prefix('recur'), increment, jid)
+      Reqless.due(queue.name,
+        redis.call('zincrby', queue:prefix('recur'), increment, jid))
     end, score = function(jid)
       return redis.call('zscore', queue:prefix('recur'), jid)
     end, length = function()
@@ -1725,7 +2038,11 @@ function ReqlessQueue:pop(now, worker, limit)
   -- Make sure we this worker to the list of seen workers
   redis.call('zadd', 'ql:workers', now, worker)
 
-  local dead_jids = self:invalidate_locks(now, limit) or {}
+  local maintain = Reqless.maintain_on_pop()
+  local dead_jids = {}
+  if maintain then
+    dead_jids = self:invalidate_locks(now, limit) or {}
+  end
   local popped = {}
 
   for _, jid in ipairs(dead_jids) do
@@ -1744,15 +2061,18 @@ function ReqlessQueue:pop(now, worker, limit)
   -- Now we've checked __all__ the locks for this queue the could
   -- have expired, and are no more than the number requested.
 
-  -- If we still need jobs in order to meet demand, then we should
-  -- look for all the recurring jobs that need jobs run
-  self:check_recurring(now, limit - #dead_jids)
+  -- Unless a maintainer is taking care of it, if we still need jobs in
+  -- order to meet demand, then we should look for all the recurring jobs
+  -- that need jobs run
+  if maintain then
+    self:check_recurring(now, limit - #dead_jids)
 
-  -- If we still need values in order to meet the demand, then we
-  -- should check if any scheduled items, and if so, we should
-  -- insert them to ensure correctness when pulling off the next
-  -- unit of work.
-  self:check_scheduled(now, limit - #dead_jids)
+    -- If we still need values in order to meet the demand, then we
+    -- should check if any scheduled items, and if so, we should
+    -- insert them to ensure correctness when pulling off the next
+    -- unit of work.
+    self:check_scheduled(now, limit - #dead_jids)
+  end
 
   -- With these in place, we can expand this list of jids based on the work
   -- queue itself and the priorities therein
@@ -1957,6 +2277,7 @@ function ReqlessQueue:put(now, worker, jid, klass, raw_data, delay, ...)
       if new[dep] == nil then
         -- Remove k as a dependency
         redis.call('srem', ReqlessJob.ns .. dep .. '-dependents'  , jid)
+        redis.call('srem', ReqlessJob.ns .. dep .. '-releasing'  , jid)
         redis.call('srem', ReqlessJob.ns .. jid .. '-dependencies', dep)
       end
     end
@@ -2093,9 +2414,7 @@ function ReqlessQueue:put(now, worker, jid, klass, raw_data, delay, ...)
   -- Lastly, we're going to make sure that this item is in the
   -- set of known queues. We should keep this sorted by the
   -- order in which we saw each of these queues
-  if redis.call('zscore', 'ql:queues', self.name) == false then
-    redis.call('zadd', 'ql:queues', now, self.name)
-  end
+  ReqlessQueue.register(now, self.name)
 
   if redis.call('zscore', 'ql:tracked', jid) ~= false then
     Reqless.publish('put', jid)
@@ -2104,6 +2423,52 @@ function ReqlessQueue:put(now, worker, jid, klass, raw_data, delay, ...)
   return jid
 end
 
+-- PutMulti(now, worker, jobs, [budget])
+-- ------------------------------------
+-- Insert several jobs into the queue in a single invocation. `jobs` is a JSON
+-- array of objects, each with the `jid`, `klass`, `data` and `delay` of a job
+-- and, optionally, its `priority`, `tags`, `retries`, `depends` and
+-- `throttles`. Returns the jids of the jobs that were put, in the order they
+-- were provided. If a `budget` (in seconds) is given, no more jobs are put
+-- once it has been used up, so that the caller can send the rest in another
+-- call; at least one job is always put. The config is only read once.
+function ReqlessQueue:putMulti(now, worker, raw_jobs, budget)
+  local jobs = assert(cjson.decode(raw_jobs),
+    'PutMulti(): Arg "jobs" missing or not JSON: ' .. tostring(raw_jobs))
+  budget = assert(tonumber(budget or 0),
+    'PutMulti(): Arg "budget" not a number: ' .. tostring(budget))
+
+  local deadline = nil
+  if budget > 0 then
+    deadline = Reqless.clock() + budget
+  end
+
+  Reqless.config.memoize()
+  local jids = {}
+  for _, job in ipairs(jobs) do
+    local options = {}
+    for _, key in ipairs({'priority', 'retries'}) do
+      if job[key] ~= nil then
+        table.insert(options, key)
+        table.insert(options, job[key])
+      end
+    end
+    for _, key in ipairs({'tags', 'depends', 'throttles'}) do
+      if job[key] ~= nil then
+        table.insert(options, key)
+        table.insert(options, cjson.encode(job[key]))
+      end
+    end
+    table.insert(jids, self:put(now, worker, job.jid, job.klass, job.data,
+      job.delay or 0, unpack(options)))
+    if deadline and Reqless.clock() >= deadline then
+      break
+    end
+  end
+  Reqless.config.forget()
+  return jids
+end
+
 -- Move `count` jobs out of the failed state and into this queue
 function ReqlessQueue:unfail(now, group, count)
   assert(group, 'Unfail(): Arg "group" missing')
@@ -2219,9 +2584,7 @@ function ReqlessQueue:recurAtInterval(now, jid, klass, raw_data, interval, offse
   -- Lastly, we're going to make sure that this item is in the
   -- set of known queues. We should keep this sorted by the
   -- order in which we saw each of these queues
-  if redis.call('zscore', 'ql:queues', self.name) == false then
-    redis.call('zadd', 'ql:queues', now, self.name)
-  end
+  ReqlessQueue.register(now, self.name)
 
   return jid
 end
@@ -2231,6 +2594,36 @@ function ReqlessQueue:length()
   return  self.locks.length() + self.work.length() + self.scheduled.length()
 end
 
+-- Return when, after `now`, a job in this queue will next become available
+-- without anything else happening: when the next scheduled job is due, the
+-- next recurring job is spawned, or the next lock expires. Returns nil if
+-- nothing is pending.
+function ReqlessQueue:next_due(now)
+  local due = nil
+  for _, group in ipairs({'scheduled', 'recur', 'locks'}) do
+    local first = redis.call('zrangebyscore', self:prefix(group),
+      '(' .. now, '+inf', 'WITHSCORES', 'LIMIT', 0, 1)
+    if first[2] and (due == nil or tonumber(first[2]) < tonumber(due)) then
+      due = first[2]
+    end
+  end
+  return due
+end
+
+-- Ask for workers to be woken when jobs are added to any of these queues,
+-- until `ttl` seconds after `now`. Workers keep asking for as long as they're
+-- waiting, so that producers stop publishing once they've gone.
+function ReqlessQueue.wake_on_put(now, ttl, ...)
+  local expires = now + ttl
+  for _, name in ipairs(arg) do
+    local current = redis.call('zscore', 'ql:available', name)
+    if not current or tonumber(current) < expires then
+      redis.call('zadd', 'ql:available', expires, name)
+    end
+  end
+  redis.call('zremrangebyscore', 'ql:available', '-inf', now)
+end
+
 -------------------------------------------------------------------------------
 -- Housekeeping methods
 -------------------------------------------------------------------------------
@@ -2242,10 +2635,10 @@ function ReqlessQueue:remove_job(jid)
   self.scheduled.remove(jid)
 end
 
--- Instantiate any recurring jobs that are ready
+-- Instantiate any recurring jobs that are ready, returning how many were
 function ReqlessQueue:check_recurring(now, count)
   if count <= 0 then
-    return
+    return 0
   end
   -- This is how many jobs we've moved so far
   local moved = 0
@@ -2321,14 +2714,15 @@ function ReqlessQueue:check_recurring(now, count)
       self.recurring.add(score, jid)
     end
   end
+  return moved
 end
 
 -- Check for any jobs that have been scheduled, and shovel them onto
--- the work queue. Returns nothing, but afterwards, up to `count`
--- scheduled jobs will be moved into the work queue
+-- the work queue. Afterwards, up to `count` scheduled jobs will have
+-- been moved into the work queue, and it returns how many were
 function ReqlessQueue:check_scheduled(now, count)
   if count <= 0 then
-    return
+    return 0
   end
   -- zadd is a list of arguments that we'll be able to use to
   -- insert into the work queue
@@ -2347,15 +2741,18 @@ function ReqlessQueue:check_scheduled(now, count)
     -- instead of 'scheduled'
     redis.call('hset', ReqlessJob.ns .. jid, 'state', 'waiting')
   end
+  return #scheduled
 end
 
 -- Check for and invalidate any locks that have been lost. Returns the
--- list of jids that have been invalidated
+-- list of jids that have been invalidated, and how many expired locks
+-- were handled
 function ReqlessQueue:invalidate_locks(now, count)
   local jids = {}
+  local expired = self.locks.expired(now, 0, count)
   -- Iterate through all the expired locks and add them to the list
   -- of keys that we'll return
-  for _, jid in ipairs(self.locks.expired(now, 0, count)) do
+  for _, jid in ipairs(expired) do
     -- Remove this job from the jobs that the worker that was running it
     -- has
     local worker, failure = unpack(
@@ -2377,8 +2774,10 @@ function ReqlessQueue:invalidate_locks(now, count)
     local send_message = (courtesy_sent ~= 1)
     local invalidate   = not send_message
 
-    -- If the grace period has been disabled, then we'll do both.
-    if grace_period <= 0 then
+    -- If the grace period has been disabled, then we'll do both. The same
+    -- goes for workers whose leases have run out, since they're dead and
+    -- won't be providing any failure message.
+    if grace_period <= 0 or ReqlessWorker.dead(now, worker) then
       send_message = true
       invalidate   = true
     end
@@ -2477,12 +2876,65 @@ function ReqlessQueue:invalidate_locks(now, count)
     end
   end
 
-  return jids
+  return jids, #expired
+end
+
+-- Do up to `count` jobs' worth of the housekeeping that popping would do,
+-- except that jobs whose locks were invalidated are made available to be
+-- popped by anyone instead of being handed to a worker. Afterwards, the
+-- queue's place in the due index is brought up to date. Returns how many
+-- jobs were handled.
+function ReqlessQueue:maintain(now, count)
+  local dead_jids, handled = self:invalidate_locks(now, count)
+  for _, jid in ipairs(dead_jids) do
+    local job = Reqless.job(jid)
+    self.locks.remove(jid)
+    job:throttles_release(now)
+    job:update({worker = '', expires = 0, state = 'waiting'})
+    local priority = tonumber(
+      redis.call('hget', ReqlessJob.ns .. jid, 'priority') or 0)
+    self.work.add(now, priority, jid)
+  end
+  handled = handled + self:check_recurring(now, count - handled)
+  handled = handled + self:check_scheduled(now, count - handled)
+
+  local due = nil
+  for _, group in ipairs({'scheduled', 'recur', 'locks'}) do
+    local first = redis.call('zrange', self:prefix(group), 0, 0, 'WITHSCORES')
+    if first[2] and (due == nil or tonumber(first[2]) < tonumber(due)) then
+      due = first[2]
+    end
+  end
+  if due then
+    redis.call('zadd', 'ql:due', due, self.name)
+  else
+    redis.call('zrem', 'ql:due', self.name)
+  end
+  return handled
+end
+
+-- Add a queue to the set of known queues, if it isn't already. We keep it
+-- sorted by the order in which we saw each queue, and bump its version so that
+-- clients resolving queue names know to do so again.
+function ReqlessQueue.register(now, name)
+  if redis.call('zscore', 'ql:queues', name) == false then
+    redis.call('zadd', 'ql:queues', now, name)
+    redis.call('incr', 'ql:queues:version')
+  end
 end
 
 -- Forget the provided queues. As in, remove them from the list of known queues
 function ReqlessQueue.deregister(...)
-  redis.call('zrem', Reqless.ns .. 'queues', unpack(arg))
+  if redis.call('zrem', Reqless.ns .. 'queues', unpack(arg)) > 0 then
+    redis.call('incr', 'ql:queues:version')
+  end
+  redis.call('zrem', 'ql:due', unpack(arg))
+end
+
+-- The version of the set of known queues, which changes whenever a queue is
+-- added to or removed from it
+function ReqlessQueue.version()
+  return tonumber(redis.call('get', 'ql:queues:version') or 0)
 end
 
 -- Return information about a particular queue, or all queues
@@ -2503,15 +2955,17 @@ function ReqlessQueue.counts(now, name)
   if name then
     local queue = Reqless.queue(name)
     local stalled = queue.locks.length(now)
-    -- Check for any scheduled jobs that need to be moved
-    queue:check_scheduled(now, queue.scheduled.length())
+    -- Scheduled jobs that are due count as waiting. They're counted rather
+    -- than moved so that counts don't write, and can be read from replicas.
+    local scheduled = queue.scheduled.length()
+    local ready = redis.call('zcount', queue:prefix('scheduled'), 0, now)
     return {
       name      = name,
-      waiting   = queue.work.length(),
+      waiting   = queue.work.length() + ready,
       stalled   = stalled,
       running   = queue.locks.length() - stalled,
       throttled = queue.throttled.length(),
-      scheduled = queue.scheduled.length(),
+      scheduled = scheduled - ready,
       depends   = queue.depends.length(),
       recurring = queue.recurring.length(),
       paused    = queue:paused()
@@ -2525,6 +2979,32 @@ function ReqlessQueue.counts(now, name)
   end
   return response
 end
+
+-- Return the names of all known queues, in the order they were first seen.
+-- Unlike `counts`, this doesn't look at the queues themselves.
+function ReqlessQueue.names()
+  return redis.call('zrange', 'ql:queues', 0, -1)
+end
+
+-- Return the counts of up to `count` known queues, starting at `cursor`, and
+-- the cursor to continue from, which is 0 once every queue has been visited.
+-- Like SCAN, a queue forgotten while paging may cause another to be skipped.
+function ReqlessQueue.counts_page(now, cursor, count)
+  cursor = assert(tonumber(cursor),
+    'CountsPage(): Arg "cursor" not a number: ' .. tostring(cursor))
+  count = assert(tonumber(count),
+    'CountsPage(): Arg "count" not a number: ' .. tostring(count))
+  local names = redis.call('zrange', 'ql:queues', cursor, cursor + count - 1)
+  local counts = {}
+  for _, name in ipairs(names) do
+    table.insert(counts, ReqlessQueue.counts(now, name))
+  end
+  local next_cursor = 0
+  if cursor + count < redis.call('zcard', 'ql:queues') then
+    next_cursor = cursor + count
+  end
+  return {cursor = next_cursor, counts = counts}
+end
 local ReqlessQueuePatterns = {
   default_identifiers_default_pattern = '["*"]',
   default_priority_pattern = '{"fairly": false, "pattern": ["default"]}',
@@ -2715,9 +3195,7 @@ function ReqlessRecurringJob:update(now, ...)
       Reqless.queue(value).recurring.add(score, self.jid)
       redis.call('hset', 'ql:r:' .. self.jid, 'queue', value)
       -- If we don't already know about the queue, learn about it
-      if redis.call('zscore', 'ql:queues', value) == false then
-        redis.call('zadd', 'ql:queues', now, value)
-      end
+      ReqlessQueue.register(now, value)
     elseif key == 'backlog' then
       value = assert(tonumber(value),
         'Recur(): Arg "backlog" not a number: ' .. tostring(value))
@@ -2816,6 +3294,63 @@ end
 -- Deregisters these workers from the list of known workers
 function ReqlessWorker.deregister(...)
   redis.call('zrem', 'ql:workers', unpack(arg))
+  redis.call('zrem', 'ql:workers:leases', unpack(arg))
+end
+
+-- Renew a worker's liveness lease for another `ttl` seconds. Once a worker
+-- that has a lease lets it run out, it's considered dead, and the locks on its
+-- jobs are expired without waiting for them to run out on their own.
+function ReqlessWorker.lease(now, worker, ttl)
+  assert(worker, 'Lease(): Arg "worker" missing')
+  ttl = assert(tonumber(ttl),
+    'Lease(): Arg "ttl" missing or not a number: ' .. tostring(ttl))
+  redis.call('zadd', 'ql:workers:leases', now + ttl, worker)
+end
+
+-- Give up these workers' leases, as when they shut down cleanly
+function ReqlessWorker.unlease(...)
+  redis.call('zrem', 'ql:workers:leases', unpack(arg))
+end
+
+-- Whether a worker had a lease and let it run out
+function ReqlessWorker.dead(now, worker)
+  local lease = redis.call('zscore', 'ql:workers:leases', worker)
+  return lease ~= false and tonumber(lease) <= now
+end
+
+-- Expire the locks on up to `limit` jobs held by workers whose leases have run
+-- out, and note that their queues are due for housekeeping. Once all of a
+-- worker's locks are expired, its lease is given a score of -1, so that it's
+-- still reported as dead but not looked at again. Returns how many locks were
+-- expired.
+function ReqlessWorker.reap(now, limit)
+  local reaped = 0
+  local workers = redis.call(
+    'zrangebyscore', 'ql:workers:leases', 0, now, 'LIMIT', 0, limit)
+  for _, worker in ipairs(workers) do
+    local remaining = limit - reaped
+    if remaining <= 0 then
+      break
+    end
+    local key = 'ql:w:' .. worker .. ':jobs'
+    local jids = redis.call('zrangebyscore', key,
+      '(' .. now, '+inf', 'LIMIT', 0, remaining)
+    for _, jid in ipairs(jids) do
+      local queue_name, owner = unpack(
+        redis.call('hmget', ReqlessJob.ns .. jid, 'queue', 'worker'))
+      if queue_name and owner == worker then
+        local queue = Reqless.queue(queue_name)
+        redis.call('zadd', queue:prefix('locks'), 'XX', now, jid)
+        Reqless.due(queue_name, now)
+      end
+      redis.call('zadd', key, now, jid)
+    end
+    reaped = reaped + #jids
+    if #jids < remaining then
+      redis.call('zadd', 'ql:workers:leases', -1, worker)
+    end
+  end
+  return reaped
 end
 
 -- Provide data about all the workers, or if a specific worker is provided,
@@ -2855,6 +3390,7 @@ function ReqlessWorker.counts(now, worker)
   local workers  = redis.call('zrangebyscore', 'ql:workers', 0, now - interval)
   for _, worker in ipairs(workers) do
     redis.call('del', 'ql:w:' .. worker .. ':jobs')
+    redis.call('zrem', 'ql:workers:leases', worker)
   end
 
   -- And now remove them from the list of known workers
@@ -2870,10 +3406,18 @@ function ReqlessWorker.counts(now, worker)
   local response = {}
   local workers = redis.call('zrevrange', 'ql:workers', 0, -1)
   for _, worker in ipairs(workers) do
+    -- Workers with leases are reported as alive or not; for the others, we
+    -- can't tell
+    local lease = redis.call('zscore', 'ql:workers:leases', worker)
+    local alive = nil
+    if lease ~= false then
+      alive = tonumber(lease) > now
+    end
     table.insert(response, {
       name    = worker,
       jobs    = redis.call('zcount', 'ql:w:' .. worker .. ':jobs', now, now + 8640000),
-      stalled = redis.call('zcount', 'ql:w:' .. worker .. ':jobs', 0, now)
+      stalled = redis.call('zcount', 'ql:w:' .. worker .. ':jobs', 0, now),
+      alive   = alive
     })
   end
   return response
@@ -2906,14 +3450,18 @@ end
 -- Set the data for a throttled resource
 function ReqlessThrottle:set(data, expiration)
   redis.call('hmset', ReqlessThrottle.ns .. self.id, 'id', self.id, 'maximum', data.maximum)
+  redis.call('incr', ReqlessThrottle.version_ns .. self.id)
   if expiration > 0 then
     redis.call('expire', ReqlessThrottle.ns .. self.id, expiration)
+    redis.call('expire', ReqlessThrottle.version_ns .. self.id, expiration)
+  else
+    redis.call('persist', ReqlessThrottle.version_ns .. self.id)
   end
 end
 
 -- Delete a throttled resource
 function ReqlessThrottle:unset()
-  redis.call('del', ReqlessThrottle.ns .. self.id)
+  redis.call('del', ReqlessThrottle.ns .. self.id, ReqlessThrottle.version_ns .. self.id)
 end
 
 -- Acquire a throttled resource for a job.
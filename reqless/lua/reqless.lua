@@ -26,7 +26,8 @@ local ReqlessJob = {
 ReqlessJob.__index = ReqlessJob
 
 local ReqlessThrottle = {
-  ns = Reqless.ns .. 'th:'
+  ns = Reqless.ns .. 'th:',
+  version_ns = Reqless.ns .. 'thv:'
 }
 ReqlessThrottle.__index = ReqlessThrottle
 
@@ -35,16 +36,105 @@ ReqlessRecurringJob.__index = ReqlessRecurringJob
 
 Reqless.config = {}
 
+Reqless.available = {}
+
 local function table_extend(self, other)
   for _, v in ipairs(other) do
     table.insert(self, v)
   end
 end
 
+function Reqless.clock()
+  local time = redis.call('time')
+  return tonumber(time[1]) + tonumber(time[2]) / 1000000
+end
+
 function Reqless.publish(channel, message)
   redis.call('publish', Reqless.ns .. channel, message)
 end
 
+function Reqless.publish_available(now, queue_name, jid)
+  if Reqless.available[queue_name] then
+    return
+  end
+  Reqless.available[queue_name] = true
+  local expires = redis.call('zscore', 'ql:available', queue_name)
+  if expires and tonumber(expires) > now then
+    Reqless.publish('available:' .. queue_name, jid)
+  end
+end
+
+function Reqless.gc(now, limit)
+  local count = tonumber(Reqless.config.get('jobs-history-count') or 50000)
+  local time  = tonumber(Reqless.config.get('jobs-history') or 7 * 24 * 60 * 60)
+
+  local jids = redis.call(
+    'zrangebyscore', 'ql:completed', 0, now - time, 'LIMIT', 0, limit)
+  for _, jid in ipairs(jids) do
+    Reqless.job(jid):delete()
+    redis.call('zrem', 'ql:completed', jid)
+  end
+  local deleted = #jids
+
+  local excess = math.min(
+    redis.call('zcard', 'ql:completed') - count, limit - deleted)
+  if excess > 0 then
+    jids = redis.call('zrange', 'ql:completed', 0, excess - 1)
+    for _, jid in ipairs(jids) do
+      Reqless.job(jid):delete()
+    end
+    redis.call('zremrangebyrank', 'ql:completed', 0, excess - 1)
+    deleted = deleted + #jids
+  end
+
+  return deleted
+end
+
+function Reqless.release_batch()
+  return tonumber(Reqless.config.get('dependents-release-batch', 100))
+end
+
+function Reqless.release(now, limit)
+  local released = 0
+  while released < limit do
+    local jid = redis.call('lindex', 'ql:releasing', 0)
+    if not jid then
+      break
+    end
+    released = released + Reqless.job(jid):release_dependents(now, limit - released)
+  end
+  return released
+end
+
+function Reqless.due(name, when)
+  local current = redis.call('zscore', 'ql:due', name)
+  if current == false or tonumber(when) < tonumber(current) then
+    redis.call('zadd', 'ql:due', when, name)
+  end
+end
+
+function Reqless.maintain_on_pop()
+  return tonumber(Reqless.config.get('maintain-on-pop', 1)) ~= 0
+end
+
+function Reqless.maintain(now, limit)
+  local handled = ReqlessWorker.reap(now, limit)
+  local names = redis.call(
+    'zrangebyscore', 'ql:due', '-inf', now, 'LIMIT', 0, limit)
+  for _, name in ipairs(names) do
+    if handled >= limit then
+      break
+    end
+    handled = handled + Reqless.queue(name):maintain(now, limit - handled)
+  end
+  return handled
+end
+
+function Reqless.next_maintenance()
+  local first = redis.call('zrange', 'ql:due', 0, 0, 'WITHSCORES')
+  return first[2]
+end
+
 function Reqless.job(jid)
   assert(jid, 'Job(): no jid provided')
   local job = {}
@@ -303,6 +393,7 @@ function Reqless.cancel(now, ...)
       for _, j in ipairs(redis.call(
         'smembers', ReqlessJob.ns .. jid .. '-dependencies')) do
         redis.call('srem', ReqlessJob.ns .. j .. '-dependents', jid)
+        redis.call('srem', ReqlessJob.ns .. j .. '-releasing', jid)
       end
 
       if state == 'failed' then
@@ -329,6 +420,37 @@ function Reqless.cancel(now, ...)
   return arg
 end
 
+function Reqless.heartbeat(now, worker, ...)
+  assert(worker, 'Heartbeat(): Arg "worker" missing')
+
+  local renewed = {}
+  for _, jid in ipairs(arg) do
+    local ok, expires = pcall(ReqlessJob.heartbeat, Reqless.job(jid), now, worker)
+    if ok then
+      renewed[jid] = expires
+    end
+  end
+  return renewed
+end
+
+function Reqless.pop(now, worker, limit, ...)
+  assert(worker, 'Pop(): Arg "worker" missing')
+  limit = assert(tonumber(limit),
+    'Pop(): Arg "limit" missing or not a number: ' .. tostring(limit))
+
+  local popped = {}
+  for _, queue_name in ipairs(arg) do
+    if #popped >= limit then
+      break
+    end
+    local jids = Reqless.queue(queue_name):pop(now, worker, limit - #popped)
+    for _, jid in ipairs(jids) do
+      table.insert(popped, jid)
+    end
+  end
+  return popped
+end
+
 Reqless.config.defaults = {
   ['application']        = 'reqless',
   ['grace-period']       = '10',
@@ -342,15 +464,34 @@ Reqless.config.defaults = {
 
 Reqless.config.get = function(key, default)
   if key then
-    return redis.call('hget', 'ql:config', key) or
-      Reqless.config.defaults[key] or default
+    local memo = Reqless.config.memo
+    local value = memo and memo[key]
+    if value == nil then
+      value = redis.call('hget', 'ql:config', key)
+      if memo then
+        memo[key] = value
+      end
+    end
+    return value or Reqless.config.defaults[key] or default
   end
 
+  local config = {}
+  for key, value in pairs(Reqless.config.defaults) do
+    config[key] = value
+  end
   local reply = redis.call('hgetall', 'ql:config')
   for i = 1, #reply, 2 do
-    Reqless.config.defaults[reply[i]] = reply[i + 1]
+    config[reply[i]] = reply[i + 1]
   end
-  return Reqless.config.defaults
+  return config
+end
+
+Reqless.config.memoize = function()
+  Reqless.config.memo = {}
+end
+
+Reqless.config.forget = function()
+  Reqless.config.memo = nil
 end
 
 Reqless.config.set = function(option, value)
@@ -361,8 +502,10 @@ Reqless.config.set = function(option, value)
     option = option,
     value  = value
   }))
+  Reqless.publish('config', option)
 
   redis.call('hset', 'ql:config', option, value)
+  Reqless.config.forget()
 end
 
 Reqless.config.unset = function(option)
@@ -371,42 +514,103 @@ Reqless.config.unset = function(option)
     event  = 'config_unset',
     option = option
   }))
+  Reqless.publish('config', option)
 
   redis.call('hdel', 'ql:config', option)
-end
+  Reqless.config.forget()
+end
+
+local function identity(value)
+  return value
+end
+
+ReqlessJob.stored_fields = {
+  jid = identity,
+  klass = identity,
+  state = identity,
+  queue = identity,
+  worker = function(value) return value or '' end,
+  priority = tonumber,
+  expires = function(value) return tonumber(value) or 0 end,
+  retries = tonumber,
+  remaining = function(value) return math.floor(tonumber(value)) end,
+  data = identity,
+  tags = cjson.decode,
+  failure = function(value) return cjson.decode(value or '{}') end,
+  throttles = function(value) return cjson.decode(value or '[]') end,
+  spawned_from_jid = identity,
+}
 
-function ReqlessJob:data(...)
-  local job = redis.call(
-      'hmget', ReqlessJob.ns .. self.jid, 'jid', 'klass', 'state', 'queue',
-      'worker', 'priority', 'expires', 'retries', 'remaining', 'data',
-      'tags', 'failure', 'throttles', 'spawned_from_jid')
+ReqlessJob.derived_fields = {
+  tracked = function(job)
+    return redis.call('zscore', 'ql:tracked', job.jid) ~= false
+  end,
+  history = function(job)
+    return job:history()
+  end,
+  dependents = function(job)
+    return redis.call('sunion',
+      ReqlessJob.ns .. job.jid .. '-dependents',
+      ReqlessJob.ns .. job.jid .. '-releasing')
+  end,
+  dependencies = function(job)
+    return redis.call('smembers', ReqlessJob.ns .. job.jid .. '-dependencies')
+  end,
+}
 
-  if not job[1] then
+ReqlessJob.fields = {
+  'jid', 'klass', 'state', 'queue', 'worker', 'tracked', 'priority', 'expires',
+  'retries', 'remaining', 'data', 'tags', 'history', 'failure', 'throttles',
+  'spawned_from_jid', 'dependents', 'dependencies',
+}
+
+function ReqlessJob:project(fields)
+  local stored = {'jid'}
+  for _, field in ipairs(fields) do
+    if field ~= 'jid' and ReqlessJob.stored_fields[field] then
+      table.insert(stored, field)
+    end
+  end
+
+  local values = redis.call('hmget', ReqlessJob.ns .. self.jid, unpack(stored))
+
+  if not values[1] then
     return nil
   end
 
-  local data = {
-    jid = job[1],
-    klass = job[2],
-    state = job[3],
-    queue = job[4],
-    worker = job[5] or '',
-    tracked = redis.call('zscore', 'ql:tracked', self.jid) ~= false,
-    priority = tonumber(job[6]),
-    expires = tonumber(job[7]) or 0,
-    retries = tonumber(job[8]),
-    remaining = math.floor(tonumber(job[9])),
-    data = job[10],
-    tags = cjson.decode(job[11]),
-    history = self:history(),
-    failure = cjson.decode(job[12] or '{}'),
-    throttles = cjson.decode(job[13] or '[]'),
-    spawned_from_jid = job[14],
-    dependents = redis.call('smembers', ReqlessJob.ns .. self.jid .. '-dependents'),
-    dependencies = redis.call('smembers', ReqlessJob.ns .. self.jid .. '-dependencies'),
-  }
+  local data = {}
+  for index, field in ipairs(stored) do
+    data[field] = ReqlessJob.stored_fields[field](values[index])
+  end
+  for _, field in ipairs(fields) do
+    local derive = ReqlessJob.derived_fields[field]
+    if derive then
+      data[field] = derive(self)
+    end
+  end
+  return data
+end
+
+function ReqlessJob:record(fields)
+  if fields then
+    return self:project(fields)
+  end
+  return self:data()
+end
+
+function ReqlessJob.decode_fields(fields)
+  if fields == nil or fields == '' then
+    return nil
+  end
+  return cjson.decode(fields)
+end
 
+function ReqlessJob:data(...)
   if #arg > 0 then
+    local data = self:project(arg)
+    if not data then
+      return nil
+    end
     local response = {}
     for _, key in ipairs(arg) do
       table.insert(response, data[key])
@@ -414,7 +618,7 @@ function ReqlessJob:data(...)
     return response
   end
 
-  return data
+  return self:project(ReqlessJob.fields)
 end
 
 function ReqlessJob:complete(now, worker, queue_name, raw_data, ...)
@@ -490,9 +694,7 @@ function ReqlessJob:complete(now, worker, queue_name, raw_data, ...)
 
     self:history(now, 'put', {queue = next_queue_name})
 
-    if redis.call('zscore', 'ql:queues', next_queue_name) == false then
-      redis.call('zadd', 'ql:queues', now, next_queue_name)
-    end
+    ReqlessQueue.register(now, next_queue_name)
 
     redis.call('hmset', ReqlessJob.ns .. self.jid,
       'state', 'waiting',
@@ -545,52 +747,55 @@ function ReqlessJob:complete(now, worker, queue_name, raw_data, ...)
     'expires', 0,
     'remaining', tonumber(retries))
 
-  local count = Reqless.config.get('jobs-history-count')
-  local time  = Reqless.config.get('jobs-history')
-
-  count = tonumber(count or 50000)
-  time  = tonumber(time  or 7 * 24 * 60 * 60)
-
   redis.call('zadd', 'ql:completed', now, self.jid)
 
-  local jids = redis.call('zrangebyscore', 'ql:completed', 0, now - time)
-  for _, jid in ipairs(jids) do
-    Reqless.job(jid):delete()
-  end
-
-  redis.call('zremrangebyscore', 'ql:completed', 0, now - time)
+  Reqless.gc(now, tonumber(Reqless.config.get('jobs-gc-on-complete', 2)))
 
-  jids = redis.call('zrange', 'ql:completed', 0, (-1-count))
-  for _, jid in ipairs(jids) do
-    Reqless.job(jid):delete()
+  local dependents = ReqlessJob.ns .. self.jid .. '-dependents'
+  if redis.call('exists', dependents) == 1 then
+    local releasing = ReqlessJob.ns .. self.jid .. '-releasing'
+    if redis.call('exists', releasing) == 0 then
+      redis.call('rename', dependents, releasing)
+      redis.call('rpush', 'ql:releasing', self.jid)
+    else
+      redis.call('sunionstore', releasing, releasing, dependents)
+      redis.call('del', dependents)
+    end
+    self:release_dependents(now, Reqless.release_batch())
   end
-  redis.call('zremrangebyrank', 'ql:completed', 0, (-1-count))
 
-  for _, j in ipairs(redis.call(
-    'smembers', ReqlessJob.ns .. self.jid .. '-dependents')) do
+  return 'complete'
+end
+
+function ReqlessJob:release_dependents(now, limit)
+  local releasing = ReqlessJob.ns .. self.jid .. '-releasing'
+  local dependents = redis.call('spop', releasing, limit)
+  for _, j in ipairs(dependents) do
     redis.call('srem', ReqlessJob.ns .. j .. '-dependencies', self.jid)
-    if redis.call(
-      'scard', ReqlessJob.ns .. j .. '-dependencies') == 0 then
-      local other_queue_name, priority, scheduled = unpack(
-        redis.call('hmget', ReqlessJob.ns .. j, 'queue', 'priority', 'scheduled'))
-      if other_queue_name then
-        local other_queue = Reqless.queue(other_queue_name)
-        other_queue.depends.remove(j)
-        if scheduled then
-          other_queue.scheduled.add(scheduled, j)
-          redis.call('hset', ReqlessJob.ns .. j, 'state', 'scheduled')
-          redis.call('hdel', ReqlessJob.ns .. j, 'scheduled')
-        else
-          other_queue.work.add(now, priority, j)
-          redis.call('hset', ReqlessJob.ns .. j, 'state', 'waiting')
-        end
+    local state, other_queue_name, priority, scheduled = unpack(
+      redis.call('hmget', ReqlessJob.ns .. j,
+        'state', 'queue', 'priority', 'scheduled'))
+    local other_queue = other_queue_name and Reqless.queue(other_queue_name)
+    if state == 'depends' and other_queue
+      and other_queue.depends.score(j)
+      and redis.call(
+        'scard', ReqlessJob.ns .. j .. '-dependencies') == 0 then
+      other_queue.depends.remove(j)
+      if scheduled then
+        other_queue.scheduled.add(scheduled, j)
+        redis.call('hset', ReqlessJob.ns .. j, 'state', 'scheduled')
+        redis.call('hdel', ReqlessJob.ns .. j, 'scheduled')
+      else
+        other_queue.work.add(now, priority, j)
+        redis.call('hset', ReqlessJob.ns .. j, 'state', 'waiting')
       end
     end
   end
 
-  redis.call('del', ReqlessJob.ns .. self.jid .. '-dependents')
-
-  return 'complete'
+  if redis.call('exists', releasing) == 0 then
+    redis.call('lrem', 'ql:releasing', 1, self.jid)
+  end
+  return #dependents
 end
 
 function ReqlessJob:fail(now, worker, group, message, data)
@@ -774,6 +979,7 @@ function ReqlessJob:depends(now, command, ...)
     for _, j in ipairs(redis.call(
       'smembers', ReqlessJob.ns .. self.jid .. '-dependencies')) do
       redis.call('srem', ReqlessJob.ns .. j .. '-dependents', self.jid)
+      redis.call('srem', ReqlessJob.ns .. j .. '-releasing', self.jid)
     end
     redis.call('del', ReqlessJob.ns .. self.jid .. '-dependencies')
     local queue_name, priority = unpack(redis.call(
@@ -787,6 +993,7 @@ function ReqlessJob:depends(now, command, ...)
   else
     for _, j in ipairs(arg) do
       redis.call('srem', ReqlessJob.ns .. j .. '-dependents', self.jid)
+      redis.call('srem', ReqlessJob.ns .. j .. '-releasing', self.jid)
       redis.call(
         'srem', ReqlessJob.ns .. self.jid .. '-dependencies', j)
       if redis.call('scard',
@@ -950,16 +1157,42 @@ function ReqlessJob:history(now, what, item)
 
   local count = tonumber(Reqless.config.get('max-job-history', 100))
   if count > 0 then
-    local obj = redis.call('lpop', ReqlessJob.ns .. self.jid .. '-history')
-    redis.call('ltrim', ReqlessJob.ns .. self.jid .. '-history', -count + 2, -1)
-    if obj ~= nil and obj ~= false then
-      redis.call('lpush', ReqlessJob.ns .. self.jid .. '-history', obj)
-    end
+    self:collapse_history(math.max(count, 3) - 1)
   end
   return redis.call('rpush', ReqlessJob.ns .. self.jid .. '-history',
     cjson.encode({math.floor(now), what, item}))
 end
 
+function ReqlessJob:collapse_history(count)
+  local key = ReqlessJob.ns .. self.jid .. '-history'
+  local length = redis.call('llen', key)
+  if length <= count then
+    return
+  end
+
+  local first = redis.call('lindex', key, 0)
+  local head = 1
+  local summary = {count = 0, counts = {}}
+  local second = cjson.decode(redis.call('lindex', key, 1))
+  if second[2] == 'collapsed' then
+    head = 2
+    summary = second[3]
+  end
+
+  local drop = length - count + (head == 1 and 1 or 0)
+  local last = nil
+  for _, value in ipairs(redis.call('lrange', key, head, head + drop - 1)) do
+    value = cjson.decode(value)
+    summary.first = summary.first or value[1]
+    summary.count = summary.count + 1
+    summary.counts[value[2]] = (summary.counts[value[2]] or 0) + 1
+    last = value[1]
+  end
+
+  redis.call('ltrim', key, head + drop, -1)
+  redis.call('lpush', key, cjson.encode({last, 'collapsed', summary}), first)
+end
+
 function ReqlessJob:throttles_release(now)
   local throttles = redis.call('hget', ReqlessJob.ns .. self.jid, 'throttles')
   throttles = cjson.decode(throttles or '[]')
@@ -1055,8 +1288,10 @@ function Reqless.queue(name)
         return redis.call('zrem', queue:prefix('work'), unpack(arg))
       end
     end, add = function(now, priority, jid)
-      return redis.call('zadd',
+      local added = redis.call('zadd',
         queue:prefix('work'), priority - (now / 10000000000), jid)
+      Reqless.publish_available(now, queue.name, jid)
+      return added
     end, score = function(jid)
       return redis.call('zscore', queue:prefix('work'), jid)
     end, length = function()
@@ -1073,6 +1308,7 @@ function Reqless.queue(name)
         now, math.huge, 'LIMIT', offset, limit)
     end, add = function(expires, jid)
       redis.call('zadd', queue:prefix('locks'), expires, jid)
+      Reqless.due(queue.name, expires)
     end, remove = function(...)
       if #arg > 0 then
         return redis.call('zrem', queue:prefix('locks'), unpack(arg))
@@ -1098,6 +1334,8 @@ function Reqless.queue(name)
       if #arg > 0 then
         return redis.call('zrem', queue:prefix('depends'), unpack(arg))
       end
+    end, score = function(jid)
+      return redis.call('zscore', queue:prefix('depends'), jid)
     end, length = function()
       return redis.call('zcard', queue:prefix('depends'))
     end
@@ -1131,6 +1369,7 @@ function Reqless.queue(name)
         queue:prefix('scheduled'), 0, now, 'LIMIT', offset, limit)
     end, add = function(when, jid)
       redis.call('zadd', queue:prefix('scheduled'), when, jid)
+      Reqless.due(queue.name, when)
     end, remove = function(...)
       if #arg > 0 then
         return redis.call('zrem', queue:prefix('scheduled'), unpack(arg))
@@ -1147,12 +1386,14 @@ function Reqless.queue(name)
     end, ready = function(now, offset, limit)
     end, add = function(when, jid)
       redis.call('zadd', queue:prefix('recur'), when, jid)
+      Reqless.due(queue.name, when)
     end, remove = function(...)
       if #arg > 0 then
         return redis.call('zrem', queue:prefix('recur'), unpack(arg))
       end
     end, update = function(increment, jid)
-      redis.call('zincrby', queue:prefix('recur'), increment, jid)
+      Reqless.due(queue.name,
+        redis.call('zincrby', queue:prefix('recur'), increment, jid))
     end, score = function(jid)
       return redis.call('zscore', queue:prefix('recur'), jid)
     end, length = function()
@@ -1281,7 +1522,11 @@ function ReqlessQueue:pop(now, worker, limit)
 
   redis.call('zadd', 'ql:workers', now, worker)
 
-  local dead_jids = self:invalidate_locks(now, limit) or {}
+  local maintain = Reqless.maintain_on_pop()
+  local dead_jids = {}
+  if maintain then
+    dead_jids = self:invalidate_locks(now, limit) or {}
+  end
   local popped = {}
 
   for _, jid in ipairs(dead_jids) do
@@ -1296,9 +1541,11 @@ function ReqlessQueue:pop(now, worker, limit)
   end
 
 
-  self:check_recurring(now, limit - #dead_jids)
+  if maintain then
+    self:check_recurring(now, limit - #dead_jids)
 
-  self:check_scheduled(now, limit - #dead_jids)
+    self:check_scheduled(now, limit - #dead_jids)
+  end
 
 
   local pop_retry_limit = tonumber(
@@ -1458,6 +1705,7 @@ function ReqlessQueue:put(now, worker, jid, klass, raw_data, delay, ...)
     for _, dep in pairs(original) do
       if new[dep] == nil then
         redis.call('srem', ReqlessJob.ns .. dep .. '-dependents'  , jid)
+        redis.call('srem', ReqlessJob.ns .. dep .. '-releasing'  , jid)
         redis.call('srem', ReqlessJob.ns .. jid .. '-dependencies', dep)
       end
     end
@@ -1562,9 +1810,7 @@ function ReqlessQueue:put(now, worker, jid, klass, raw_data, delay, ...)
     end
   end
 
-  if redis.call('zscore', 'ql:queues', self.name) == false then
-    redis.call('zadd', 'ql:queues', now, self.name)
-  end
+  ReqlessQueue.register(now, self.name)
 
   if redis.call('zscore', 'ql:tracked', jid) ~= false then
     Reqless.publish('put', jid)
@@ -1573,6 +1819,43 @@ function ReqlessQueue:put(now, worker, jid, klass, raw_data, delay, ...)
   return jid
 end
 
+function ReqlessQueue:putMulti(now, worker, raw_jobs, budget)
+  local jobs = assert(cjson.decode(raw_jobs),
+    'PutMulti(): Arg "jobs" missing or not JSON: ' .. tostring(raw_jobs))
+  budget = assert(tonumber(budget or 0),
+    'PutMulti(): Arg "budget" not a number: ' .. tostring(budget))
+
+  local deadline = nil
+  if budget > 0 then
+    deadline = Reqless.clock() + budget
+  end
+
+  Reqless.config.memoize()
+  local jids = {}
+  for _, job in ipairs(jobs) do
+    local options = {}
+    for _, key in ipairs({'priority', 'retries'}) do
+      if job[key] ~= nil then
+        table.insert(options, key)
+        table.insert(options, job[key])
+      end
+    end
+    for _, key in ipairs({'tags', 'depends', 'throttles'}) do
+      if job[key] ~= nil then
+        table.insert(options, key)
+        table.insert(options, cjson.encode(job[key]))
+      end
+    end
+    table.insert(jids, self:put(now, worker, job.jid, job.klass, job.data,
+      job.delay or 0, unpack(options)))
+    if deadline and Reqless.clock() >= deadline then
+      break
+    end
+  end
+  Reqless.config.forget()
+  return jids
+end
+
 function ReqlessQueue:unfail(now, group, count)
   assert(group, 'Unfail(): Arg "group" missing')
   count = assert(tonumber(count or 25),
@@ -1671,9 +1954,7 @@ function ReqlessQueue:recurAtInterval(now, jid, klass, raw_data, interval, offse
     'throttles', cjson.encode(throttles))
   self.recurring.add(now + offset, jid)
 
-  if redis.call('zscore', 'ql:queues', self.name) == false then
-    redis.call('zadd', 'ql:queues', now, self.name)
-  end
+  ReqlessQueue.register(now, self.name)
 
   return jid
 end
@@ -1682,6 +1963,29 @@ function ReqlessQueue:length()
   return  self.locks.length() + self.work.length() + self.scheduled.length()
 end
 
+function ReqlessQueue:next_due(now)
+  local due = nil
+  for _, group in ipairs({'scheduled', 'recur', 'locks'}) do
+    local first = redis.call('zrangebyscore', self:prefix(group),
+      '(' .. now, '+inf', 'WITHSCORES', 'LIMIT', 0, 1)
+    if first[2] and (due == nil or tonumber(first[2]) < tonumber(due)) then
+      due = first[2]
+    end
+  end
+  return due
+end
+
+function ReqlessQueue.wake_on_put(now, ttl, ...)
+  local expires = now + ttl
+  for _, name in ipairs(arg) do
+    local current = redis.call('zscore', 'ql:available', name)
+    if not current or tonumber(current) < expires then
+      redis.call('zadd', 'ql:available', expires, name)
+    end
+  end
+  redis.call('zremrangebyscore', 'ql:available', '-inf', now)
+end
+
 function ReqlessQueue:remove_job(jid)
   self.work.remove(jid)
   self.locks.remove(jid)
@@ -1692,7 +1996,7 @@ end
 
 function ReqlessQueue:check_recurring(now, count)
   if count <= 0 then
-    return
+    return 0
   end
   local moved = 0
   local r = self.recurring.peek(now, 0, count)
@@ -1750,11 +2054,12 @@ function ReqlessQueue:check_recurring(now, count)
       self.recurring.add(score, jid)
     end
   end
+  return moved
 end
 
 function ReqlessQueue:check_scheduled(now, count)
   if count <= 0 then
-    return
+    return 0
   end
   local scheduled = self.scheduled.ready(now, 0, count)
   for _, jid in ipairs(scheduled) do
@@ -1765,11 +2070,13 @@ function ReqlessQueue:check_scheduled(now, count)
 
     redis.call('hset', ReqlessJob.ns .. jid, 'state', 'waiting')
   end
+  return #scheduled
 end
 
 function ReqlessQueue:invalidate_locks(now, count)
   local jids = {}
-  for _, jid in ipairs(self.locks.expired(now, 0, count)) do
+  local expired = self.locks.expired(now, 0, count)
+  for _, jid in ipairs(expired) do
     local worker, failure = unpack(
       redis.call('hmget', ReqlessJob.ns .. jid, 'worker', 'failure'))
     redis.call('zrem', 'ql:w:' .. worker .. ':jobs', jid)
@@ -1782,7 +2089,7 @@ function ReqlessQueue:invalidate_locks(now, count)
     local send_message = (courtesy_sent ~= 1)
     local invalidate   = not send_message
 
-    if grace_period <= 0 then
+    if grace_period <= 0 or ReqlessWorker.dead(now, worker) then
       send_message = true
       invalidate   = true
     end
@@ -1864,25 +2171,69 @@ function ReqlessQueue:invalidate_locks(now, count)
     end
   end
 
-  return jids
+  return jids, #expired
+end
+
+function ReqlessQueue:maintain(now, count)
+  local dead_jids, handled = self:invalidate_locks(now, count)
+  for _, jid in ipairs(dead_jids) do
+    local job = Reqless.job(jid)
+    self.locks.remove(jid)
+    job:throttles_release(now)
+    job:update({worker = '', expires = 0, state = 'waiting'})
+    local priority = tonumber(
+      redis.call('hget', ReqlessJob.ns .. jid, 'priority') or 0)
+    self.work.add(now, priority, jid)
+  end
+  handled = handled + self:check_recurring(now, count - handled)
+  handled = handled + self:check_scheduled(now, count - handled)
+
+  local due = nil
+  for _, group in ipairs({'scheduled', 'recur', 'locks'}) do
+    local first = redis.call('zrange', self:prefix(group), 0, 0, 'WITHSCORES')
+    if first[2] and (due == nil or tonumber(first[2]) < tonumber(due)) then
+      due = first[2]
+    end
+  end
+  if due then
+    redis.call('zadd', 'ql:due', due, self.name)
+  else
+    redis.call('zrem', 'ql:due', self.name)
+  end
+  return handled
+end
+
+function ReqlessQueue.register(now, name)
+  if redis.call('zscore', 'ql:queues', name) == false then
+    redis.call('zadd', 'ql:queues', now, name)
+    redis.call('incr', 'ql:queues:version')
+  end
 end
 
 function ReqlessQueue.deregister(...)
-  redis.call('zrem', Reqless.ns .. 'queues', unpack(arg))
+  if redis.call('zrem', Reqless.ns .. 'queues', unpack(arg)) > 0 then
+    redis.call('incr', 'ql:queues:version')
+  end
+  redis.call('zrem', 'ql:due', unpack(arg))
+end
+
+function ReqlessQueue.version()
+  return tonumber(redis.call('get', 'ql:queues:version') or 0)
 end
 
 function ReqlessQueue.counts(now, name)
   if name then
     local queue = Reqless.queue(name)
     local stalled = queue.locks.length(now)
-    queue:check_scheduled(now, queue.scheduled.length())
+    local scheduled = queue.scheduled.length()
+    local ready = redis.call('zcount', queue:prefix('scheduled'), 0, now)
     return {
       name      = name,
-      waiting   = queue.work.length(),
+      waiting   = queue.work.length() + ready,
       stalled   = stalled,
       running   = queue.locks.length() - stalled,
       throttled = queue.throttled.length(),
-      scheduled = queue.scheduled.length(),
+      scheduled = scheduled - ready,
       depends   = queue.depends.length(),
       recurring = queue.recurring.length(),
       paused    = queue:paused()
@@ -1896,6 +2247,27 @@ function ReqlessQueue.counts(now, name)
   end
   return response
 end
+
+function ReqlessQueue.names()
+  return redis.call('zrange', 'ql:queues', 0, -1)
+end
+
+function ReqlessQueue.counts_page(now, cursor, count)
+  cursor = assert(tonumber(cursor),
+    'CountsPage(): Arg "cursor" not a number: ' .. tostring(cursor))
+  count = assert(tonumber(count),
+    'CountsPage(): Arg "count" not a number: ' .. tostring(count))
+  local names = redis.call('zrange', 'ql:queues', cursor, cursor + count - 1)
+  local counts = {}
+  for _, name in ipairs(names) do
+    table.insert(counts, ReqlessQueue.counts(now, name))
+  end
+  local next_cursor = 0
+  if cursor + count < redis.call('zcard', 'ql:queues') then
+    next_cursor = cursor + count
+  end
+  return {cursor = next_cursor, counts = counts}
+end
 local ReqlessQueuePatterns = {
   default_identifiers_default_pattern = '["*"]',
   default_priority_pattern = '{"fairly": false, "pattern": ["default"]}',
@@ -2057,9 +2429,7 @@ function ReqlessRecurringJob:update(now, ...)
 
       Reqless.queue(value).recurring.add(score, self.jid)
       redis.call('hset', 'ql:r:' .. self.jid, 'queue', value)
-      if redis.call('zscore', 'ql:queues', value) == false then
-        redis.call('zadd', 'ql:queues', now, value)
-      end
+      ReqlessQueue.register(now, value)
     elseif key == 'backlog' then
       value = assert(tonumber(value),
         'Recur(): Arg "backlog" not a number: ' .. tostring(value))
@@ -2141,6 +2511,53 @@ function ReqlessRecurringJob:cancel()
 end
 function ReqlessWorker.deregister(...)
   redis.call('zrem', 'ql:workers', unpack(arg))
+  redis.call('zrem', 'ql:workers:leases', unpack(arg))
+end
+
+function ReqlessWorker.lease(now, worker, ttl)
+  assert(worker, 'Lease(): Arg "worker" missing')
+  ttl = assert(tonumber(ttl),
+    'Lease(): Arg "ttl" missing or not a number: ' .. tostring(ttl))
+  redis.call('zadd', 'ql:workers:leases', now + ttl, worker)
+end
+
+function ReqlessWorker.unlease(...)
+  redis.call('zrem', 'ql:workers:leases', unpack(arg))
+end
+
+function ReqlessWorker.dead(now, worker)
+  local lease = redis.call('zscore', 'ql:workers:leases', worker)
+  return lease ~= false and tonumber(lease) <= now
+end
+
+function ReqlessWorker.reap(now, limit)
+  local reaped = 0
+  local workers = redis.call(
+    'zrangebyscore', 'ql:workers:leases', 0, now, 'LIMIT', 0, limit)
+  for _, worker in ipairs(workers) do
+    local remaining = limit - reaped
+    if remaining <= 0 then
+      break
+    end
+    local key = 'ql:w:' .. worker .. ':jobs'
+    local jids = redis.call('zrangebyscore', key,
+      '(' .. now, '+inf', 'LIMIT', 0, remaining)
+    for _, jid in ipairs(jids) do
+      local queue_name, owner = unpack(
+        redis.call('hmget', ReqlessJob.ns .. jid, 'queue', 'worker'))
+      if queue_name and owner == worker then
+        local queue = Reqless.queue(queue_name)
+        redis.call('zadd', queue:prefix('locks'), 'XX', now, jid)
+        Reqless.due(queue_name, now)
+      end
+      redis.call('zadd', key, now, jid)
+    end
+    reaped = reaped + #jids
+    if #jids < remaining then
+      redis.call('zadd', 'ql:workers:leases', -1, worker)
+    end
+  end
+  return reaped
 end
 
 function ReqlessWorker.counts(now, worker)
@@ -2149,6 +2566,7 @@ function ReqlessWorker.counts(now, worker)
   local workers  = redis.call('zrangebyscore', 'ql:workers', 0, now - interval)
   for _, worker in ipairs(workers) do
     redis.call('del', 'ql:w:' .. worker .. ':jobs')
+    redis.call('zrem', 'ql:workers:leases', worker)
   end
 
   redis.call('zremrangebyscore', 'ql:workers', 0, now - interval)
@@ -2163,10 +2581,16 @@ function ReqlessWorker.counts(now, worker)
   local response = {}
   local workers = redis.call('zrevrange', 'ql:workers', 0, -1)
   for _, worker in ipairs(workers) do
+    local lease = redis.call('zscore', 'ql:workers:leases', worker)
+    local alive = nil
+    if lease ~= false then
+      alive = tonumber(lease) > now
+    end
     table.insert(response, {
       name    = worker,
       jobs    = redis.call('zcount', 'ql:w:' .. worker .. ':jobs', now, now + 8640000),
-      stalled = redis.call('zcount', 'ql:w:' .. worker .. ':jobs', 0, now)
+      stalled = redis.call('zcount', 'ql:w:' .. worker .. ':jobs', 0, now),
+      alive   = alive
     })
   end
   return response
@@ -2194,13 +2618,17 @@ end
 
 function ReqlessThrottle:set(data, expiration)
   redis.call('hmset', ReqlessThrottle.ns .. self.id, 'id', self.id, 'maximum', data.maximum)
+  redis.call('incr', ReqlessThrottle.version_ns .. self.id)
   if expiration > 0 then
     redis.call('expire', ReqlessThrottle.ns .. self.id, expiration)
+    redis.call('expire', ReqlessThrottle.version_ns .. self.id, expiration)
+  else
+    redis.call('persist', ReqlessThrottle.version_ns .. self.id)
   end
 end
 
 function ReqlessThrottle:unset()
-  redis.call('del', ReqlessThrottle.ns .. self.id)
+  redis.call('del', ReqlessThrottle.ns .. self.id, ReqlessThrottle.version_ns .. self.id)
 end
 
 function ReqlessThrottle:acquire(jid)
@@ -2301,8 +2729,8 @@ ReqlessAPI['job.fail'] = function(now, jid, worker, group, message, data)
   return Reqless.job(jid):fail(now, worker, group, message, data)
 end
 
-ReqlessAPI['job.get'] = function(now, jid)
-  local data = Reqless.job(jid):data()
+ReqlessAPI['job.get'] = function(now, jid, fields)
+  local data = Reqless.job(jid):record(ReqlessJob.decode_fields(fields))
   if data then
     return cjson.encode(data)
   end
@@ -2316,6 +2744,15 @@ ReqlessAPI['job.getMulti'] = function(now, ...)
   return cjsonArrayDegenerationWorkaround(results)
 end
 
+ReqlessAPI['job.getMultiFields'] = function(now, fields, ...)
+  fields = ReqlessJob.decode_fields(fields)
+  local results = {}
+  for _, jid in ipairs(arg) do
+    table.insert(results, Reqless.job(jid):record(fields))
+  end
+  return cjsonArrayDegenerationWorkaround(results)
+end
+
 ReqlessAPI['job.heartbeat'] = function(now, jid, worker, data)
   return Reqless.job(jid):heartbeat(now, worker, data)
 end
@@ -2379,10 +2816,22 @@ ReqlessAPI['jobs.failedByGroup'] = function(now, group, start, limit)
   return cjson.encode(Reqless.failed(group, start, limit))
 end
 
+ReqlessAPI['jobs.heartbeat'] = function(now, worker, ...)
+  return cjson.encode(Reqless.heartbeat(now, worker, unpack(arg)))
+end
+
 ReqlessAPI['jobs.tagged'] = function(now, tag, ...)
   return cjson.encode(Reqless.tag(now, 'get', tag, unpack(arg)))
 end
 
+ReqlessAPI['jobs.gc'] = function(now, limit)
+  return Reqless.gc(now, tonumber(limit or 1000))
+end
+
+ReqlessAPI['jobs.releaseDependents'] = function(now, limit)
+  return Reqless.release(now, tonumber(limit or 1000))
+end
+
 ReqlessAPI['jobs.tracked'] = function(now)
   return cjson.encode(Reqless.track(now))
 end
@@ -2408,20 +2857,23 @@ ReqlessAPI['queue.pause'] = function(now, ...)
   ReqlessQueue.pause(now, unpack(arg))
 end
 
-ReqlessAPI['queue.peek'] = function(now, queue, offset, limit)
+ReqlessAPI['queue.peek'] = function(now, queue, offset, limit, fields)
+  fields = ReqlessJob.decode_fields(fields)
   local jids = Reqless.queue(queue):peek(now, offset, limit)
   local response = {}
   for _, jid in ipairs(jids) do
-    table.insert(response, Reqless.job(jid):data())
+    table.insert(response, Reqless.job(jid):record(fields))
   end
   return cjsonArrayDegenerationWorkaround(response)
 end
 
-ReqlessAPI['queue.pop'] = function(now, queue, worker, limit)
+ReqlessAPI['queue.pop'] = function(now, queue, worker, limit, fields)
+  fields = ReqlessJob.decode_fields(fields)
+  Reqless.release(now, Reqless.release_batch())
   local jids = Reqless.queue(queue):pop(now, worker, limit)
   local response = {}
   for _, jid in ipairs(jids) do
-    table.insert(response, Reqless.job(jid):data())
+    table.insert(response, Reqless.job(jid):record(fields))
   end
   return cjsonArrayDegenerationWorkaround(response)
 end
@@ -2430,6 +2882,11 @@ ReqlessAPI['queue.put'] = function(now, worker, queue, jid, klass, data, delay,
   return Reqless.queue(queue):put(now, worker, jid, klass, data, delay, unpack(arg))
 end
 
+ReqlessAPI['queue.putMulti'] = function(now, worker, queue, jobs, budget)
+  return cjsonArrayDegenerationWorkaround(
+    Reqless.queue(queue):putMulti(now, worker, jobs, budget))
+end
+
 ReqlessAPI['queue.recurAtInterval'] = function(now, queue, jid, klass, data, interval, offset, ...)
   return Reqless.queue(queue):recurAtInterval(now, jid, klass, data, interval, offset, unpack(arg))
 end
@@ -2475,6 +2932,53 @@ ReqlessAPI['queues.counts'] = function(now)
   return cjsonArrayDegenerationWorkaround(ReqlessQueue.counts(now, nil))
 end
 
+ReqlessAPI['queues.countsPage'] = function(now, cursor, count)
+  return cjson.encode(ReqlessQueue.counts_page(now, cursor, count))
+end
+
+ReqlessAPI['queues.names'] = function(now)
+  return cjsonArrayDegenerationWorkaround(ReqlessQueue.names())
+end
+
+ReqlessAPI['queues.pop'] = function(now, worker, limit, fields, ...)
+  fields = ReqlessJob.decode_fields(fields)
+  Reqless.release(now, Reqless.release_batch())
+  local jids = Reqless.pop(now, worker, limit, unpack(arg))
+  local response = {}
+  for _, jid in ipairs(jids) do
+    table.insert(response, Reqless.job(jid):record(fields))
+  end
+  return cjsonArrayDegenerationWorkaround(response)
+end
+
+ReqlessAPI['queues.version'] = function(now)
+  return ReqlessQueue.version()
+end
+
+ReqlessAPI['queues.nextDue'] = function(now, ...)
+  local due = nil
+  for _, queue in ipairs(arg) do
+    local queue_due = Reqless.queue(queue):next_due(now)
+    if queue_due and (due == nil or tonumber(queue_due) < tonumber(due)) then
+      due = queue_due
+    end
+  end
+  return due
+end
+
+ReqlessAPI['queues.wakeOnPut'] = function(now, ttl, ...)
+  ReqlessQueue.wake_on_put(now, assert(tonumber(ttl),
+    'WakeOnPut(): Arg "ttl" not a number: ' .. tostring(ttl)), unpack(arg))
+end
+
+ReqlessAPI['queues.maintain'] = function(now, limit)
+  return Reqless.maintain(now, tonumber(limit or 1000))
+end
+
+ReqlessAPI['queues.nextMaintenance'] = function(now)
+  return Reqless.next_maintenance()
+end
+
 ReqlessAPI['recurringJob.cancel'] = function(now, jid)
   return Reqless.recurring(jid):cancel()
 end
@@ -2545,6 +3049,14 @@ ReqlessAPI['worker.jobs'] = function(now, worker)
   return cjson.encode(ReqlessWorker.counts(now, worker))
 end
 
+ReqlessAPI['worker.lease'] = function(now, worker, ttl)
+  ReqlessWorker.lease(now, worker, ttl)
+end
+
+ReqlessAPI['worker.unlease'] = function(now, ...)
+  ReqlessWorker.unlease(unpack(arg))
+end
+
 ReqlessAPI['workers.counts'] = function(now)
   return cjsonArrayDegenerationWorkaround(ReqlessWorker.counts(now, nil))
 end
@@ -0,0 +1,103 @@
+"""Housekeeping that runs apart from the commands that workers send"""
+
+import threading
+import time
+from typing import Optional
+
+from reqless import exceptions, logger
+from reqless.abstract import AbstractClient
+
+
+class Maintainer:
+    """Deletes expired completed jobs and releases the dependents of completed
+    jobs in bounded batches. Completing a job only does a little of each, so a
+    backlog (after a burst of completions, lowering `jobs-history`, or
+    completing a job with very many dependents) is worked off here without
+    blocking the server for long.
+
+    It also does the housekeeping for queues as they come due (invalidating
+    expired locks, spawning recurring jobs and making scheduled jobs
+    available), so that it happens on time even in queues nobody is popping.
+    With it running, `maintain-on-pop` can be set to 0 to keep that work off
+    of popping altogether.
+
+    When a batch comes back full, the next one is sent right away; otherwise
+    we wait `interval` seconds, or until the next queue is due if sooner."""
+
+    def __init__(
+        self,
+        client: AbstractClient,
+        interval: float = 10.0,
+        gc_limit: int = 1000,
+        release_limit: int = 1000,
+        maintain_limit: int = 1000,
+    ):
+        self.client: AbstractClient = client
+        self.interval: float = interval
+        self.gc_limit: int = gc_limit
+        self.release_limit: int = release_limit
+        self.maintain_limit: int = maintain_limit
+        self._stopped: threading.Event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> bool:
+        """Do one round of housekeeping, returning whether there may be more
+        to do right away"""
+        more = False
+        try:
+            handled = self.client.maintain(self.maintain_limit)
+            if handled:
+                logger.debug("Handled %i jobs in due queues" % handled)
+            more = handled >= self.maintain_limit
+        except exceptions.ReqlessError:
+            logger.exception("Failed to maintain queues")
+        try:
+            released = self.client.release_dependents(self.release_limit)
+            if released:
+                logger.debug("Released %i dependents" % released)
+            more = more or released >= self.release_limit
+        except exceptions.ReqlessError:
+            logger.exception("Failed to release dependents")
+        try:
+            deleted = self.client.gc(self.gc_limit)
+            if deleted:
+                logger.debug("Deleted %i expired jobs" % deleted)
+            more = more or deleted >= self.gc_limit
+        except exceptions.ReqlessError:
+            logger.exception("Failed to delete expired jobs")
+        return more
+
+    def run(self) -> None:
+        """Do housekeeping until stopped"""
+        while not self._stopped.is_set():
+            try:
+                more = self.run_once()
+            except Exception:
+                logger.exception("Maintainer error")
+                more = False
+            if not more:
+                self._stopped.wait(self.wait_time())
+
+    def wait_time(self) -> float:
+        """How long to wait when there's nothing left to do right away"""
+        try:
+            due = self.client.next_maintenance()
+        except exceptions.ReqlessError:
+            logger.exception("Failed to get the next maintenance time")
+            return self.interval
+        if due is None:
+            return self.interval
+        return min(self.interval, max(due - time.time(), 0.0))
+
+    def start(self) -> None:
+        """Do housekeeping in a background thread"""
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop doing housekeeping and wait for the thread to finish"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -1,9 +1,19 @@
 """Our Queue and supporting classes"""
 
-import json
 import time
 import uuid
-from typing import Any, Dict, List, Optional, Type, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
 from reqless.abstract import (
     AbstractClient,
@@ -12,7 +22,107 @@ from reqless.abstract import (
     AbstractQueueJobs,
     AbstractThrottle,
 )
-from reqless.job import Job
+from reqless.codec import JSONCodec
+from reqless.job import Job, encode_fields
+
+
+def class_string(klass: Union[str, Type]) -> str:
+    """Return a string representative of the class"""
+    if isinstance(klass, str):
+        return klass
+    return klass.__module__ + "." + klass.__name__
+
+
+def put_args(
+    codec: JSONCodec,
+    jid: str,
+    klass: Union[str, Type],
+    data: str,
+    priority: Optional[int] = None,
+    tags: Optional[List[str]] = None,
+    delay: Optional[int] = None,
+    retries: Optional[int] = None,
+    depends: Optional[List[str]] = None,
+    throttles: Optional[List[str]] = None,
+) -> Tuple[Any, ...]:
+    """The arguments of `queue.put` and `job.requeue` that follow the worker
+    and queue names"""
+    return (
+        jid,
+        class_string(klass),
+        data,
+        delay or 0,
+        "priority",
+        priority or 0,
+        "tags",
+        codec.dumps(tags or []),
+        "retries",
+        retries or 5,
+        "depends",
+        codec.dumps(depends or []),
+        "throttles",
+        codec.dumps(throttles or []),
+    )
+
+
+def recur_args(
+    codec: JSONCodec,
+    jid: str,
+    klass: Union[str, Type],
+    data: str,
+    interval: Optional[int] = None,
+    offset: Optional[int] = 0,
+    priority: Optional[int] = None,
+    tags: Optional[List[str]] = None,
+    retries: Optional[int] = None,
+    throttles: Optional[List[str]] = None,
+) -> Tuple[Any, ...]:
+    """The arguments of `queue.recurAtInterval` that follow the queue name"""
+    return (
+        jid,
+        class_string(klass),
+        data,
+        interval,
+        offset,
+        "priority",
+        priority or 0,
+        "tags",
+        codec.dumps(tags or []),
+        "retries",
+        retries or 5,
+        "throttles",
+        codec.dumps(throttles or []),
+    )
+
+
+def put_many_chunks(
+    jobs: Iterable[Dict[str, Any]], chunk_size: int, new_jid: Callable[[], str]
+) -> Iterator[List[Dict[str, Any]]]:
+    """Split the jobs passed to `put_many` into chunks of the records that
+    `queue.putMulti` expects"""
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+
+    chunk: List[Dict[str, Any]] = []
+    for job in jobs:
+        chunk.append(
+            {
+                "jid": job.get("jid") or new_jid(),
+                "klass": class_string(job["klass"]),
+                "data": job["data"],
+                "delay": job.get("delay") or 0,
+                "priority": job.get("priority") or 0,
+                "tags": job.get("tags") or [],
+                "retries": job.get("retries") or 5,
+                "depends": job.get("depends") or [],
+                "throttles": job.get("throttles") or [],
+            }
+        )
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
 
 
 class Jobs(AbstractQueueJobs):
@@ -31,7 +141,7 @@ class Jobs(AbstractQueueJobs):
         response_json: str = self.client(
             "queue.jobsByState", "depends", self.name, offset, count
         )
-        response: List[str] = json.loads(response_json)
+        response: List[str] = self.client.codec.loads(response_json)
         return response
 
     def recurring(self, offset: int = 0, count: int = 25) -> List[str]:
@@ -39,7 +149,7 @@ class Jobs(AbstractQueueJobs):
         response_json: str = self.client(
             "queue.jobsByState", "recurring", self.name, offset, count
         )
-        response: List[str] = json.loads(response_json)
+        response: List[str] = self.client.codec.loads(response_json)
         return response
 
     def running(self, offset: int = 0, count: int = 25) -> List[str]:
@@ -47,7 +157,7 @@ class Jobs(AbstractQueueJobs):
         response_json: str = self.client(
             "queue.jobsByState", "running", self.name, offset, count
         )
-        response: List[str] = json.loads(response_json)
+        response: List[str] = self.client.codec.loads(response_json)
         return response
 
     def scheduled(self, offset: int = 0, count: int = 25) -> List[str]:
@@ -55,7 +165,7 @@ class Jobs(AbstractQueueJobs):
         response_json: str = self.client(
             "queue.jobsByState", "scheduled", self.name, offset, count
         )
-        response: List[str] = json.loads(response_json)
+        response: List[str] = self.client.codec.loads(response_json)
         return response
 
     def stalled(self, offset: int = 0, count: int = 25) -> List[str]:
@@ -63,7 +173,7 @@ class Jobs(AbstractQueueJobs):
         response_json: str = self.client(
             "queue.jobsByState", "stalled", self.name, offset, count
         )
-        response: List[str] = json.loads(response_json)
+        response: List[str] = self.client.codec.loads(response_json)
         return response
 
 
@@ -78,7 +188,9 @@ class Queue(AbstractQueue):
 
     @property
     def counts(self) -> Dict[str, Any]:
-        response: Dict[str, Any] = json.loads(self.client("queue.counts", self.name))
+        response: Dict[str, Any] = self.client.codec.loads(
+            self.client("queue.counts", self.name)
+        )
         return response
 
     @property
@@ -107,9 +219,11 @@ class Queue(AbstractQueue):
 
     def class_string(self, klass: Union[str, Type]) -> str:
         """Return a string representative of the class"""
-        if isinstance(klass, str):
-            return klass
-        return klass.__module__ + "." + klass.__name__
+        return class_string(klass)
+
+    def new_jid(self) -> str:
+        """Generate the jid of a job put in this queue without one"""
+        return uuid.uuid4().hex
 
     def pause(self) -> None:
         self.client("queue.pause", self.name)
@@ -143,23 +257,58 @@ class Queue(AbstractQueue):
             "queue.put",
             self.worker_name,
             self.name,
-            jid or uuid.uuid4().hex,
-            self.class_string(klass),
-            data,
-            delay or 0,
-            "priority",
-            priority or 0,
-            "tags",
-            json.dumps(tags or []),
-            "retries",
-            retries or 5,
-            "depends",
-            json.dumps(depends or []),
-            "throttles",
-            json.dumps(throttles or []),
+            *put_args(
+                self.client.codec,
+                jid or self.new_jid(),
+                klass,
+                data,
+                priority,
+                tags,
+                delay,
+                retries,
+                depends,
+                throttles,
+            ),
         )
         return response
 
+    def put_many(
+        self,
+        jobs: Iterable[Dict[str, Any]],
+        chunk_size: int = 500,
+        budget: Optional[float] = 0.01,
+    ) -> List[str]:
+        """Put many jobs into this queue, returning their jids in order. Each
+        job is a dictionary of the keyword arguments accepted by `put`. Jobs
+        are sent to the server up to `chunk_size` at a time. The server stops
+        putting a chunk's jobs once a call has taken `budget` seconds, so that
+        no call blocks it for longer than that, and the rest are sent in the
+        next call. With no budget, each chunk is put in a single call."""
+        jids: List[str] = []
+        for chunk in put_many_chunks(jobs, chunk_size, self.new_jid):
+            jids.extend(self._put_chunk(chunk, budget))
+        return jids
+
+    def _put_chunk(
+        self, chunk: List[Dict[str, Any]], budget: Optional[float]
+    ) -> List[str]:
+        """Put all of the jobs in a chunk, in as many calls as the budget
+        requires"""
+        jids: List[str] = []
+        while chunk:
+            put: List[str] = self.client.codec.loads(
+                self.client(
+                    "queue.putMulti",
+                    self.worker_name,
+                    self.name,
+                    self.client.codec.dumps(chunk),
+                    budget or 0,
+                )
+            )
+            jids.extend(put)
+            chunk = chunk[len(put) :]
+        return jids
+
     """Same function as above but check if the job already exists in the DB beforehand.
     You can re-queue for instance failed ones."""
 
@@ -179,20 +328,18 @@ class Queue(AbstractQueue):
             "job.requeue",
             self.worker_name,
             self.name,
-            jid or uuid.uuid4().hex,
-            self.class_string(klass),
-            data,
-            delay or 0,
-            "priority",
-            priority or 0,
-            "tags",
-            json.dumps(tags or []),
-            "retries",
-            retries or 5,
-            "depends",
-            json.dumps(depends or []),
-            "throttles",
-            json.dumps(throttles or []),
+            *put_args(
+                self.client.codec,
+                jid or self.new_jid(),
+                klass,
+                data,
+                priority,
+                tags,
+                delay,
+                retries,
+                depends,
+                throttles,
+            ),
         )
         return response
 
@@ -212,32 +359,43 @@ class Queue(AbstractQueue):
         response: str = self.client(
             "queue.recurAtInterval",
             self.name,
-            jid or uuid.uuid4().hex,
-            self.class_string(klass),
-            data,
-            interval,
-            offset,
-            "priority",
-            priority or 0,
-            "tags",
-            json.dumps(tags or []),
-            "retries",
-            retries or 5,
-            "throttles",
-            json.dumps(throttles or []),
+            *recur_args(
+                self.client.codec,
+                jid or self.new_jid(),
+                klass,
+                data,
+                interval,
+                offset,
+                priority,
+                tags,
+                retries,
+                throttles,
+            ),
         )
         return response
 
     def pop(
-        self, count: Optional[int] = None
+        self,
+        count: Optional[int] = None,
+        fields: Optional[Iterable[str]] = None,
+        lite: bool = False,
     ) -> Union[AbstractJob, List[AbstractJob], None]:
         """Passing in the queue from which to pull items, the current time,
         when the locks for these returned items should expire, and the number
-        of items to be popped off."""
+        of items to be popped off. Jobs can be limited to the named `fields`,
+        or with `lite` to those needed to process them, leaving out history,
+        dependents and dependencies. Reading a field that was left out raises
+        a KeyError."""
         results: List[AbstractJob] = [
             Job(self.client, **job)
-            for job in json.loads(
-                self.client("queue.pop", self.name, self.worker_name, count or 1)
+            for job in self.client.codec.loads(
+                self.client(
+                    "queue.pop",
+                    self.name,
+                    self.worker_name,
+                    count or 1,
+                    encode_fields(self.client.codec, fields, lite),
+                )
             )
         ]
         if count is None:
@@ -245,15 +403,29 @@ class Queue(AbstractQueue):
         return results
 
     def peek(
-        self, offset: Optional[int] = None, count: Optional[int] = None
+        self,
+        offset: Optional[int] = None,
+        count: Optional[int] = None,
+        fields: Optional[Iterable[str]] = None,
+        lite: bool = False,
     ) -> Union[AbstractJob, List[AbstractJob], None]:
         """Similar to the pop command, except that it merely peeks at the next
-        items"""
+        items. Jobs can be limited to the named `fields`, or with `lite` to
+        those needed to process them, leaving out history, dependents and
+        dependencies. Reading a field that was left out raises a KeyError."""
         _offset = offset or 0
         _count = count or 1
         results: List[AbstractJob] = [
             Job(self.client, **rec)
-            for rec in json.loads(self.client("queue.peek", self.name, _offset, _count))
+            for rec in self.client.codec.loads(
+                self.client(
+                    "queue.peek",
+                    self.name,
+                    _offset,
+                    _count,
+                    encode_fields(self.client.codec, fields, lite),
+                )
+            )
         ]
         if count is None:
             return (len(results) and results[0]) or None
@@ -277,7 +449,7 @@ class Queue(AbstractQueue):
         resolution for the first day, the hour resolution for the first 3
         days, and then at the day resolution from there on out. The
         `histogram` key is a list of those values."""
-        response: Dict = json.loads(
+        response: Dict = self.client.codec.loads(
             self.client("queue.stats", self.name, date or repr(time.time()))
         )
         return response
@@ -1,4 +1,3 @@
-import json
 from typing import Dict, List
 
 from reqless.abstract import AbstractClient, AbstractQueuePatterns
@@ -11,9 +10,11 @@ class QueuePatterns(AbstractQueuePatterns):
 
     def get_queue_identifier_patterns(self) -> Dict[str, List[str]]:
         serialized_patterns: str = self.client("queueIdentifierPatterns.getAll")
-        identifiers_with_serialized_values = json.loads(serialized_patterns)
+        identifiers_with_serialized_values = self.client.codec.loads(
+            serialized_patterns
+        )
         patterns = {
-            identifier: json.loads(json_patterns)
+            identifier: self.client.codec.loads(json_patterns)
             for identifier, json_patterns in identifiers_with_serialized_values.items()
         }
         return patterns
@@ -25,16 +26,18 @@ class QueuePatterns(AbstractQueuePatterns):
         args: List[str] = [
             item
             for identifier, patterns in identifier_patterns.items()
-            for item in [identifier, json.dumps(patterns)]
+            for item in [identifier, self.client.codec.dumps(patterns)]
         ]
         self.client("queueIdentifierPatterns.setAll", *args)
 
     def get_queue_priority_patterns(self) -> List[QueuePriorityPattern]:
         serialized_priority_patterns_json = self.client("queuePriorityPatterns.getAll")
-        serialized_priority_patterns = json.loads(serialized_priority_patterns_json)
+        serialized_priority_patterns = self.client.codec.loads(
+            serialized_priority_patterns_json
+        )
         queue_priority_patterns: List[QueuePriorityPattern] = []
         for serialized_priority_pattern in serialized_priority_patterns:
-            priority_pattern_data = json.loads(serialized_priority_pattern)
+            priority_pattern_data = self.client.codec.loads(serialized_priority_pattern)
             queue_priority_pattern = QueuePriorityPattern(
                 patterns=priority_pattern_data["pattern"],
                 should_distribute_fairly=bool(
@@ -49,7 +52,7 @@ class QueuePatterns(AbstractQueuePatterns):
         queue_priority_patterns: List[QueuePriorityPattern],
     ) -> None:
         serialized_patterns = [
-            json.dumps(
+            self.client.codec.dumps(
                 {
                     "fairly": queue_priority_pattern.should_distribute_fairly,
                     "pattern": queue_priority_pattern.patterns,
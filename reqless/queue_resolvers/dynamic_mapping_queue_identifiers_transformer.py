@@ -1,18 +1,17 @@
-import re
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
-from reqless import Client
-from reqless.abstract import AbstractQueueIdentifiersTransformer
+from reqless.abstract import AbstractClient, AbstractQueueIdentifiersTransformer
+from reqless.queue_resolvers.queue_name_matcher import get_queue_name_matcher
 
 
 class DynamicMappingQueueIdentifiersTransformer(AbstractQueueIdentifiersTransformer):
     def __init__(
         self,
-        client: Client,
+        client: AbstractClient,
         dynamic_queue_mapping_refresh_frequency_milliseconds: Optional[int] = None,
     ):
-        self.client: Client = client
+        self.client: AbstractClient = client
 
         self._dynamic_queue_mapping: Optional[Dict[str, List[str]]] = None
         self._dynamic_queue_mapping_ttl_time_delta: timedelta = timedelta(
@@ -21,8 +20,19 @@ class DynamicMappingQueueIdentifiersTransformer(AbstractQueueIdentifiersTransfor
             ),
         )
         self._dynamic_queue_mapping_expires_at: datetime = datetime.now(tz=timezone.utc)
+        # The known queue names, and the version of the set of queues they were
+        # read at
+        self._known_queue_names: Optional[Tuple[int, List[str]]] = None
+        # The last resolution, and the version, mapping and identifiers it was
+        # made from
+        self._resolved: Optional[
+            Tuple[int, Dict[str, List[str]], List[str], List[str]]
+        ] = None
 
     def _get_dynamic_queue_mapping(self) -> Dict[str, List[str]]:
+        # The client's cache already keeps the mapping until it changes
+        if self.client.cache is not None:
+            return self.client.queue_patterns.get_queue_identifier_patterns()
         if (
             self._dynamic_queue_mapping is None
             or self._dynamic_queue_mapping_expires_at <= datetime.now(tz=timezone.utc)
@@ -36,6 +46,13 @@ class DynamicMappingQueueIdentifiersTransformer(AbstractQueueIdentifiersTransfor
             )
         return self._dynamic_queue_mapping
 
+    def _get_known_queue_names(self, version: int) -> List[str]:
+        """The names of all known queues, which are only read again once the
+        version of the set of queues has changed"""
+        if self._known_queue_names is None or self._known_queue_names[0] != version:
+            self._known_queue_names = (version, self.client.queues.names)
+        return self._known_queue_names[1]
+
     @staticmethod
     def resolve_queue_names(
         dynamic_queue_mapping: Dict[str, List[str]],
@@ -60,34 +77,45 @@ class DynamicMappingQueueIdentifiersTransformer(AbstractQueueIdentifiersTransfor
             else:
                 expanded_patterns.append(queue_pattern)
 
-        # Next, resolve patterns to actual queue names
-        matched_queues: List[str] = []
+        # Next, resolve patterns to actual queue names, kept in the order they
+        # were matched
+        matcher = get_queue_name_matcher(tuple(known_queue_names))
+        matched_queues: Dict[str, None] = {}
         for pattern in expanded_patterns:
             is_static_pattern = "!" not in pattern and "*" not in pattern
             # Always include static queue names even if the queue doesn't exist
-            if is_static_pattern and pattern not in matched_queues:
-                matched_queues.append(pattern)
+            if is_static_pattern:
+                matched_queues.setdefault(pattern, None)
                 continue
 
             negated = pattern.startswith("!")
             pattern_without_negate = pattern[1:] if negated else pattern
-            regex = re.compile(pattern_without_negate.replace("*", ".*"))
-            for known_queue_name in known_queue_names:
-                if regex.fullmatch(known_queue_name):
-                    if negated:
-                        matched_queues.remove(known_queue_name)
-                    else:
-                        # Only add queue name if it hasn't been added already
-                        # In this way, a given match will maintain its earliest
-                        # position unless fully removed
-                        if known_queue_name not in matched_queues:
-                            matched_queues.append(known_queue_name)
+            for known_queue_name in matcher.match(pattern_without_negate):
+                if negated:
+                    matched_queues.pop(known_queue_name, None)
+                else:
+                    # Only add queue name if it hasn't been added already
+                    # In this way, a given match will maintain its earliest
+                    # position unless fully removed
+                    matched_queues.setdefault(known_queue_name, None)
 
-        return matched_queues
+        return list(matched_queues)
 
     def transform(self, queue_identifiers: List[str]) -> List[str]:
-        return DynamicMappingQueueIdentifiersTransformer.resolve_queue_names(
-            dynamic_queue_mapping=self._get_dynamic_queue_mapping(),
-            known_queue_names=[count["name"] for count in self.client.queues.counts],
+        # Read before the queue names, so that a queue added in between causes
+        # them to be read again next time
+        version = self.client.queues.version
+        mapping = self._get_dynamic_queue_mapping()
+        if self._resolved is not None and self._resolved[:3] == (
+            version,
+            mapping,
+            queue_identifiers,
+        ):
+            return list(self._resolved[3])
+        resolved = DynamicMappingQueueIdentifiersTransformer.resolve_queue_names(
+            dynamic_queue_mapping=mapping,
+            known_queue_names=self._get_known_queue_names(version),
             patterns=queue_identifiers,
         )
+        self._resolved = (version, mapping, list(queue_identifiers), resolved)
+        return list(resolved)
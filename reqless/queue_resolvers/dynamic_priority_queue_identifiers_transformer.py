@@ -1,20 +1,19 @@
-import re
+import random
 from datetime import datetime, timedelta, timezone
-from random import SystemRandom
-from typing import List, Optional
+from typing import Dict, List, Optional
 
-from reqless import Client
-from reqless.abstract import AbstractQueueIdentifiersTransformer
+from reqless.abstract import AbstractClient, AbstractQueueIdentifiersTransformer
 from reqless.models import QueuePriorityPattern
+from reqless.queue_resolvers.queue_name_matcher import get_queue_name_matcher
 
 
 class DynamicPriorityQueueIdentifiersTransformer(AbstractQueueIdentifiersTransformer):
     def __init__(
         self,
-        client: Client,
+        client: AbstractClient,
         dynamic_queue_priorities_refresh_frequency_milliseconds: Optional[int] = None,
     ):
-        self.client: Client = client
+        self.client: AbstractClient = client
 
         self._dynamic_queue_priorities: Optional[List[QueuePriorityPattern]] = None
         self._dynamic_queue_priorities_ttl_time_delta: timedelta = timedelta(
@@ -27,6 +26,9 @@ class DynamicPriorityQueueIdentifiersTransformer(AbstractQueueIdentifiersTransfo
         )
 
     def _get_dynamic_queue_priorities(self) -> List[QueuePriorityPattern]:
+        # The client's cache already keeps the priorities until they change
+        if self.client.cache is not None:
+            return self.client.queue_patterns.get_queue_priority_patterns()
         if (
             self._dynamic_queue_priorities is None
             or self._dynamic_queue_priorities_expires_at
@@ -46,9 +48,10 @@ class DynamicPriorityQueueIdentifiersTransformer(AbstractQueueIdentifiersTransfo
         queue_identifiers: List[str],
         queue_priority_patterns: List[QueuePriorityPattern],
     ) -> List[str]:
-        rand = SystemRandom()
+        matcher = get_queue_name_matcher(tuple(queue_identifiers))
         prioritized_queue_groups: List[List[str]] = []
-        _queue_identifiers = list(queue_identifiers)
+        # The queues not yet in a group, in their original order
+        remaining_queues: Dict[str, None] = dict.fromkeys(queue_identifiers)
 
         default_index = -1
         default_should_distribute_fairly = False
@@ -61,39 +64,31 @@ class DynamicPriorityQueueIdentifiersTransformer(AbstractQueueIdentifiersTransfo
                 )
                 continue
 
-            priority_group_queues: List[str] = []
+            group_queues: Dict[str, None] = {}
             for pattern in queue_priority_pattern.patterns:
                 negated = pattern.startswith("!")
                 _pattern = pattern[1:] if negated else pattern
-                regex = re.compile(_pattern.replace("*", ".*"))
-
-                if negated:
-                    queues_to_remove = []
-                    for queue in priority_group_queues:
-                        if regex.fullmatch(queue):
-                            queues_to_remove.append(queue)
-                    for queue in queues_to_remove:
-                        priority_group_queues.remove(queue)
-                else:
-                    for queue in _queue_identifiers:
-                        if (
-                            regex.fullmatch(queue)
-                            and queue not in priority_group_queues
-                        ):
-                            priority_group_queues.append(queue)
+
+                for queue in matcher.match(_pattern):
+                    if negated:
+                        group_queues.pop(queue, None)
+                    elif queue in remaining_queues:
+                        group_queues.setdefault(queue, None)
 
             # Remove matched queues from remaining queue identifiers
-            for queue_identifier in priority_group_queues:
-                _queue_identifiers.remove(queue_identifier)
+            for queue_identifier in group_queues:
+                del remaining_queues[queue_identifier]
 
+            priority_group_queues = list(group_queues)
             if queue_priority_pattern.should_distribute_fairly:
-                rand.shuffle(priority_group_queues)
+                random.shuffle(priority_group_queues)
 
             prioritized_queue_groups.append(priority_group_queues)
 
         # insert remaining queues at the position of the default item (or at the end)
+        _queue_identifiers = list(remaining_queues)
         if default_should_distribute_fairly:
-            rand.shuffle(_queue_identifiers)
+            random.shuffle(_queue_identifiers)
 
         _default_index = (
             default_index if default_index != -1 else len(prioritized_queue_groups)
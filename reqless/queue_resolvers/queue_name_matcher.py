@@ -0,0 +1,63 @@
+import re
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Dict, List, Pattern, Tuple
+
+
+# Regular expression syntax, other than `.` and the `*` wildcard, that makes
+# the leading characters of a pattern something other than a literal prefix
+_NON_LITERAL = re.compile(r"[+?{}\[\]\\|()^$]")
+
+
+@lru_cache(maxsize=1024)
+def compile_pattern(pattern: str) -> Pattern[str]:
+    """Compile a queue pattern, in which `*` matches anything"""
+    return re.compile(pattern.replace("*", ".*"))
+
+
+def literal_prefix(pattern: str) -> str:
+    """The prefix every name matching a queue pattern starts with"""
+    if _NON_LITERAL.search(pattern):
+        return ""
+    end = len(pattern)
+    for wildcard in ".*":
+        index = pattern.find(wildcard)
+        if index != -1:
+            end = min(end, index)
+    return pattern[:end]
+
+
+class QueueNameMatcher:
+    """Finds which of a list of queue names match queue patterns. The names
+    are also kept sorted, so that a pattern is only tested against those that
+    share its literal prefix, and the matches for each pattern are kept."""
+
+    def __init__(self, names: Tuple[str, ...]):
+        self._positions: Dict[str, int] = {}
+        for name in names:
+            self._positions.setdefault(name, len(self._positions))
+        self._sorted: List[str] = sorted(self._positions)
+        self._matches: Dict[str, List[str]] = {}
+
+    def match(self, pattern: str) -> List[str]:
+        """The names matching a pattern, in the order they were given"""
+        matches = self._matches.get(pattern)
+        if matches is None:
+            prefix = literal_prefix(pattern)
+            regex = compile_pattern(pattern)
+            matches = []
+            for index in range(bisect_left(self._sorted, prefix), len(self._sorted)):
+                name = self._sorted[index]
+                if not name.startswith(prefix):
+                    break
+                if regex.fullmatch(name):
+                    matches.append(name)
+            matches.sort(key=self._positions.__getitem__)
+            self._matches[pattern] = matches
+        return matches
+
+
+@lru_cache(maxsize=8)
+def get_queue_name_matcher(names: Tuple[str, ...]) -> QueueNameMatcher:
+    """A matcher for the names, reused as long as they're the same"""
+    return QueueNameMatcher(names)
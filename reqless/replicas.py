@@ -0,0 +1,76 @@
+"""Routing read-only reqless commands to replicas"""
+
+import itertools
+import time
+from typing import Any, FrozenSet, Iterable, Iterator, List, Optional
+
+from redis import Redis
+
+
+# The reqless API commands that never write, and so can run on a read-only
+# replica. Commands that do housekeeping as they read, like `queue.peek`,
+# `queue.jobsByState` and `workers.counts`, aren't included.
+READ_ONLY_COMMANDS: FrozenSet[str] = frozenset(
+    [
+        "config.get",
+        "config.getAll",
+        "failureGroups.counts",
+        "job.get",
+        "job.getMulti",
+        "job.getMultiFields",
+        "jobs.completed",
+        "jobs.failedByGroup",
+        "jobs.tagged",
+        "jobs.tracked",
+        "queue.counts",
+        "queue.length",
+        "queue.stats",
+        "queue.throttle.get",
+        "queueIdentifierPatterns.getAll",
+        "queuePriorityPatterns.getAll",
+        "queues.counts",
+        "queues.countsPage",
+        "queues.names",
+        "queues.nextDue",
+        "queues.nextMaintenance",
+        "queues.version",
+        "recurringJob.get",
+        "tags.top",
+        "throttle.get",
+        "throttle.locks",
+        "throttle.pending",
+    ]
+)
+
+
+class Replicas:
+    """A round-robin pool of replica connections. A replica that fails is
+    skipped for `retry_interval` seconds before being tried again."""
+
+    def __init__(
+        self, urls: Iterable[str], retry_interval: float = 30.0, **kwargs: Any
+    ):
+        self.databases: List[Redis] = [Redis.from_url(url, **kwargs) for url in urls]
+        self.retry_interval: float = retry_interval
+        self._down_until: List[float] = [0.0] * len(self.databases)
+        self._counter: Iterator[int] = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self.databases)
+
+    def choose(self) -> Optional[Redis]:
+        """The next healthy replica, or None if there are none"""
+        if not self.databases:
+            return None
+        start = next(self._counter)
+        now = time.time()
+        for offset in range(len(self.databases)):
+            index = (start + offset) % len(self.databases)
+            if self._down_until[index] <= now:
+                return self.databases[index]
+        return None
+
+    def mark_down(self, database: Redis) -> None:
+        """Stop using a replica for a while"""
+        index = self.databases.index(database)
+        self._down_until[index] = time.time() + self.retry_interval
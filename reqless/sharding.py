@@ -0,0 +1,655 @@
+"""Spreading queues across several independent servers"""
+
+import bisect
+import hashlib
+import heapq
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar, Union
+
+from redis import Redis
+
+from reqless import Client
+from reqless.abstract import (
+    AbstractClient,
+    AbstractConfig,
+    AbstractJob,
+    AbstractJobs,
+    AbstractQueue,
+    AbstractQueuePatterns,
+    AbstractQueues,
+    AbstractRecurringJob,
+    AbstractThrottle,
+    AbstractThrottles,
+    AbstractWorkers,
+)
+from reqless.batch import Batch, Command
+from reqless.codec import JSONCodec
+from reqless.config import Config
+from reqless.exceptions import CrossShardError
+from reqless.queue import Queue
+from reqless.tracking import TrackingCache
+
+
+T = TypeVar("T")
+
+# Separates the name of a job's shard from the rest of its jid
+JID_SEPARATOR = ":"
+
+
+class HashRing:
+    """A consistent-hash ring mapping keys to nodes. Each node is placed on the
+    ring `replicas` times, so that adding or removing a node only moves about
+    its share of the keys."""
+
+    def __init__(self, nodes: Iterable[str], replicas: int = 100):
+        self._points: List[Tuple[int, str]] = sorted(
+            (self.hash("%s-%i" % (node, replica)), node)
+            for node in nodes
+            for replica in range(replicas)
+        )
+        if not self._points:
+            raise ValueError("A hash ring needs at least one node")
+        self._hashes: List[int] = [point for point, _ in self._points]
+
+    @staticmethod
+    def hash(key: str) -> int:
+        return int(hashlib.md5(key.encode("utf-8")).hexdigest()[:16], 16)
+
+    def __getitem__(self, key: str) -> str:
+        """The node that owns this key"""
+        index = bisect.bisect(self._hashes, self.hash(key)) % len(self._points)
+        return self._points[index][1]
+
+
+def destination(command: str, args: Tuple[Any, ...]) -> Optional[str]:
+    """The queue that a command puts a job in, if it puts one in a queue"""
+    if command in ("queue.put", "queue.putMulti", "job.requeue"):
+        return str(args[1])
+    if command == "job.completeAndRequeue":
+        return str(args[4])
+    if command == "queue.recurAtInterval":
+        return str(args[0])
+    if command == "recurringJob.update":
+        options = dict(zip(args[1::2], args[2::2]))
+        queue = options.get("queue")
+        return None if queue is None else str(queue)
+    return None
+
+
+class Shard(Client):
+    """A client for one shard. It refuses commands that would put a job in a
+    queue owned by another shard, like moving a job or completing it into the
+    next queue, since the job would be left on this shard where that queue's
+    workers would never find it."""
+
+    def __init__(
+        self, sharded: "ShardedClient", shard_name: str, url: str, **kwargs: Any
+    ):
+        super().__init__(url, **kwargs)
+        self.sharded: ShardedClient = sharded
+        self.shard_name: str = shard_name
+
+    def check_destination(self, command: str, args: Tuple[Any, ...]) -> None:
+        """Raise `CrossShardError` if a command would put a job in a queue on
+        another shard"""
+        queue_name = destination(command, args)
+        if queue_name is None:
+            return
+        owner = self.sharded.shard_name_for_queue(queue_name)
+        if owner != self.shard_name:
+            raise CrossShardError(
+                "Queue %s is on shard %s, not %s" % (queue_name, owner, self.shard_name)
+            )
+
+    def __call__(self, command: str, *args: Any) -> Any:
+        self.check_destination(command, args)
+        return super().__call__(command, *args)
+
+    def _send_batch(self, commands: List[Command]) -> List[Any]:
+        for command, args in commands:
+            self.check_destination(command, args)
+        return super()._send_batch(commands)
+
+
+class ShardedQueue(Queue):
+    """A queue on one shard, whose generated jids name that shard"""
+
+    def __init__(
+        self, name: str, client: AbstractClient, worker_name: str, shard_name: str
+    ):
+        super().__init__(name, client, worker_name)
+        self.shard_name: str = shard_name
+
+    def new_jid(self) -> str:
+        return self.shard_name + JID_SEPARATOR + super().new_jid()
+
+
+class ShardedConfig(Config):
+    """Config that's read from the first shard and written to all of them.
+    Reads go through the first shard's own config, so they're cached with a
+    `config_ttl`, and every write reaches that shard to invalidate them."""
+
+    def __init__(self, client: "ShardedClient"):
+        super().__init__(client.primary)
+        self._sharded: ShardedClient = client
+
+    @property
+    def all(self) -> Dict[str, Any]:
+        return self._sharded.primary.config.all
+
+    def __getitem__(self, option: str) -> Any:
+        return self._sharded.primary.config[option]
+
+    def __setitem__(self, option: str, value: Any) -> None:
+        self._sharded.fan_out(lambda shard: shard("config.set", option, value))
+
+    def __delitem__(self, option: str) -> None:
+        self._sharded.fan_out(lambda shard: shard("config.unset", option))
+
+    def clear(self) -> None:
+        """Remove all keys"""
+        for key in self.keys():
+            del self[key]
+
+
+def merge_by_score(
+    pages: Iterable[List[Tuple[T, float]]], reverse: bool = False
+) -> List[T]:
+    """Merge pages of items and their scores, each already sorted by score,
+    into one list of items sorted by score"""
+    merged = heapq.merge(*pages, key=lambda item: item[1], reverse=reverse)
+    return [item for item, _ in merged]
+
+
+class ShardedJobs(AbstractJobs):
+    """Jobs across all shards. Lookups by jid go straight to the shard named
+    in the jid, and to every shard for jids that don't name one. Paginated
+    listings take the first `offset + count` from every shard and merge them
+    by time, since any of those may be on the page."""
+
+    def __init__(self, client: "ShardedClient"):
+        self.client: ShardedClient = client
+
+    def complete(self, offset: int = 0, count: int = 25) -> List[str]:
+        """Return the paginated jids of complete jobs, most recent first"""
+        if offset + count < 1:
+            return []
+        pages = self.client.fan_out(
+            lambda shard: shard.database.zrange(
+                "ql:completed", 0, offset + count - 1, desc=True, withscores=True
+            )
+        )
+        return merge_by_score(pages, reverse=True)[offset : offset + count]
+
+    def tracked(self) -> Dict[str, List[Any]]:
+        """Return an array of job objects that are being tracked"""
+        results = self.client.fan_out(lambda shard: shard.jobs.tracked())
+        return {
+            "jobs": [job for result in results for job in result["jobs"]],
+            "expired": [
+                jid
+                for result in results
+                if isinstance(result["expired"], list)
+                for jid in result["expired"]
+            ],
+        }
+
+    def tagged(self, tag: str, offset: int = 0, count: int = 25) -> Dict[str, Any]:
+        """Return the paginated jids of jobs tagged with a tag, in the order
+        they were tagged"""
+        key = "ql:t:" + tag
+
+        def page(shard: Shard) -> Tuple[int, List[Tuple[str, float]]]:
+            if offset + count < 1:
+                return shard.database.zcard(key), []
+            with shard.database.pipeline(transaction=False) as pipeline:
+                pipeline.zcard(key)
+                pipeline.zrange(key, 0, offset + count - 1, withscores=True)
+                total, scored = pipeline.execute()
+            return total, scored
+
+        results = self.client.fan_out(page)
+        jids = merge_by_score(scored for _, scored in results)
+        return {
+            "total": sum(total for total, _ in results),
+            "jobs": jids[offset : offset + count],
+        }
+
+    def failed(
+        self,
+        group: Optional[str] = None,
+        start: int = 0,
+        limit: int = 25,
+    ) -> Dict[str, Any]:
+        """If no group is provided, this returns the counts of the various
+        groups of failures known across shards. If a group is provided,
+        returns paginated job objects affected by that kind of failure."""
+        if not group:
+            counts: Dict[str, Any] = {}
+            for result in self.client.fan_out(lambda shard: shard.jobs.failed()):
+                for name, count in result.items():
+                    counts[name] = counts.get(name, 0) + count
+            return counts
+        results = self.client.fan_out(
+            lambda shard: shard.jobs.failed(group, 0, start + limit)
+        )
+        # Each shard's failures are listed most recent first
+        jobs = merge_by_score(
+            (
+                [(job, (job.failure or {}).get("when") or 0) for job in result["jobs"]]
+                for result in results
+            ),
+            reverse=True,
+        )
+        return {
+            "total": sum(result["total"] for result in results),
+            "jobs": jobs[start : start + limit],
+        }
+
+    def get(
+        self, *jids: str, fields: Optional[Iterable[str]] = None, lite: bool = False
+    ) -> List[AbstractJob]:
+        """Return jobs objects for all the jids"""
+        if not jids:
+            return []
+        found: Dict[str, AbstractJob] = {}
+        for shard, shard_jids in self.client.group_jids(jids):
+            for job in shard.jobs.get(*shard_jids, fields=fields, lite=lite):
+                found[job.jid] = job
+        return [found[jid] for jid in jids if jid in found]
+
+    def heartbeat(self, *jids: str) -> Dict[str, float]:
+        """Renew this client's locks on all the jids, with one call per shard"""
+        renewed: Dict[str, float] = {}
+        for shard, shard_jids in self.client.group_jids(jids):
+            renewed.update(shard.jobs.heartbeat(*shard_jids))
+        return renewed
+
+    def __getitem__(
+        self, jid: str
+    ) -> Optional[Union[AbstractJob, AbstractRecurringJob]]:
+        """Get a job object corresponding to that jid, or ``None`` if it
+        doesn't exist"""
+        shard = self.client.shard_for_jid(jid)
+        shards = [shard] if shard is not None else self.client.shards.values()
+        for candidate in shards:
+            job = candidate.jobs[jid]
+            if job is not None:
+                return job
+        return None
+
+
+class ShardedQueues(AbstractQueues):
+    """Queues, each on the shard that owns it"""
+
+    def __init__(self, client: "ShardedClient"):
+        self.client: ShardedClient = client
+
+    @property
+    def counts(self) -> Any:
+        results = self.client.fan_out(lambda shard: shard.queues.counts)
+        counts = [count for result in results for count in result]
+        return sorted(counts, key=lambda count: count["name"])
+
+    def counts_page(
+        self, cursor: int = 0, count: int = 500
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """Pages through the queues of each shard in turn. The cursor combines
+        the index of the shard being paged through with that shard's own
+        cursor, so each call only looks at the shards on its page."""
+        shards = list(self.client.shards.values())
+        index, shard_cursor = cursor % len(shards), cursor // len(shards)
+        page: List[Dict[str, Any]] = []
+        while len(page) < count:
+            shard_cursor, counts = shards[index].queues.counts_page(
+                shard_cursor, count - len(page)
+            )
+            page.extend(counts)
+            if shard_cursor == 0:
+                index += 1
+                if index == len(shards):
+                    return 0, page
+        return shard_cursor * len(shards) + index, page
+
+    @property
+    def names(self) -> List[str]:
+        results = self.client.fan_out(lambda shard: shard.queues.names)
+        return sorted(name for result in results for name in result)
+
+    @property
+    def version(self) -> int:
+        """The sum of every shard's version, which only grows"""
+        return sum(self.client.fan_out(lambda shard: shard.queues.version))
+
+    def __getitem__(self, queue_name: str) -> AbstractQueue:
+        """Get a queue object associated with the provided queue name"""
+        shard_name = self.client.shard_name_for_queue(queue_name)
+        return ShardedQueue(
+            queue_name,
+            self.client.shards[shard_name],
+            self.client.worker_name,
+            shard_name,
+        )
+
+    def next_due(self, *queue_names: str) -> Optional[float]:
+        """When a job in any of the queues will next become available on its
+        own, or None if none will"""
+        dues = [
+            shard.queues.next_due(*names)
+            for shard, names in self.client.group_queues(queue_names)
+        ]
+        return min((due for due in dues if due is not None), default=None)
+
+    def wake_on_put(self, ttl: float, *queue_names: str) -> None:
+        """Publish to `ql:available:<queue>` when jobs are put in any of the
+        queues, for the next `ttl` seconds"""
+        for shard, names in self.client.group_queues(queue_names):
+            shard.queues.wake_on_put(ttl, *names)
+
+    def pop(
+        self,
+        queue_names: Iterable[str],
+        count: int = 1,
+        fields: Optional[Iterable[str]] = None,
+        lite: bool = False,
+    ) -> List[AbstractJob]:
+        """Pop up to `count` jobs from the queues in the order given, with one
+        call for each run of consecutive queues on the same shard"""
+        popped: List[AbstractJob] = []
+        runs = itertools.groupby(queue_names, key=self.client.shard_name_for_queue)
+        for shard_name, names in runs:
+            if len(popped) >= count:
+                break
+            popped.extend(
+                self.client.shards[shard_name].queues.pop(
+                    list(names), count - len(popped), fields, lite
+                )
+            )
+        return popped
+
+
+class ShardedThrottle(AbstractThrottle):
+    """A named throttle, which jobs acquire on the shard of their queue. It's
+    set on every shard, so its maximum applies to each shard separately, and
+    its locks and pending jobs are gathered from all of them."""
+
+    def __init__(self, client: "ShardedClient", name: str):
+        self.client: ShardedClient = client
+        self._name: str = name
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def delete(self) -> None:
+        self.client.fan_out(lambda shard: shard.throttles[self.name].delete())
+
+    def locks(self) -> List[str]:
+        results = self.client.fan_out(lambda shard: shard.throttles[self.name].locks())
+        return [jid for result in results for jid in result]
+
+    def maximum(self) -> int:
+        return self.client.primary.throttles[self.name].maximum()
+
+    def set_maximum(
+        self,
+        maximum: Optional[int] = None,
+        expiration: Optional[int] = None,
+    ) -> None:
+        _maximum = maximum if maximum is not None else self.maximum()
+        self.client.fan_out(
+            lambda shard: shard.throttles[self.name].set_maximum(_maximum, expiration)
+        )
+
+    def pending(self) -> List[str]:
+        results = self.client.fan_out(
+            lambda shard: shard.throttles[self.name].pending()
+        )
+        return [jid for result in results for jid in result]
+
+    def ttl(self) -> int:
+        return self.client.primary.throttles[self.name].ttl()
+
+
+class ShardedThrottles(AbstractThrottles):
+    """Throttles across shards. A queue's own throttle lives with the queue,
+    and named throttles are set on every shard."""
+
+    def __init__(self, client: "ShardedClient"):
+        self.client: ShardedClient = client
+
+    def __getitem__(self, throttle_name: str) -> AbstractThrottle:
+        queue_prefix = "ql:q:"
+        if throttle_name.startswith(queue_prefix):
+            queue_name = throttle_name[len(queue_prefix) :]
+            shard = self.client.shards[self.client.shard_name_for_queue(queue_name)]
+            return shard.throttles[throttle_name]
+        return ShardedThrottle(self.client, throttle_name)
+
+
+class ShardedWorkers(AbstractWorkers):
+    """Worker information merged across shards"""
+
+    def __init__(self, client: "ShardedClient"):
+        self.client: ShardedClient = client
+
+    @property
+    def counts(self) -> Any:
+        merged: Dict[str, Dict[str, Any]] = {}
+        for result in self.client.fan_out(lambda shard: shard.workers.counts):
+            for worker in result:
+                entry = merged.setdefault(
+                    worker["name"], {"name": worker["name"], "jobs": 0, "stalled": 0}
+                )
+                entry["jobs"] += worker["jobs"]
+                entry["stalled"] += worker["stalled"]
+                if "alive" in worker:
+                    entry["alive"] = entry.get("alive", False) or worker["alive"]
+        return list(merged.values())
+
+    def __getitem__(self, worker_name: str) -> Dict[str, Any]:
+        """Which jobs does a particular worker have running"""
+        results = self.client.fan_out(lambda shard: shard.workers[worker_name])
+        return {
+            "jobs": [jid for result in results for jid in result["jobs"]],
+            "stalled": [jid for result in results for jid in result["stalled"]],
+        }
+
+    def lease(self, worker_name: str, ttl: float) -> None:
+        """Workers may hold jobs on any shard, so they're leased on all"""
+        self.client.fan_out(lambda shard: shard.workers.lease(worker_name, ttl))
+
+    def unlease(self, worker_name: str) -> None:
+        self.client.fan_out(lambda shard: shard.workers.unlease(worker_name))
+
+
+class ShardedClient(AbstractClient):
+    """A client for queues spread across several independent servers. Each
+    queue lives on one shard, chosen by a consistent-hash ring over queue
+    names unless it's pinned to a shard. Jobs generated by this client have
+    jids that start with the name of their shard.
+
+    Operations on a single queue or job happen on its shard, and listings
+    across queues are gathered from all shards in parallel. Moving a job
+    between queues on different shards, like completing it into the next step
+    of a pipeline, raises `CrossShardError`, and depending on a job in another
+    queue isn't supported: pin such queues to the same shard. Named throttles
+    limit each shard separately. Commands invoked on the client directly, and
+    batches of them, use the first shard. Workers listen for events on every
+    shard."""
+
+    def __init__(
+        self,
+        urls: Dict[str, str],
+        hostname: Optional[str] = None,
+        pinned: Optional[Dict[str, str]] = None,
+        replicas: int = 100,
+        **kwargs: Any,
+    ):
+        if not urls:
+            raise ValueError("At least one shard is required")
+        for shard_name in urls:
+            if JID_SEPARATOR in shard_name:
+                raise ValueError(
+                    "Shard names can't contain %r: %s" % (JID_SEPARATOR, shard_name)
+                )
+        self.pinned: Dict[str, str] = dict(pinned or {})
+        for queue_name, shard_name in self.pinned.items():
+            if shard_name not in urls:
+                raise ValueError(
+                    "Queue %s is pinned to unknown shard %s" % (queue_name, shard_name)
+                )
+
+        self.shards: Dict[str, Shard] = {
+            shard_name: Shard(self, shard_name, url, hostname=hostname, **kwargs)
+            for shard_name, url in urls.items()
+        }
+        # The options this client was made with, so that it can be copied
+        self._urls: Dict[str, str] = dict(urls)
+        self._options: Dict[str, Any] = {
+            "pinned": self.pinned,
+            "replicas": replicas,
+            **kwargs,
+        }
+        self.primary: Shard = next(iter(self.shards.values()))
+        self.ring: HashRing = HashRing(self.shards, replicas)
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=len(self.shards), thread_name_prefix="reqless-shard"
+        )
+        self._config: AbstractConfig = ShardedConfig(self)
+        self._jobs: AbstractJobs = ShardedJobs(self)
+        self._queues: AbstractQueues = ShardedQueues(self)
+        self._throttles: AbstractThrottles = ShardedThrottles(self)
+        self._workers: AbstractWorkers = ShardedWorkers(self)
+
+    def shard_name_for_queue(self, queue_name: str) -> str:
+        """The name of the shard that owns a queue"""
+        return self.pinned.get(queue_name) or self.ring[queue_name]
+
+    def shard_for_jid(self, jid: str) -> Optional[Shard]:
+        """The shard named in a jid, if it names one"""
+        shard_name, separator, _ = jid.partition(JID_SEPARATOR)
+        if not separator:
+            return None
+        return self.shards.get(shard_name)
+
+    def group_queues(self, queue_names: Iterable[str]) -> List[Tuple[Shard, List[str]]]:
+        """Group queue names by the shard that owns them, keeping their order
+        and ordering shards by their first queue"""
+        groups: Dict[str, List[str]] = {}
+        for queue_name in queue_names:
+            groups.setdefault(self.shard_name_for_queue(queue_name), []).append(
+                queue_name
+            )
+        return [
+            (self.shards[shard_name], names) for shard_name, names in groups.items()
+        ]
+
+    def group_jids(self, jids: Iterable[str]) -> List[Tuple[Shard, List[str]]]:
+        """Group jids by the shard named in them. Jids that don't name a shard
+        are sent to every shard."""
+        groups: Dict[int, Tuple[Shard, List[str]]] = {}
+        unrouted: List[str] = []
+        for jid in jids:
+            shard = self.shard_for_jid(jid)
+            if shard is None:
+                unrouted.append(jid)
+            else:
+                groups.setdefault(id(shard), (shard, []))[1].append(jid)
+        if unrouted:
+            for shard in self.shards.values():
+                groups.setdefault(id(shard), (shard, []))[1].extend(unrouted)
+        return list(groups.values())
+
+    def fan_out(self, func: Callable[[Shard], T]) -> List[T]:
+        """Call a function with every shard in parallel, returning the results
+        in shard order"""
+        return list(self._executor.map(func, self.shards.values()))
+
+    def __call__(self, command: str, *args: Any) -> Any:
+        return self.primary(command, *args)
+
+    def batch(self) -> Batch:
+        """A batch of commands for the first shard, like those invoked on the
+        client directly"""
+        return self.primary.batch()
+
+    def gc(self, limit: int = 1000) -> int:
+        """Delete up to `limit` expired completed jobs on each shard,
+        returning how many were deleted in all"""
+        return sum(self.fan_out(lambda shard: shard.gc(limit)))
+
+    def release_dependents(self, limit: int = 1000) -> int:
+        """Release up to `limit` dependents of completed jobs on each shard,
+        returning how many were released in all"""
+        return sum(self.fan_out(lambda shard: shard.release_dependents(limit)))
+
+    def maintain(self, limit: int = 1000) -> int:
+        """Do the housekeeping for up to `limit` jobs in due queues on each
+        shard, returning how many were handled in all"""
+        return sum(self.fan_out(lambda shard: shard.maintain(limit)))
+
+    def next_maintenance(self) -> Optional[float]:
+        """When the next queue on any shard is due for housekeeping"""
+        dues = self.fan_out(lambda shard: shard.next_maintenance())
+        return min((due for due in dues if due is not None), default=None)
+
+    @property
+    def cache(self) -> Optional[TrackingCache]:
+        """The first shard's cache, which holds what's read from it, like
+        queue patterns"""
+        return self.primary.cache
+
+    @property
+    def config(self) -> AbstractConfig:
+        return self._config
+
+    @property
+    def jobs(self) -> AbstractJobs:
+        return self._jobs
+
+    @property
+    def queues(self) -> AbstractQueues:
+        return self._queues
+
+    @property
+    def queue_patterns(self) -> AbstractQueuePatterns:
+        return self.primary.queue_patterns
+
+    @property
+    def database(self) -> Redis:
+        return self.primary.database
+
+    @property
+    def databases(self) -> List[Redis]:
+        return [shard.database for shard in self.shards.values()]
+
+    @property
+    def uses_functions(self) -> bool:
+        """Whether every shard runs commands as a function"""
+        return all(shard.uses_functions for shard in self.shards.values())
+
+    @property
+    def codec(self) -> JSONCodec:
+        return self.primary.codec
+
+    @property
+    def throttles(self) -> AbstractThrottles:
+        return self._throttles
+
+    @property
+    def workers(self) -> AbstractWorkers:
+        return self._workers
+
+    @property
+    def worker_name(self) -> str:
+        return self.primary.worker_name
+
+    @worker_name.setter
+    def worker_name(self, value: str) -> None:
+        for shard in self.shards.values():
+            shard.worker_name = value
+
+    def with_worker_name(self, worker_name: str) -> "ShardedClient":
+        return ShardedClient(self._urls, hostname=worker_name, **self._options)
@@ -1,4 +1,3 @@
-import json
 from typing import Any, Dict, List, Optional
 
 from reqless.abstract import AbstractClient, AbstractThrottle
@@ -18,12 +17,14 @@ class Throttle(AbstractThrottle):
 
     def locks(self) -> List[str]:
         response_json: str = self.client("throttle.locks", self.name)
-        response: List[str] = json.loads(response_json)
+        response: List[str] = self.client.codec.loads(response_json)
         return response
 
     def maximum(self) -> int:
         json_state = self.client("throttle.get", self.name)
-        state: Dict[str, Any] = json.loads(json_state) if json_state else {}
+        state: Dict[str, Any] = (
+            self.client.codec.loads(json_state) if json_state else {}
+        )
         maximum: int = state.get("maximum", 0)
         return maximum
 
@@ -37,11 +38,13 @@ class Throttle(AbstractThrottle):
 
     def pending(self) -> List[str]:
         response_json: str = self.client("throttle.pending", self.name)
-        response: List[str] = json.loads(response_json)
+        response: List[str] = self.client.codec.loads(response_json)
         return response
 
     def ttl(self) -> int:
         json_state = self.client("throttle.get", self.name)
-        state: Dict[str, Any] = json.loads(json_state) if json_state else {}
+        state: Dict[str, Any] = (
+            self.client.codec.loads(json_state) if json_state else {}
+        )
         ttl: int = state.get("ttl", -2)
         return ttl
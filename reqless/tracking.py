@@ -0,0 +1,208 @@
+"""Caching slowly-changing reqless reads on the client, invalidated by the
+server as soon as the keys they depend on change"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from redis import Redis
+from redis.connection import Connection
+
+from reqless.codec import JSONCodec
+from reqless.logger import logger
+
+
+# The reqless API commands whose results are cached, and the keys each result
+# is read from
+CACHEABLE_COMMANDS: Dict[str, Callable[[Tuple[Any, ...]], List[str]]] = {
+    "config.get": lambda args: ["ql:config"],
+    "config.getAll": lambda args: ["ql:config"],
+    "queueIdentifierPatterns.getAll": lambda args: [
+        "ql:qp:identifiers",
+        "qmore:dynamic",
+    ],
+    "queuePriorityPatterns.getAll": lambda args: [
+        "ql:qp:priorities",
+        "qmore:priority",
+    ],
+    "queue.throttle.get": lambda args: ["ql:thv:ql:q:%s" % args[0]],
+    "queues.names": lambda args: ["ql:queues"],
+    "queues.version": lambda args: ["ql:queues:version"],
+    "recurringJob.get": lambda args: ["ql:r:%s" % args[0]],
+    "throttle.get": lambda args: ["ql:thv:%s" % args[0]],
+}
+
+# The commands whose results include a throttle's ttl, which counts down
+# without the throttle being written, so they're only cached when it has none
+THROTTLE_COMMANDS: FrozenSet[str] = frozenset(["queue.throttle.get", "throttle.get"])
+
+# The commands that write the keys cached results are read from. When they're
+# sent by this client, its cache is cleared right away rather than waiting on
+# the server's invalidation message.
+INVALIDATING_COMMANDS: FrozenSet[str] = frozenset(
+    [
+        "config.set",
+        "config.unset",
+        "queue.recurAtInterval",
+        "queue.throttle.set",
+        "queueIdentifierPatterns.setAll",
+        "queuePriorityPatterns.setAll",
+        "recurringJob.addTag",
+        "recurringJob.cancel",
+        "recurringJob.removeTag",
+        "recurringJob.update",
+        "throttle.delete",
+        "throttle.set",
+    ]
+)
+
+# The key prefixes the server broadcasts invalidations for. Throttles are
+# tracked by their version keys, which change with their settings, rather than
+# under `ql:th:`, which also holds their busy lock and pending sets.
+PREFIXES: Tuple[str, ...] = (
+    "ql:config",
+    "ql:qp:",
+    "ql:queues",
+    "ql:r:",
+    "ql:thv:",
+    "qmore:",
+)
+
+Entry = Tuple[str, Tuple[Any, ...]]
+
+
+class TrackingCache:
+    """A bounded LRU cache of the results of `CACHEABLE_COMMANDS`. A
+    dedicated connection turns on server-assisted client-side caching
+    (`CLIENT TRACKING ... BCAST`) for the keys those results are read from and
+    receives the invalidations itself, so an entry is dropped as soon as a key
+    it depends on is changed by any client."""
+
+    channel = "__redis__:invalidate"
+
+    def __init__(self, database: Redis, codec: JSONCodec, max_size: int = 1024):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self._database: Redis = database
+        self._codec: JSONCodec = codec
+        self.max_size: int = max_size
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: "OrderedDict[Entry, Any]" = OrderedDict()
+        # The entries that depend on each key
+        self._dependents: Dict[str, Set[Entry]] = {}
+        # Bumped on every invalidation, so that a result fetched while one of
+        # its keys changed isn't kept
+        self._generation: int = 0
+        self._lock: threading.Lock = threading.Lock()
+        # The process the tracking connection was made in, since it isn't
+        # shared with forked children
+        self._tracking_pid: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, command: str, args: Tuple[Any, ...], fetch: Callable[[], Any]) -> Any:
+        """The cached result of a command, fetching and caching it on a miss"""
+        entry: Entry = (command, args)
+        with self._lock:
+            if entry in self._entries:
+                self._entries.move_to_end(entry)
+                self.hits += 1
+                return self._entries[entry]
+            self.misses += 1
+        if not self._ensure_tracking():
+            return fetch()
+        generation = self._generation
+        result = fetch()
+        if command in THROTTLE_COMMANDS and self._codec.loads(result)["ttl"] > 0:
+            return result
+        with self._lock:
+            if generation == self._generation:
+                self._store(entry, result)
+        return result
+
+    def invalidate(self, keys: Optional[List[str]] = None) -> None:
+        """Drop the entries that depend on any of the keys, or all of them"""
+        with self._lock:
+            self._generation += 1
+            if keys is None:
+                self._entries.clear()
+                self._dependents.clear()
+                return
+            for key in keys:
+                for entry in self._dependents.pop(key, ()):
+                    self._entries.pop(entry, None)
+
+    def _store(self, entry: Entry, result: Any) -> None:
+        """Cache a result, evicting the least recently used if full. Entries
+        left in `_dependents` by eviction are harmless, and dropped when their
+        key is next invalidated."""
+        self._entries[entry] = result
+        self._entries.move_to_end(entry)
+        for key in CACHEABLE_COMMANDS[entry[0]](entry[1]):
+            self._dependents.setdefault(key, set()).add(entry)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _ensure_tracking(self) -> bool:
+        """Make sure this process is receiving invalidations, returning
+        whether it is"""
+        pid = os.getpid()
+        if self._tracking_pid == pid:
+            return True
+        with self._lock:
+            if self._tracking_pid == pid:
+                return True
+            try:
+                connection = self._database.connection_pool.make_connection()
+                connection.connect()
+                connection.send_command("CLIENT", "ID")
+                client_id = connection.read_response()
+                connection.send_command(
+                    "CLIENT",
+                    "TRACKING",
+                    "ON",
+                    "REDIRECT",
+                    client_id,
+                    "BCAST",
+                    *[item for prefix in PREFIXES for item in ("PREFIX", prefix)],
+                )
+                connection.read_response()
+                connection.send_command("SUBSCRIBE", self.channel)
+                connection.read_response()
+            except Exception:
+                logger.exception("Unable to track cached keys")
+                return False
+            # Anything cached before now may have been missed
+            self._generation += 1
+            self._entries.clear()
+            self._dependents.clear()
+            self._tracking_pid = pid
+        thread = threading.Thread(
+            target=self._listen,
+            args=(connection, pid),
+            name="reqless-tracking",
+            daemon=True,
+        )
+        thread.start()
+        return True
+
+    def _listen(self, connection: Connection, pid: int) -> None:
+        try:
+            while self._tracking_pid == pid:
+                if not connection.can_read(timeout=1.0):
+                    continue
+                message = connection.read_response()
+                if message[0] == "message" and message[1] == self.channel:
+                    self.invalidate(message[2])
+        except Exception:
+            logger.exception("Stopped receiving cache invalidations")
+            with self._lock:
+                if self._tracking_pid == pid:
+                    self._tracking_pid = None
+            # Changes may be missed until tracking is restarted
+            self.invalidate()
+        finally:
+            connection.disconnect()
@@ -1,12 +1,16 @@
+from reqless.workers.asyncio_worker import AsyncioWorker
 from reqless.workers.base_worker import BaseWorker
 from reqless.workers.forking_worker import ForkingWorker
 from reqless.workers.main_worker import MainWorker
 from reqless.workers.serial_worker import SerialWorker
+from reqless.workers.thread_pool_worker import ThreadPoolWorker
 
 
 __all__ = [
+    "AsyncioWorker",
     "BaseWorker",
     "ForkingWorker",
     "MainWorker",
     "SerialWorker",
+    "ThreadPoolWorker",
 ]
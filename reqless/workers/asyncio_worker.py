@@ -0,0 +1,177 @@
+"""An asyncio-based worker"""
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator, Dict, Iterable, List, Optional, Set, Union
+
+from reqless import Client, logger
+from reqless.abstract import (
+    AbstractClient,
+    AbstractJob,
+    AbstractQueue,
+    AbstractQueueResolver,
+)
+from reqless.aio import Client as AsyncClient
+from reqless.aio import Job as AsyncJob
+from reqless.exceptions import LostLockError
+from reqless.workers.base_worker import BaseWorker
+from reqless.workers.signals import basic_signal_handler, register_signal_handler
+from reqless.workers.util import create_sandbox
+
+
+class AsyncioWorker(BaseWorker):
+    """A worker that runs jobs concurrently as tasks on an asyncio event loop.
+    Jobs are popped and processed with a `reqless.aio.Client`, so job methods
+    may be coroutine functions that await the asyncio job API. The synchronous
+    client is still used to resolve queues, find resumable jobs and listen for
+    lost locks."""
+
+    def __init__(
+        self,
+        queues: Union[Iterable[Union[str, AbstractQueue]], AbstractQueueResolver],
+        client: AbstractClient,
+        interval: Optional[float] = None,
+        resume: Optional[Union[bool, List[AbstractJob]]] = None,
+        **kwargs: Any,
+    ):
+        super().__init__(
+            queues,
+            client,
+            interval,
+            resume,
+            **kwargs,
+        )
+        # How many jobs may be processed at once
+        self.concurrency: int = kwargs.pop("concurrency", 10)
+        # The asyncio client to work with. If none is provided, one is made to
+        # connect to the same database as the synchronous client, which must
+        # then be a `reqless.Client`.
+        self.aio_client: Optional[AsyncClient] = kwargs.pop("aio_client", None)
+        # A mapping of jids to the tasks handling them
+        self.tasks: Dict[str, asyncio.Task[None]] = {}
+        # The loop the tasks are running on, so they can be halted from the
+        # listener thread
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        # A list of the sandboxes that we'll use
+        sandbox_path = kwargs.pop(
+            "sandbox_path", os.path.join(os.getcwd(), "reqless-py-workers")
+        )
+        self.sandboxes: List[str] = [
+            os.path.join(sandbox_path, "task-%i" % i) for i in range(self.concurrency)
+        ]
+
+    def create_aio_client(self) -> AsyncClient:
+        """Create an asyncio client connected to the same database as the
+        synchronous client, with the same URL, connection options and codec"""
+        if not isinstance(self.client, Client):
+            raise ValueError(
+                "An aio_client must be given to work with %s" % type(self.client)
+            )
+        return AsyncClient(
+            self.client.url,
+            hostname=self.client.worker_name,
+            codec=self.client.codec,
+            **self.client.connection_kwargs,
+        )
+
+    async def resumable_jobs(self, aio_client: AsyncClient) -> List[AsyncJob]:
+        """The jobs to resume, as long as we can still heartbeat them"""
+        jobs = []
+        for job in await aio_client.jobs.get(*[job.jid for job in self.resume]):
+            try:
+                await job.heartbeat()
+                jobs.append(job)
+            except LostLockError:
+                logger.exception("Cannot resume %s" % job.jid)
+        self.resume = []
+        return jobs
+
+    async def pop(self, aio_client: AsyncClient, count: int) -> List[AsyncJob]:
+        """Pop up to `count` jobs from the resolved queues, in order"""
+        # Resolving may consult the server with the synchronous client
+        queue_names = await asyncio.to_thread(self.pop_order)
+        return await aio_client.queues.pop(queue_names, count, lite=self.lite)
+
+    @asynccontextmanager
+    async def sandboxed(self, path: str) -> AsyncGenerator[None, None]:
+        """Like `create_sandbox`, but creating and cleaning up the sandbox in
+        the loop's executor, since it blocks on the filesystem"""
+        loop = asyncio.get_running_loop()
+        sandbox = create_sandbox(path)
+        await loop.run_in_executor(None, sandbox.__enter__)
+        try:
+            yield
+        finally:
+            await loop.run_in_executor(None, sandbox.__exit__, None, None, None)
+
+    async def process(self, job: AsyncJob) -> None:
+        """Process a job. Its lock is renewed by the heartbeater, which
+        cancels its task if the lock is lost."""
+        sandbox = self.sandboxes.pop(0)
+        try:
+            with self.heartbeating(job):
+                async with self.sandboxed(sandbox):
+                    job.sandbox = sandbox
+                    await job.process()
+        finally:
+            # Delete its entry from our tasks mapping
+            self.tasks.pop(job.jid, None)
+            self.sandboxes.append(sandbox)
+
+    def halt_job_processing(self, jid: str) -> None:
+        """Cancel the task processing the provided jid. This is called from
+        the listener thread, so the cancellation is handed to the loop."""
+        task = self.tasks.get(jid)
+        if task is not None and self.loop is not None:
+            logger.warning("Lost ownership of %s" % jid)
+            self.loop.call_soon_threadsafe(task.cancel)
+
+    def before_run(self) -> None:
+        register_signal_handler(handler=basic_signal_handler(on_quit=self.stop))
+
+    def run(self) -> None:
+        """Work on jobs"""
+        self.before_run()
+        asyncio.run(self.run_async())
+
+    async def run_async(self) -> None:
+        """Work on jobs on the running event loop"""
+        self.loop = asyncio.get_running_loop()
+        aio_client = self.aio_client or self.create_aio_client()
+        # Leased workers work as a worker of their own process
+        if self.lease_ttl:
+            aio_client.worker_name = self.client.worker_name
+
+        # Start listening, and heartbeating the jobs being processed
+        with self.listener(), self.heartbeater():
+            try:
+                jobs = await self.resumable_jobs(aio_client)
+                while not self.shutdown:
+                    available = self.concurrency - len(self.tasks)
+                    if available <= 0:
+                        await asyncio.wait(
+                            set(self.tasks.values()),
+                            return_when=asyncio.FIRST_COMPLETED,
+                        )
+                        continue
+
+                    if not jobs:
+                        jobs = await self.pop(aio_client, available)
+                    if jobs:
+                        for job in jobs[:available]:
+                            self.tasks[job.jid] = asyncio.create_task(self.process(job))
+                        jobs = jobs[available:]
+                    else:
+                        logger.debug("Sleeping for %fs" % self.interval)
+                        if self.wake_on_put:
+                            await asyncio.to_thread(self.wait_for_work)
+                        else:
+                            await asyncio.sleep(self.interval)
+            finally:
+                logger.info("Waiting for tasks to finish")
+                tasks: Set[asyncio.Task[None]] = set(self.tasks.values())
+                if tasks:
+                    await asyncio.wait(tasks)
+                if self.aio_client is None:
+                    await aio_client.close()
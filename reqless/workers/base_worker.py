@@ -1,9 +1,21 @@
 """Our base worker"""
 
-import json
 import threading
+import time
+from collections import deque
 from contextlib import contextmanager
-from typing import Any, Dict, Generator, Iterable, List, Optional, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Deque,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Union,
+)
 
 from reqless import exceptions, logger
 from reqless.abstract import (
@@ -14,6 +26,12 @@ from reqless.abstract import (
 )
 from reqless.listener import Listener
 from reqless.queue_resolvers import TransformingQueueResolver
+from reqless.workers.heartbeater import Heartbeater
+from reqless.workers.lease import Lease, process_name
+
+
+if TYPE_CHECKING:  # pragma: no cover
+    from reqless.aio import Job as AsyncJob
 
 
 class BaseWorker:
@@ -27,7 +45,17 @@ class BaseWorker:
         resume: Optional[Union[bool, List[AbstractJob]]] = None,
         **kwargs: Any,
     ):
-        self.client: AbstractClient = client
+        # How long this worker's liveness lease lasts, if it takes one. If it
+        # dies, the maintainer reclaims its jobs once the lease runs out
+        # rather than waiting for their locks to expire. Leases are per
+        # process, so leased workers work as `<worker name>-<pid>`, with a
+        # client of their own.
+        self.lease_ttl: Optional[float] = kwargs.get("lease_ttl")
+        self.client: AbstractClient = (
+            client.with_worker_name(process_name(client.worker_name))
+            if self.lease_ttl
+            else client
+        )
 
         queue_resolver: AbstractQueueResolver
         if isinstance(queues, AbstractQueueResolver):
@@ -59,6 +87,41 @@ class BaseWorker:
         self.interval: float = interval or 60.0
         # To mark whether or not we should shutdown after work is done
         self.shutdown: bool = False
+        # The most jobs to pop at once. Prefetching is disabled unless this is
+        # more than 1.
+        self.prefetch: int = kwargs.get("prefetch", 0)
+        # A moving average of how long it takes to get through a job, and the
+        # lock duration of popped jobs, which together size prefetched batches
+        self.job_interval: Optional[float] = None
+        self.lock_duration: Optional[float] = None
+        # The jids of the prefetched jobs that haven't been handed out, and
+        # that we still hold the locks on
+        self._prefetched: Set[str] = set()
+        # Whether to renew the locks on jobs being processed in the background,
+        # and the heartbeater doing so while this worker is running
+        self.auto_heartbeat: bool = kwargs.get("auto_heartbeat", True)
+        self.heartbeats: Optional[Heartbeater] = None
+        # How long to keep renewing the lock on a job, so that a hung job
+        # eventually loses it. None renews it for as long as it's processed.
+        self.max_job_lifetime: Optional[float] = kwargs.get("max_job_lifetime", 3600.0)
+        # Whether to wait for jobs to be put in our queues when they're empty,
+        # rather than polling every `interval`, and the event that's set when
+        # they are
+        self.wake_on_put: bool = kwargs.get("wake_on_put", False)
+        # Whether to pop jobs without their history, dependents and
+        # dependencies, which processing them doesn't need
+        self.lite: bool = kwargs.get("lite", False)
+        # Whether to always pop from the first of our queues that has jobs.
+        # Otherwise, the queue popped from first rotates each cycle, so that a
+        # busy queue doesn't starve the ones after it.
+        self.strict_priority: bool = kwargs.get("strict_priority", False)
+        self._pops: int = 0
+        self.wakeup: threading.Event = threading.Event()
+        # The listeners of the running worker, one for each server its jobs
+        # may be on, and the queues they're listening for puts to, which
+        # change when the queue resolver's result does
+        self._listeners: List[Listener] = []
+        self._available: List[str] = []
 
     @property
     def queues(self) -> Iterable[AbstractQueue]:
@@ -77,6 +140,15 @@ class BaseWorker:
         queue_names = set(self.queue_resolver.resolve())
         return [job for job in jobs if job.queue_name in queue_names]
 
+    def pop_order(self) -> List[str]:
+        """The queues to pop from this cycle, in the order to pop from them"""
+        queue_names = list(self.queue_resolver.resolve())
+        if self.strict_priority or not queue_names:
+            return queue_names
+        start = self._pops % len(queue_names)
+        self._pops += 1
+        return queue_names[start:] + queue_names[:start]
+
     def jobs(
         self,
     ) -> Generator[Optional[AbstractJob], None, None]:
@@ -89,41 +161,220 @@ class BaseWorker:
                     yield job
             except exceptions.LostLockError:
                 logger.exception("Cannot resume %s" % job.jid)
+        if self.prefetch > 1:
+            yield from self.prefetched_jobs()
+            return
         while True:
-            seen = False
-            for queue in self.queues:
-                popped_job = queue.pop()
-                if popped_job:
-                    assert not isinstance(popped_job, List)
-                    seen = True
-                    yield popped_job
-            if not seen:
-                yield None
+            popped = self.client.queues.pop(self.pop_order(), lite=self.lite)
+            yield popped[0] if popped else None
+
+    def prefetch_count(self) -> int:
+        """How many jobs to pop at once. Only as many jobs are popped as we
+        expect to start within half of their lock duration, so that they
+        rarely need to be heartbeated while they wait."""
+        if not self.job_interval or not self.lock_duration:
+            return 1
+        count = int(self.lock_duration / 2 / self.job_interval)
+        return max(1, min(self.prefetch, count))
+
+    def observe_job_interval(self, interval: float) -> None:
+        """Update the moving average of how long it takes to get through a
+        job"""
+        if self.job_interval is None:
+            self.job_interval = interval
+        else:
+            self.job_interval = 0.8 * self.job_interval + 0.2 * interval
+
+    def prefetched_jobs(self) -> Generator[Optional[AbstractJob], None, None]:
+        """Generator for all the jobs, popping several at a time. Jobs are
+        buffered until they're handed out, with their locks renewed by the
+        heartbeater while they wait, and any left over when the generator is
+        closed are put back in their queues."""
+        buffer: Deque[AbstractJob] = deque()
+        try:
+            while True:
+                if not buffer:
+                    buffer.extend(
+                        self.client.queues.pop(
+                            self.pop_order(),
+                            self.prefetch_count(),
+                            lite=self.lite,
+                        )
+                    )
+                    if buffer:
+                        self.lock_duration = max(job.ttl for job in buffer)
+                    heartbeats = self.heartbeats
+                    for job in buffer:
+                        self._prefetched.add(job.jid)
+                        if heartbeats is not None:
+                            heartbeats.add(job)
+
+                if not buffer:
+                    yield None
+                    continue
+
+                job = buffer.popleft()
+                if job.jid not in self._prefetched:
+                    # Its lock was lost while it waited
+                    continue
+                self._prefetched.discard(job.jid)
+                if self.heartbeats is not None or self.refresh_lock(job):
+                    handed_out = time.time()
+                    yield job
+                    self.observe_job_interval(time.time() - handed_out)
+        finally:
+            heartbeats = self.heartbeats
+            for job in buffer:
+                if job.jid not in self._prefetched:
+                    continue
+                self._prefetched.discard(job.jid)
+                if heartbeats is not None:
+                    heartbeats.remove(job.jid)
+                try:
+                    job.move(job.queue_name)
+                except exceptions.ReqlessError:
+                    logger.exception("Cannot return prefetched %s" % job.jid)
+
+    def refresh_lock(self, job: AbstractJob) -> bool:
+        """Without a heartbeater, heartbeat a prefetched job if it has used up
+        half its lock waiting to be handed out. Returns whether we still hold
+        the lock."""
+        if self.lock_duration and job.ttl < self.lock_duration / 2:
+            try:
+                job.heartbeat()
+            except exceptions.LostLockError:
+                logger.exception("Lost prefetched %s" % job.jid)
+                return False
+        return True
 
     @contextmanager
     def listener(self) -> Generator[None, None, None]:
-        """Listen for pubsub messages relevant to this worker in a thread"""
+        """Listen for pubsub messages relevant to this worker in a thread for
+        each server its jobs may be on"""
         channels = ["ql:w:" + self.client.worker_name]
-        listener = Listener(self.client.database, channels)
-        thread = threading.Thread(target=self.listen, args=(listener,))
-        thread.start()
-        listener.wait_until_listening()
+        if self.wake_on_put:
+            self._available = list(self.queue_resolver.resolve())
+            channels.extend("ql:available:" + name for name in self._available)
+        listeners = [
+            Listener(database, list(channels)) for database in self.client.databases
+        ]
+        threads = [
+            threading.Thread(target=self.listen, args=(listener,))
+            for listener in listeners
+        ]
+        for thread in threads:
+            thread.start()
+        for listener in listeners:
+            listener.wait_until_listening()
+        self._listeners = listeners
+        if self.wake_on_put:
+            # Ask before our first pop, so jobs put after it aren't missed
+            self.client.queues.wake_on_put(2 * self.interval, *self._available)
+        # The listener thread blocks waiting for messages, so the lease is
+        # renewed in a thread of its own for as long as we're listening
+        lease = Lease(self.client, self.lease_ttl) if self.lease_ttl else None
+        if lease is not None:
+            lease.start()
         try:
             yield
         finally:
-            listener.unlisten()
-            thread.join()
+            if lease is not None:
+                lease.stop()
+            self._listeners = []
+            for listener in listeners:
+                listener.unlisten()
+            for thread in threads:
+                thread.join()
+
+    @contextmanager
+    def heartbeater(self) -> Generator[None, None, None]:
+        """Renew the locks on jobs being processed in a thread"""
+        if not self.auto_heartbeat:
+            yield
+            return
+        self.heartbeats = Heartbeater(
+            self.client,
+            self.job_lost,
+            max_lifetime=self.max_job_lifetime,
+        )
+        self.heartbeats.start()
+        try:
+            yield
+        finally:
+            self.heartbeats.stop()
+            self.heartbeats = None
+
+    @contextmanager
+    def heartbeating(
+        self, job: Union[AbstractJob, "AsyncJob"]
+    ) -> Generator[None, None, None]:
+        """Keep the lock on this job renewed while it's being processed"""
+        heartbeats = self.heartbeats
+        if heartbeats is None:
+            yield
+            return
+        heartbeats.add(job)
+        try:
+            yield
+        finally:
+            heartbeats.remove(job.jid)
 
     def listen(self, listener: Listener) -> None:
         """Listen for events that affect our ownership of a job"""
         for message in listener.listen():
+            if message["channel"].startswith("ql:available:"):
+                self.wakeup.set()
+                continue
             try:
-                data = json.loads(message["data"])
+                data = self.client.codec.loads(message["data"])
                 if data["event"] in ("canceled", "lock_lost", "put"):
-                    self.halt_job_processing(data["jid"])
+                    self.job_lost(data["jid"])
             except Exception:
                 logger.exception("Pubsub error")
 
+    def wait_for_work(self) -> None:
+        """Sleep after finding no jobs to work on. When waking on put, we only
+        sleep until a job is put in one of our queues, or until one of their
+        jobs comes due on its own, and at most `interval`."""
+        if not self.wake_on_put:
+            time.sleep(self.interval)
+            return
+        timeout = self.interval
+        queue_names = list(self.queue_resolver.resolve())
+        self.listen_for_puts(queue_names)
+        # Jobs put are only published while some worker keeps asking for them,
+        # and asking for longer than we wait covers the time between waits
+        self.client.queues.wake_on_put(2 * self.interval, *queue_names)
+        due = self.client.queues.next_due(*queue_names)
+        if due is not None:
+            timeout = min(timeout, max(0.0, due - time.time()))
+        self.wakeup.wait(timeout)
+        self.wakeup.clear()
+
+    def listen_for_puts(self, queue_names: List[str]) -> None:
+        """Listen for jobs put in these queues instead of the ones we were
+        listening for, if they've changed"""
+        if not self._listeners or queue_names == self._available:
+            return
+        added = ["ql:available:" + n for n in queue_names if n not in self._available]
+        removed = ["ql:available:" + n for n in self._available if n not in queue_names]
+        for listener in self._listeners:
+            listener.subscribe(*added)
+            listener.unsubscribe(*removed)
+        self._available = queue_names
+
+    def job_lost(self, jid: str) -> None:
+        """Drop a job we no longer own if it's prefetched and waiting to be
+        handed out, or otherwise stop processing it"""
+        if jid in self._prefetched:
+            self._prefetched.discard(jid)
+            heartbeats = self.heartbeats
+            if heartbeats is not None:
+                heartbeats.remove(jid)
+            logger.warning("Lost prefetched %s" % jid)
+            return
+        self.halt_job_processing(jid)
+
     def halt_job_processing(self, jid: str) -> None:  # pragma: no cover
         """Stop processing the provided jid"""
         raise NotImplementedError('Derived classes must override "halt_job_processing"')
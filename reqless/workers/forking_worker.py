@@ -36,6 +36,8 @@ class ForkingWorker(BaseWorker):
         resume: Optional[Union[bool, List[AbstractJob]]] = None,
         **kwargs: Any,
     ):
+        # Only the children hold jobs, so they each take a lease of their own
+        lease_ttl = kwargs.pop("lease_ttl", None)
         super().__init__(
             queues,
             client,
@@ -43,6 +45,7 @@ class ForkingWorker(BaseWorker):
             resume,
             **kwargs,
         )
+        self.kwargs["lease_ttl"] = lease_ttl
         # Worker class to use
         _klass = self.kwargs.pop("klass", SerialWorker)
         self.klass: Type[BaseWorker] = (
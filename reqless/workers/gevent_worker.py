@@ -55,7 +55,7 @@ class GeventWorker(BaseWorker):
         """Process a job"""
         sandbox = self.sandboxes.pop(0)
         try:
-            with create_sandbox(sandbox):
+            with create_sandbox(sandbox), self.heartbeating(job):
                 job.sandbox = sandbox
                 job.process()
         finally:
@@ -78,7 +78,7 @@ class GeventWorker(BaseWorker):
         self.before_run()
 
         # Start listening
-        with self.listener():
+        with self.listener(), self.heartbeater():
             try:
                 generator = self.jobs()
                 while not self.shutdown:
@@ -96,7 +96,11 @@ class GeventWorker(BaseWorker):
                         self.pool.start(greenlet)
                     else:
                         logger.debug("Sleeping for %fs" % self.interval)
-                        gevent.sleep(self.interval)
+                        if self.wake_on_put:
+                            # Only cooperative with gevent's monkey-patching
+                            self.wait_for_work()
+                        else:
+                            gevent.sleep(self.interval)
             except StopIteration:
                 logger.info("Exhausted jobs")
             finally:
@@ -0,0 +1,134 @@
+"""Renews the locks on a worker's in-flight jobs in the background"""
+
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Union
+
+from reqless import exceptions, logger
+from reqless.abstract import AbstractClient, AbstractJob
+
+
+if TYPE_CHECKING:  # pragma: no cover
+    from reqless.aio import Job as AsyncJob
+
+
+class Heartbeater:
+    """Periodically renews the locks on all registered jobs with a single
+    `jobs.heartbeat` call. Locks are renewed once `fraction` of the shortest
+    lock duration has elapsed. When a lock can't be renewed, the job is
+    unregistered and `on_lost` is called with its jid.
+
+    So that a hung job doesn't keep its lock forever, jobs stop being renewed
+    once they've been registered for `max_lifetime` seconds, after which their
+    locks expire as they would without a heartbeater. Jobs can still renew
+    their own locks with `job.heartbeat()`.
+
+    Under gevent's monkey-patching, the thread this runs in is a greenlet."""
+
+    def __init__(
+        self,
+        client: AbstractClient,
+        on_lost: Callable[[str], None],
+        fraction: float = 1.0 / 3,
+        idle_interval: float = 10.0,
+        max_lifetime: Optional[float] = None,
+    ):
+        self.client: AbstractClient = client
+        self.on_lost: Callable[[str], None] = on_lost
+        self.fraction: float = fraction
+        self.idle_interval: float = idle_interval
+        self.max_lifetime: Optional[float] = max_lifetime
+        self._durations: Dict[str, float] = {}
+        # When each job stops being renewed, if ever
+        self._deadlines: Dict[str, float] = {}
+        self._lock: threading.Lock = threading.Lock()
+        self._stopped: threading.Event = threading.Event()
+        self._changed: threading.Event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, job: Union[AbstractJob, "AsyncJob"]) -> None:
+        """Keep the lock on this job renewed until it's removed. Jobs popped
+        with an asyncio client can be added too, as long as it's working as
+        the same worker."""
+        with self._lock:
+            self._durations[job.jid] = max(job.ttl, 1.0)
+            if self.max_lifetime is not None:
+                self._deadlines[job.jid] = time.time() + self.max_lifetime
+        self._changed.set()
+
+    def remove(self, jid: str) -> None:
+        """Stop renewing the lock on this job"""
+        with self._lock:
+            self._durations.pop(jid, None)
+            self._deadlines.pop(jid, None)
+
+    @property
+    def interval(self) -> float:
+        """How long to wait between heartbeats"""
+        with self._lock:
+            if not self._durations:
+                return self.idle_interval
+            return self.fraction * min(self._durations.values())
+
+    def beat(self) -> None:
+        """Renew the locks on all registered jobs"""
+        now = time.time()
+        with self._lock:
+            for jid, deadline in list(self._deadlines.items()):
+                if deadline <= now:
+                    logger.warning(
+                        "Not renewing %s after %ss" % (jid, self.max_lifetime)
+                    )
+                    self._durations.pop(jid, None)
+                    self._deadlines.pop(jid)
+            jids = list(self._durations)
+        if not jids:
+            return
+
+        try:
+            renewed = self.client.jobs.heartbeat(*jids)
+        except exceptions.ReqlessError:
+            logger.exception("Failed to heartbeat %i jobs" % len(jids))
+            return
+
+        for jid in jids:
+            if jid in renewed:
+                continue
+            with self._lock:
+                # The job may have finished while we were heartbeating
+                lost = self._durations.pop(jid, None) is not None
+                self._deadlines.pop(jid, None)
+            if lost:
+                logger.warning("Lost ownership of %s" % jid)
+                self.on_lost(jid)
+
+    def run(self) -> None:
+        """Heartbeat until stopped"""
+        last = time.time()
+        while not self._stopped.is_set():
+            # Wake up early when jobs are added, in case they have shorter
+            # locks than the ones we were waiting on
+            self._changed.wait(max(0.0, last + self.interval - time.time()))
+            self._changed.clear()
+            if self._stopped.is_set():
+                break
+            if time.time() >= last + self.interval:
+                last = time.time()
+                try:
+                    self.beat()
+                except Exception:
+                    logger.exception("Heartbeater error")
+
+    def start(self) -> None:
+        """Start heartbeating in a background thread"""
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop heartbeating and wait for the thread to finish"""
+        self._stopped.set()
+        self._changed.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
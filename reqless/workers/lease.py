@@ -0,0 +1,68 @@
+"""Keeps a worker's liveness lease renewed in the background"""
+
+import os
+import threading
+from typing import Optional
+
+from reqless import exceptions, logger
+from reqless.abstract import AbstractClient
+
+
+def process_name(worker_name: str) -> str:
+    """The name this process locks jobs and holds its lease under. Leases are
+    per process, so that the jobs of one that dies are reclaimed even while
+    others sharing its worker name, like the children of a forking worker,
+    are alive."""
+    suffix = "-%d" % os.getpid()
+    return worker_name if worker_name.endswith(suffix) else worker_name + suffix
+
+
+class Lease:
+    """Renews the client's worker's liveness lease every `fraction` of `ttl`
+    seconds. If the worker dies, the lease runs out within `ttl` seconds, and
+    the maintainer then treats the locks on all of its jobs as expired rather
+    than waiting for each of them to run out. The lease is given up when
+    stopped.
+
+    Under gevent's monkey-patching, the thread this runs in is a greenlet, so
+    jobs that don't yield for longer than `ttl` will let the lease lapse."""
+
+    def __init__(self, client: AbstractClient, ttl: float, fraction: float = 1.0 / 3):
+        self.client: AbstractClient = client
+        self.ttl: float = ttl
+        self.fraction: float = fraction
+        self._stopped: threading.Event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def renew(self) -> None:
+        """Renew the lease"""
+        try:
+            self.client.workers.lease(self.client.worker_name, self.ttl)
+        except exceptions.ReqlessError:
+            logger.exception("Failed to renew the lease")
+
+    def run(self) -> None:
+        """Renew the lease until stopped"""
+        while not self._stopped.wait(self.fraction * self.ttl):
+            try:
+                self.renew()
+            except Exception:
+                logger.exception("Lease error")
+
+    def start(self) -> None:
+        """Take the lease and renew it in a background thread"""
+        self.renew()
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop renewing the lease, and give it up"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        try:
+            self.client.workers.unlease(self.client.worker_name)
+        except exceptions.ReqlessError:
+            logger.exception("Failed to give up the lease")
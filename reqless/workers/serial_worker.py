@@ -1,7 +1,6 @@
 """A worker that serially pops and complete jobs"""
 
 import os
-import time
 from typing import Any, Iterable, List, Optional, Union
 
 from reqless.abstract import (
@@ -32,7 +31,8 @@ class SerialWorker(BaseWorker):
             resume,
             **kwargs,
         )
-        # The jid that we're working on at the moment
+        # The job that we're working on at the moment, and its jid
+        self.job: Optional[AbstractJob] = None
         self.jid: Optional[str] = None
         # This is the sandbox we use
         self._sandbox: str = kwargs.pop(
@@ -46,22 +46,27 @@ class SerialWorker(BaseWorker):
         would only kill the listener thread, while the thread doing the actual
         work continued. So, in this scenario, we have to depend on the job
         doing a good job of heartbeating since that's the best way for the job
-        to learn that it should halt. As such, do nothing."""
-        pass
+        to learn that it should halt. As such, all we do is flag the job as
+        halted, for jobs that check `job.halted`."""
+        job = self.job
+        if job is not None and job.jid == jid:
+            job.halt()
 
     def run(self) -> None:
         """Run jobs, popping one after another"""
-        with self.listener():
+        with self.listener(), self.heartbeater():
             for job in self.jobs():
                 # If there was no job to be had, we should sleep a little bit
                 if not job:
+                    self.job = None
                     self.jid = None
                     set_title("Sleeping for %fs" % self.interval)
-                    time.sleep(self.interval)
+                    self.wait_for_work()
                 else:
+                    self.job = job
                     self.jid = job.jid
                     set_title("Working on %s (%s)" % (job.jid, job.klass_name))
-                    with create_sandbox(self._sandbox):
+                    with create_sandbox(self._sandbox), self.heartbeating(job):
                         job.sandbox = self._sandbox
                         job.process()
                 if self.shutdown:
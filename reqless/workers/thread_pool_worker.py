@@ -0,0 +1,114 @@
+"""A worker that processes jobs in a pool of threads"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from reqless import logger
+from reqless.abstract import (
+    AbstractClient,
+    AbstractJob,
+    AbstractQueue,
+    AbstractQueueResolver,
+)
+from reqless.workers.base_worker import BaseWorker
+from reqless.workers.signals import basic_signal_handler, register_signal_handler
+from reqless.workers.util import create_sandbox
+
+
+class ThreadPoolWorker(BaseWorker):
+    """A worker that processes jobs concurrently in a pool of threads, all
+    sharing the same client. Threads can't be interrupted, so when this worker
+    loses the lock on a job, it halts the job and relies on the job checking
+    `job.halted` to stop early."""
+
+    def __init__(
+        self,
+        queues: Union[Iterable[Union[str, AbstractQueue]], AbstractQueueResolver],
+        client: AbstractClient,
+        interval: Optional[float] = None,
+        resume: Optional[Union[bool, List[AbstractJob]]] = None,
+        **kwargs: Any,
+    ):
+        super().__init__(
+            queues,
+            client,
+            interval,
+            resume,
+            **kwargs,
+        )
+        # How many threads to process jobs in
+        self.count: int = kwargs.pop("threads", 10)
+        # A mapping of jids to the jobs being processed
+        self.jobs_in_progress: Dict[str, AbstractJob] = {}
+        # Limits how many jobs are popped to the number of idle threads
+        self.slots: threading.BoundedSemaphore = threading.BoundedSemaphore(self.count)
+        # A list of the sandboxes that we'll use
+        sandbox_path = kwargs.pop(
+            "sandbox_path", os.path.join(os.getcwd(), "reqless-py-workers")
+        )
+        self.sandboxes: List[str] = [
+            os.path.join(sandbox_path, "thread-%i" % i) for i in range(self.count)
+        ]
+
+    def process(self, job: AbstractJob) -> None:
+        """Process a job"""
+        sandbox = self.sandboxes.pop(0)
+        try:
+            with create_sandbox(sandbox), self.heartbeating(job):
+                job.sandbox = sandbox
+                job.process()
+        except Exception:
+            logger.exception("Exception processing %s" % job.jid)
+        finally:
+            # Delete its entry from our jobs mapping
+            self.jobs_in_progress.pop(job.jid, None)
+            self.sandboxes.append(sandbox)
+            self.slots.release()
+
+    def halt_job_processing(self, jid: str) -> None:
+        """Flag the job with the provided jid to stop"""
+        job = self.jobs_in_progress.get(jid)
+        if job is not None:
+            logger.warning("Lost ownership of %s" % jid)
+            job.halt()
+
+    def before_run(self) -> None:
+        register_signal_handler(handler=basic_signal_handler(on_quit=self.stop))
+
+    def run(self) -> None:
+        """Work on jobs"""
+        self.before_run()
+
+        # Start listening and heartbeating
+        with self.listener(), self.heartbeater():
+            # Leaving the executor waits for the threads to finish, while we're
+            # still listening for lost locks and renewing the rest
+            with ThreadPoolExecutor(
+                max_workers=self.count, thread_name_prefix="reqless-worker"
+            ) as executor:
+                self.work(executor)
+
+    def work(self, executor: ThreadPoolExecutor) -> None:
+        """Hand jobs to the executor as threads become available"""
+        try:
+            generator = self.jobs()
+            while not self.shutdown:
+                self.slots.acquire()
+                try:
+                    job = next(generator)
+                except BaseException:
+                    self.slots.release()
+                    raise
+                if job:
+                    self.jobs_in_progress[job.jid] = job
+                    executor.submit(self.process, job)
+                else:
+                    self.slots.release()
+                    logger.debug("Sleeping for %fs" % self.interval)
+                    self.wait_for_work()
+        except StopIteration:
+            logger.info("Exhausted jobs")
+        finally:
+            logger.info("Waiting for threads to finish")
@@ -0,0 +1,111 @@
+"""Tests about the asyncio Client class"""
+
+from reqless.aio import Job, RecurringJob
+from reqless.exceptions import ReqlessError
+from reqless_test.common import AsyncTestReqless
+
+
+class TestAsyncClient(AsyncTestReqless):
+    """Test the asyncio client"""
+
+    async def test_errors_are_reqless_errors(self) -> None:
+        """Errors raised by the script are surfaced as ReqlessErrors"""
+        with self.assertRaises(ReqlessError):
+            await self.client("job.complete", "missing", "worker", "foo", "{}")
+
+    async def test_shares_data_with_sync_client(self) -> None:
+        """Jobs put with the asyncio client are visible to the sync client"""
+        jid = await self.client.queues["foo"].put("reqless_test.common.NoopJob", "{}")
+        self.assertEqual(self.database.hget(f"ql:j:{jid}", "queue"), b"foo")
+
+    async def test_get_job(self) -> None:
+        """Jobs can be looked up by jid"""
+        jid = await self.client.queues["foo"].put(
+            "reqless_test.common.NoopJob", "{}", jid="jid"
+        )
+        job = await self.client.jobs[jid]
+        assert isinstance(job, Job)
+        self.assertEqual(job.jid, "jid")
+        self.assertEqual(job.queue_name, "foo")
+        self.assertIsNone(await self.client.jobs["missing"])
+
+    async def test_get_recurring_job(self) -> None:
+        """Recurring jobs can be looked up by jid"""
+        await self.client.queues["foo"].recur(
+            "reqless_test.common.NoopJob", "{}", interval=60, jid="jid"
+        )
+        job = await self.client.jobs["jid"]
+        assert isinstance(job, RecurringJob)
+        self.assertEqual(job.interval, 60)
+        await job.update(interval=30, priority=5)
+        self.assertEqual(job.interval, 30)
+        self.assertEqual(job.priority, 5)
+        updated = await self.client.jobs["jid"]
+        assert isinstance(updated, RecurringJob)
+        self.assertEqual(updated.interval, 30)
+
+    async def test_get_multiple_jobs(self) -> None:
+        """Many jobs can be fetched at once"""
+        queue = self.client.queues["foo"]
+        jids = [await queue.put("reqless_test.common.NoopJob", "{}") for _ in range(3)]
+        jobs = await self.client.jobs.get(*jids)
+        self.assertEqual([job.jid for job in jobs], jids)
+        self.assertEqual(await self.client.jobs.get(), [])
+
+    async def test_track(self) -> None:
+        """Jobs can be tracked and untracked"""
+        await self.client.queues["foo"].put(
+            "reqless_test.common.NoopJob", "{}", jid="jid"
+        )
+        self.assertTrue(await self.client.track("jid"))
+        tracked = await self.client.jobs.tracked()
+        self.assertEqual([job.jid for job in tracked["jobs"]], ["jid"])
+        self.assertTrue(await self.client.untrack("jid"))
+
+    async def test_tags(self) -> None:
+        """Provides access to the most common tags"""
+        queue = self.client.queues["foo"]
+        await queue.put("reqless_test.common.NoopJob", "{}", tags=["tag"])
+        await queue.put("reqless_test.common.NoopJob", "{}", tags=["tag"])
+        self.assertEqual(await self.client.tags(), ["tag"])
+        tagged = await self.client.jobs.tagged("tag")
+        self.assertEqual(tagged["total"], 2)
+
+    async def test_failed_and_unfail(self) -> None:
+        """Failed jobs can be listed and unfailed"""
+        queue = self.client.queues["foo"]
+        await queue.put("reqless_test.common.NoopJob", "{}", jid="jid")
+        job = await queue.pop()
+        assert isinstance(job, Job)
+        await job.fail("group", "message")
+        self.assertEqual(await self.client.jobs.failed(), {"group": 1})
+        failed = await self.client.jobs.failed("group")
+        self.assertEqual([job.jid for job in failed["jobs"]], ["jid"])
+        self.assertEqual(await self.client.unfail("group", "foo"), 1)
+        self.assertEqual(await queue.length(), 1)
+
+    async def test_queue_counts(self) -> None:
+        """Provides access to the counts of all queues"""
+        await self.client.queues["foo"].put("reqless_test.common.NoopJob", "{}")
+        counts = await self.client.queues.counts()
+        self.assertEqual([count["name"] for count in counts], ["foo"])
+
+    async def test_config(self) -> None:
+        """Config options can be read and written"""
+        config = self.client.config
+        self.assertEqual(await config.get("heartbeat"), 60)
+        await config.set("foo", "bar")
+        self.assertEqual(await config.get("foo"), "bar")
+        self.assertEqual((await config.all())["foo"], "bar")
+        self.assertEqual(await config.pop("foo"), "bar")
+        self.assertEqual(await config.get("foo", "default"), "default")
+        await config.set("heartbeat", 10)
+        await config.clear()
+        self.assertEqual(await config.get("heartbeat"), 60)
+
+    async def test_pop_from_queues(self) -> None:
+        """Pops from several queues at once, in order"""
+        await self.client.queues["foo"].put("reqless_test.common.NoopJob", "{}")
+        await self.client.queues["bar"].put("reqless_test.common.NoopJob", "{}")
+        jobs = await self.client.queues.pop(["bar", "foo"], 5)
+        self.assertEqual([job.queue_name for job in jobs], ["bar", "foo"])
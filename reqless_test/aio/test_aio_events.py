@@ -0,0 +1,50 @@
+"""Tests about asyncio events"""
+
+from typing import Dict, List
+
+from reqless.aio import Job
+from reqless_test.common import AsyncTestReqless
+
+
+class TestAsyncEvents(AsyncTestReqless):
+    """Tests about asyncio events"""
+
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        await self.client.queues["foo"].put(
+            "reqless_test.common.NoopJob", "{}", jid="jid"
+        )
+        await self.client.track("jid")
+
+    async def test_basic(self) -> None:
+        """Callbacks, including coroutines, are invoked for events"""
+        popped: List[str] = []
+        completed: List[str] = []
+
+        def on_popped(event: Dict) -> None:
+            popped.append("popped")
+
+        async def on_completed(event: Dict) -> None:
+            completed.append("completed")
+
+        self.client.events.on("popped", on_popped)
+        self.client.events.on("completed", on_completed)
+        async with self.client.events.task():
+            job = await self.client.queues["foo"].pop()
+            assert isinstance(job, Job)
+            await job.complete()
+        self.assertEqual(popped, ["popped"])
+        self.assertEqual(completed, ["completed"])
+
+    async def test_off(self) -> None:
+        """Callbacks can be turned off"""
+        popped: List[str] = []
+        self.client.events.on("popped", lambda event: popped.append(event))
+        self.client.events.off("popped")
+        async with self.client.events.task():
+            await self.client.queues["foo"].pop()
+        self.assertEqual(popped, [])
+
+    async def test_not_implemented(self) -> None:
+        """Ensure missing events throw errors"""
+        self.assertRaises(NotImplementedError, self.client.events.on, "foo", int)
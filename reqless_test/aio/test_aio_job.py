@@ -0,0 +1,103 @@
+"""Tests about the asyncio Job class"""
+
+from typing import List
+
+from reqless.aio import Job
+from reqless.exceptions import LostLockError
+from reqless_test.common import AsyncTestReqless
+
+
+class FailingAsyncJob:
+    @staticmethod
+    async def process(job: Job) -> None:
+        raise ValueError("oops")
+
+
+class TestAsyncJob(AsyncTestReqless):
+    """Test the asyncio Job class"""
+
+    async def pop(self, klass: str = "reqless_test.common.AsyncNoopJob") -> Job:
+        queue = self.client.queues["foo"]
+        await queue.put(klass, "{}", jid="jid")
+        job = await queue.pop()
+        assert isinstance(job, Job)
+        return job
+
+    async def test_process_awaits_coroutines(self) -> None:
+        """Coroutine job methods are awaited"""
+        job = await self.pop()
+        await job.process()
+        self.assertEqual(await self.client.jobs.complete(), ["jid"])
+
+    async def test_process_failure(self) -> None:
+        """Exceptions in job methods fail the job"""
+        job = await self.pop("reqless_test.aio.test_aio_job.FailingAsyncJob")
+        await job.process()
+        failed = await self.client.jobs["jid"]
+        assert isinstance(failed, Job)
+        self.assertEqual(failed.state, "failed")
+        assert failed.failure is not None
+        self.assertEqual(failed.failure["group"], "foo-ValueError")
+
+    async def test_process_missing_class(self) -> None:
+        """Jobs whose class can't be imported are failed"""
+        job = await self.pop("reqless_test.missing.Job")
+        await job.process()
+        failed = await self.client.jobs["jid"]
+        assert isinstance(failed, Job)
+        self.assertEqual(failed.state, "failed")
+
+    async def test_complete_and_requeue(self) -> None:
+        """Jobs can be advanced to another queue"""
+        job = await self.pop()
+        self.assertTrue(await job.complete("bar"))
+        self.assertEqual(await self.client.queues["bar"].length(), 1)
+
+    async def test_heartbeat(self) -> None:
+        """Heartbeating extends the lock, and raises once it's lost"""
+        job = await self.pop()
+        await self.client.config.set("heartbeat", 120)
+        before = job.ttl
+        await job.heartbeat()
+        self.assertGreater(job.ttl, before)
+        await job.timeout()
+        with self.assertRaises(LostLockError):
+            await job.heartbeat()
+
+    async def test_retry(self) -> None:
+        """Jobs can be retried"""
+        job = await self.pop()
+        self.assertEqual(await job.retry(), 4)
+        self.assertEqual(await self.client.queues["foo"].length(), 1)
+
+    async def test_tag_and_priority(self) -> None:
+        """Tags and priority can be updated"""
+        job = await self.pop()
+        self.assertEqual(await job.tag("a", "b"), ["a", "b"])
+        self.assertEqual(await job.untag("a"), ["b"])
+        await job.set_priority(10)
+        refreshed = await self.client.jobs["jid"]
+        assert isinstance(refreshed, Job)
+        self.assertEqual(refreshed.tags, ["b"])
+        self.assertEqual(refreshed.priority, 10)
+
+    async def test_move_and_cancel(self) -> None:
+        """Jobs can be moved and canceled"""
+        job = await self.pop()
+        await job.move("bar")
+        self.assertEqual(await self.client.queues["bar"].length(), 1)
+        self.assertEqual(await job.cancel(), ["jid"])
+        self.assertIsNone(await self.client.jobs["jid"])
+
+    async def test_dependencies(self) -> None:
+        """Dependencies can be added and removed"""
+        queue = self.client.queues["foo"]
+        await queue.put("reqless_test.common.NoopJob", "{}", jid="a")
+        await queue.put("reqless_test.common.NoopJob", "{}", jid="b")
+        await queue.put("reqless_test.common.NoopJob", "{}", jid="c", depends=["a"])
+        job = await self.client.jobs["c"]
+        assert isinstance(job, Job)
+        self.assertTrue(await job.depend("b"))
+        self.assertTrue(await job.undepend(all=True))
+        dependencies: List[str] = await queue.jobs.depends()
+        self.assertEqual(dependencies, [])
@@ -0,0 +1,99 @@
+"""Tests about the asyncio Queue class"""
+
+from reqless.aio import Job
+from reqless_test.common import AsyncTestReqless
+
+
+class TestAsyncQueue(AsyncTestReqless):
+    """Test the asyncio Queue class"""
+
+    async def test_put_pop(self) -> None:
+        """Jobs can be put and popped"""
+        queue = self.client.queues["foo"]
+        jid = await queue.put(
+            "reqless_test.common.NoopJob", '{"key": "value"}', priority=5, tags=["a"]
+        )
+        self.assertEqual(await queue.length(), 1)
+        job = await queue.pop()
+        assert isinstance(job, Job)
+        self.assertEqual(job.jid, jid)
+        self.assertEqual(job.data, '{"key": "value"}')
+        self.assertEqual(job.priority, 5)
+        self.assertEqual(job.tags, ["a"])
+        self.assertEqual(job.worker_name, self.client.worker_name)
+        self.assertIsNone(await queue.pop())
+        self.assertEqual(await queue.jobs.running(), [jid])
+
+    async def test_pop_count(self) -> None:
+        """Popping with a count returns a list"""
+        queue = self.client.queues["foo"]
+        for _ in range(3):
+            await queue.put("reqless_test.common.NoopJob", "{}")
+        jobs = await queue.pop(2)
+        assert isinstance(jobs, list)
+        self.assertEqual(len(jobs), 2)
+
+    async def test_pop_lite(self) -> None:
+        """Jobs can be popped without their history"""
+        queue = self.client.queues["foo"]
+        jid = await queue.put("reqless_test.common.NoopJob", "{}")
+        job = await queue.pop(lite=True)
+        assert isinstance(job, Job)
+        self.assertEqual(job.jid, jid)
+        with self.assertRaises(KeyError):
+            job.history
+        jobs = await self.client.jobs.get(jid, fields=["history"])
+        self.assertEqual(len(jobs[0].history), 2)
+
+    async def test_peek(self) -> None:
+        """Peeking does not pop"""
+        queue = self.client.queues["foo"]
+        jid = await queue.put("reqless_test.common.NoopJob", "{}")
+        job = await queue.peek()
+        assert isinstance(job, Job)
+        self.assertEqual(job.jid, jid)
+        jobs = await queue.peek(0, 10)
+        assert isinstance(jobs, list)
+        self.assertEqual([job.jid for job in jobs], [jid])
+        self.assertEqual((await queue.counts())["waiting"], 1)
+
+    async def test_put_many(self) -> None:
+        """Many jobs can be put at once"""
+        queue = self.client.queues["foo"]
+        jids = await queue.put_many(
+            ({"klass": "reqless_test.common.NoopJob", "data": "{}"} for _ in range(5)),
+            chunk_size=2,
+        )
+        self.assertEqual(len(jids), 5)
+        self.assertEqual(await queue.length(), 5)
+
+    async def test_scheduled_and_recurring(self) -> None:
+        """Provides access to scheduled and recurring jobs"""
+        queue = self.client.queues["foo"]
+        jid = await queue.put("reqless_test.common.NoopJob", "{}", delay=60)
+        recurring = await queue.recur("reqless_test.common.NoopJob", "{}", interval=60)
+        self.assertEqual(await queue.jobs.scheduled(), [jid])
+        self.assertEqual(await queue.jobs.recurring(), [recurring])
+        self.assertEqual(await queue.jobs.depends(), [])
+        self.assertEqual(await queue.jobs.stalled(), [])
+
+    async def test_pause(self) -> None:
+        """Paused queues don't hand out jobs"""
+        queue = self.client.queues["foo"]
+        await queue.put("reqless_test.common.NoopJob", "{}")
+        await queue.pause()
+        self.assertIsNone(await queue.pop())
+        await queue.unpause()
+        self.assertIsNotNone(await queue.pop())
+
+    async def test_heartbeat(self) -> None:
+        """The queue heartbeat can be read and set"""
+        queue = self.client.queues["foo"]
+        self.assertEqual(await queue.get_heartbeat(), 60)
+        await queue.set_heartbeat(10)
+        self.assertEqual(await queue.get_heartbeat(), 10)
+
+    async def test_stats(self) -> None:
+        """Provides access to queue stats"""
+        stats = await self.client.queues["foo"].stats()
+        self.assertEqual(stats["failed"], 0)
@@ -2,18 +2,25 @@
 
 import json
 import logging
+import os
 import time
 import unittest
 from os import path
-from typing import List
+from typing import Any, List
 
 from redis import Redis
 
 import reqless
+import reqless.aio
 from reqless import logger
 from reqless.abstract import AbstractJob
 
 
+# Whether to run the tests with commands run as functions rather than with
+# EVALSHA. CI sets this, running against a server that supports functions.
+USE_FUNCTIONS: bool = os.environ.get("REQLESS_TEST_USE_FUNCTIONS") == "1"
+
+
 class BlockingJob:
     """Job that can block until a given file is removed from the file system"""
 
@@ -37,6 +44,12 @@ class NoopJob:
         job.complete()
 
 
+class AsyncNoopJob:
+    @staticmethod
+    async def process(job: Any) -> None:
+        await job.complete()
+
+
 class TestReqless(unittest.TestCase):
     """Base class for all of our tests"""
 
@@ -53,7 +66,7 @@ class TestReqless(unittest.TestCase):
         all_keys: List = self.database.keys("*")
         assert len(all_keys) == 0
         # The reqless client we're using
-        self.client = reqless.Client()
+        self.client = reqless.Client(use_functions=USE_FUNCTIONS)
 
     def ensure_queues_exist(self, queue_names: List[str]) -> None:
         for queue_name in queue_names:
@@ -67,3 +80,27 @@ class TestReqless(unittest.TestCase):
     def tearDown(self) -> None:
         # Ensure that we leave no keys behind
         self.database.flushdb()
+
+
+class AsyncTestReqless(unittest.IsolatedAsyncioTestCase):
+    """Base class for tests of the asyncio client"""
+
+    database: Redis
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        reqless.logger.setLevel(logging.CRITICAL)
+        cls.database = Redis()
+        # Clear the script cache, and nuke everything
+        cls.database.execute_command("script", "flush")
+
+    async def asyncSetUp(self) -> None:
+        all_keys: List = self.database.keys("*")
+        assert len(all_keys) == 0
+        # The reqless client we're using
+        self.client = reqless.aio.Client()
+
+    async def asyncTearDown(self) -> None:
+        await self.client.close()
+        # Ensure that we leave no keys behind
+        self.database.flushdb()
@@ -1,7 +1,9 @@
 import time
 from typing import Dict, List
+from unittest.mock import PropertyMock, patch
 from uuid import uuid4
 
+from reqless import Queues
 from reqless.queue_resolvers.dynamic_mapping_queue_identifiers_transformer import (
     DynamicMappingQueueIdentifiersTransformer,
 )
@@ -104,6 +106,17 @@ class TestDynamicMappingQueueIdentifiersTransformer(TestReqless):
             ),
         )
 
+    def test_resolve_queue_names_negating_unmatched_queues(self) -> None:
+        """It tolerates negating queue names that weren't matched"""
+        self.assertEqual(
+            ["two"],
+            DynamicMappingQueueIdentifiersTransformer.resolve_queue_names(
+                dynamic_queue_mapping={},
+                known_queue_names=["one", "two"],
+                patterns=["t*", "!o*"],
+            ),
+        )
+
     def test_resolve_queue_names_dynamic_with_exact_match(self) -> None:
         """It includes queue names from dynamic queues by identifier"""
         patterns = ["@exact", "other_queue_name"]
@@ -382,3 +395,20 @@ class TestDynamicMappingQueueIdentifiersTransformer(TestReqless):
                 patterns=patterns,
             ),
         )
+
+    def test_queue_names_are_read_again_when_queues_change(self) -> None:
+        """It only reads the known queues again once the set of them changes"""
+        self.ensure_queues_exist(["one"])
+        subject = DynamicMappingQueueIdentifiersTransformer(client=self.client)
+        with patch.object(
+            Queues, "names", new_callable=PropertyMock, return_value=["one"]
+        ) as names_mock:
+            self.assertEqual(["one"], subject.transform(queue_identifiers=["o*"]))
+            self.assertEqual(["one"], subject.transform(queue_identifiers=["o*"]))
+            self.assertEqual(1, names_mock.call_count)
+            self.ensure_queues_exist(["other"])
+            names_mock.return_value = ["one", "other"]
+            self.assertEqual(
+                ["one", "other"], subject.transform(queue_identifiers=["o*"])
+            )
+            self.assertEqual(2, names_mock.call_count)
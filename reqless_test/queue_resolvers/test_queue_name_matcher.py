@@ -0,0 +1,38 @@
+import unittest
+
+from reqless.queue_resolvers.queue_name_matcher import (
+    QueueNameMatcher,
+    get_queue_name_matcher,
+    literal_prefix,
+)
+
+
+class TestQueueNameMatcher(unittest.TestCase):
+    def test_literal_prefix(self) -> None:
+        """It finds the literal text every match starts with"""
+        self.assertEqual("foo", literal_prefix("foo"))
+        self.assertEqual("foo-", literal_prefix("foo-*"))
+        self.assertEqual("foo", literal_prefix("foo.bar*"))
+        self.assertEqual("", literal_prefix("*foo"))
+        self.assertEqual("", literal_prefix("fo?o"))
+        self.assertEqual("", literal_prefix("foo|bar"))
+
+    def test_match_keeps_given_order(self) -> None:
+        """It returns matches in the order the names were given"""
+        subject = QueueNameMatcher(("foo-2", "bar", "foo-1", "foo-3", "food"))
+        self.assertEqual(["foo-2", "foo-1", "foo-3"], subject.match("foo-*"))
+        self.assertEqual(["foo-2", "foo-1", "foo-3", "food"], subject.match("foo*"))
+        self.assertEqual(["bar"], subject.match("bar"))
+        self.assertEqual([], subject.match("ba"))
+
+    def test_match_wildcards_anywhere(self) -> None:
+        """It matches wildcards in the middle and at the start"""
+        subject = QueueNameMatcher(("one", "three", "thirty-three", "two"))
+        self.assertEqual(["three", "thirty-three"], subject.match("th*ree"))
+        self.assertEqual(["one", "three", "thirty-three"], subject.match("*e"))
+        self.assertEqual(["one", "two"], subject.match("..."))
+
+    def test_matcher_is_reused(self) -> None:
+        """It reuses the matcher for the same names"""
+        names = ("one", "two")
+        self.assertIs(get_queue_name_matcher(names), get_queue_name_matcher(names))
@@ -0,0 +1,102 @@
+"""Tests about batching reqless commands"""
+
+import json
+from unittest.mock import patch
+
+from redis import Redis
+
+import reqless
+from reqless.exceptions import ReqlessError
+from reqless_test.common import TestReqless
+
+
+class TestBatch(TestReqless):
+    """Test the Batch class"""
+
+    def test_context_manager_executes_queued_commands(self) -> None:
+        """Commands queued in a batch are sent when the block exits"""
+        queue = self.client.queues["foo"]
+        jids = [queue.put("reqless_test.common.NoopJob", "{}") for _ in range(3)]
+        with self.client.batch() as batch:
+            futures = [batch("job.setPriority", jid, 10) for jid in jids]
+            self.assertEqual(len(batch), 3)
+            self.assertFalse(any(future.done() for future in futures))
+        self.assertEqual([future.result() for future in futures], [10, 10, 10])
+        for jid in jids:
+            self.assertEqual(json.loads(self.client("job.get", jid))["priority"], 10)
+
+    def test_execute_returns_results_in_order(self) -> None:
+        """Executing returns the results in the order commands were queued"""
+        batch = self.client.batch()
+        batch("queue.put", "worker", "foo", "jid-1", "klass", "{}", 0)
+        batch("queue.put", "worker", "foo", "jid-2", "klass", "{}", 0)
+        batch("queue.length", "foo")
+        self.assertEqual(batch.execute(), ["jid-1", "jid-2", 2])
+        self.assertEqual(len(batch), 0)
+
+    def test_errors_are_mapped_per_command(self) -> None:
+        """A failed command doesn't prevent the others from running"""
+        batch = self.client.batch()
+        failing = batch("job.complete", "missing", "worker", "foo", "{}")
+        succeeding = batch("queue.put", "worker", "foo", "jid", "klass", "{}", 0)
+        results = batch.execute(raise_on_error=False)
+        self.assertIsInstance(results[0], ReqlessError)
+        self.assertEqual(results[1], "jid")
+        self.assertRaises(ReqlessError, failing.result)
+        self.assertEqual(succeeding.result(), "jid")
+
+    def test_execute_raises_first_error(self) -> None:
+        """By default, executing raises the first error encountered"""
+        batch = self.client.batch()
+        batch("job.complete", "missing", "worker", "foo", "{}")
+        succeeding = batch("queue.put", "worker", "foo", "jid", "klass", "{}", 0)
+        self.assertRaises(ReqlessError, batch.execute)
+        self.assertEqual(succeeding.result(), "jid")
+
+    def test_context_manager_discards_on_exception(self) -> None:
+        """Commands are discarded if the block raises"""
+        try:
+            with self.client.batch() as batch:
+                future = batch("queue.put", "worker", "foo", "jid", "klass", "{}", 0)
+                raise RuntimeError("oops")
+        except RuntimeError:
+            pass
+        self.assertRaises(ReqlessError, future.result)
+        self.assertEqual(len(self.client.queues["foo"]), 0)
+
+    def test_execute_empty_batch(self) -> None:
+        """Executing an empty batch is a no-op"""
+        self.assertEqual(self.client.batch().execute(), [])
+
+    def test_stamped_when_executed(self) -> None:
+        """Commands run at the time the batch is executed, not queued"""
+        batch = self.client.batch()
+        batch("queue.put", "worker", "foo", "jid", "klass", "{}", 0)
+        with patch("time.time", return_value=12345.0):
+            batch.execute()
+        history = json.loads(self.client("job.get", "jid"))["history"]
+        self.assertEqual(history[0]["when"], 12345)
+
+    def test_invalidates_cache(self) -> None:
+        """Writes sent in a batch clear the client's cache right away"""
+        client = reqless.Client(cache_size=4)
+        self.assertEqual(client.config["foo"], None)
+        with client.batch() as batch:
+            batch("config.set", "foo", 5)
+        self.assertEqual(client.config["foo"], 5)
+
+    def test_reads_from_replicas(self) -> None:
+        """Batches of read-only commands go to a replica"""
+        replica = Redis(db=3)
+        try:
+            client = reqless.Client(replicas=["redis://localhost:6379/3"])
+            self.client.queues["foo"].put("reqless_test.common.NoopJob", "{}")
+            with client.batch() as batch:
+                read = batch("queue.length", "foo")
+            self.assertEqual(read.result(), 0)
+            with client.batch() as batch:
+                read = batch("queue.length", "foo")
+                batch("queue.put", "worker", "foo", "jid", "klass", "{}", 0)
+            self.assertEqual(read.result(), 1)
+        finally:
+            replica.flushdb()
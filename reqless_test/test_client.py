@@ -1,9 +1,11 @@
 """Basic tests about the client"""
 
+import time
 from typing import List
 
 from reqless import retry
 from reqless.abstract import AbstractClient, AbstractJob
+from reqless.job import Job
 from reqless.workers.base_worker import BaseWorker
 from reqless_test.common import TestReqless
 
@@ -115,6 +117,19 @@ class TestJobs(TestReqless):
         pop_one(self.client, "foo").fail("foo", "bar")
         self.assertEqual(self.client.jobs.failed(), {"foo": 1})
 
+    def test_heartbeat(self) -> None:
+        """Can renew the locks on several jobs at once"""
+        self.assertEqual(self.client.jobs.heartbeat(), {})
+        for jid in ("a", "b", "c"):
+            self.client.queues["foo"].put("reqless_test.common.NoopJob", "{}", jid=jid)
+        pop_one(self.client, "foo")
+        pop_one(self.client, "foo")
+        expires = self.client.jobs.heartbeat("a", "b", "c", "missing")
+        self.assertEqual(set(expires), {"a", "b"})
+        job = self.client.jobs["a"]
+        assert isinstance(job, Job)
+        self.assertEqual(job.expires_at, expires["a"])
+
 
 class TestQueues(TestReqless):
     """Test the Queues class"""
@@ -123,6 +138,45 @@ class TestQueues(TestReqless):
         """Gives us access to queues"""
         self.assertNotEqual(self.client.queues["foo"], None)
 
+    def test_version(self) -> None:
+        """The version changes when a queue is added or forgotten"""
+        self.assertEqual(self.client.queues.version, 0)
+        self.client.queues["foo"].put("reqless_test.common.NoopJob", "{}")
+        self.client.queues["foo"].put("reqless_test.common.NoopJob", "{}")
+        self.assertEqual(self.client.queues.version, 1)
+        self.client.queues["bar"].recur("reqless_test.common.NoopJob", "{}", 60)
+        self.assertEqual(self.client.queues.version, 2)
+        self.client("queue.forget", "foo", "baz")
+        self.assertEqual(self.client.queues.version, 3)
+        self.client("queue.forget", "baz")
+        self.assertEqual(self.client.queues.version, 3)
+
+    def test_names(self) -> None:
+        """Gives us the names of all the queues"""
+        self.assertEqual(self.client.queues.names, [])
+        self.client.queues["foo"].put("reqless_test.common.NoopJob", "{}")
+        self.client.queues["bar"].put("reqless_test.common.NoopJob", "{}")
+        self.assertEqual(sorted(self.client.queues.names), ["bar", "foo"])
+
+    def test_counts_page(self) -> None:
+        """Can page through the counts of the queues"""
+        self.assertEqual(self.client.queues.counts_page(), (0, []))
+        for name in ["a", "b", "c"]:
+            self.client.queues[name].put("reqless_test.common.NoopJob", "{}")
+        cursor, counts = self.client.queues.counts_page(0, 2)
+        self.assertEqual(cursor, 2)
+        self.assertEqual(len(counts), 2)
+        cursor, rest = self.client.queues.counts_page(cursor, 2)
+        self.assertEqual(cursor, 0)
+        self.assertEqual(len(rest), 1)
+        self.assertEqual(
+            sorted(count["name"] for count in counts + rest), ["a", "b", "c"]
+        )
+        self.assertEqual(
+            sorted(counts + rest, key=lambda count: count["name"]),
+            sorted(self.client.queues.counts, key=lambda count: count["name"]),
+        )
+
     def test_counts(self) -> None:
         """Gives us access to counts"""
         self.assertEqual(self.client.queues.counts, [])
@@ -144,6 +198,58 @@ class TestQueues(TestReqless):
             ],
         )
 
+    def test_pop(self) -> None:
+        """Pops from several queues at once, in order"""
+        self.assertEqual(self.client.queues.pop([]), [])
+        self.assertEqual(self.client.queues.pop(["foo", "bar"]), [])
+        for queue_name in ("foo", "bar", "bar", "baz"):
+            self.client.queues[queue_name].put("reqless_test.common.NoopJob", "{}")
+        jobs = self.client.queues.pop(["baz", "bar", "foo"], 3)
+        self.assertEqual([job.queue_name for job in jobs], ["baz", "bar", "bar"])
+        jobs = self.client.queues.pop(["baz", "bar", "foo"], 3)
+        self.assertEqual([job.queue_name for job in jobs], ["foo"])
+        self.assertEqual(jobs[0].worker_name, self.client.worker_name)
+
+    def test_pop_lite(self) -> None:
+        """Pops lite jobs from several queues at once"""
+        self.client.queues["foo"].put("reqless_test.common.NoopJob", "{}", jid="jid")
+        jobs = self.client.queues.pop(["foo"], lite=True)
+        self.assertEqual([job.jid for job in jobs], ["jid"])
+        assert isinstance(jobs[0], Job)
+        with self.assertRaises(KeyError):
+            jobs[0].history
+
+    def test_get_fields(self) -> None:
+        """Gets several jobs limited to some fields"""
+        self.client.queues["foo"].put("reqless_test.common.NoopJob", "{}", jid="a")
+        self.client.queues["foo"].put("reqless_test.common.NoopJob", "{}", jid="b")
+        jobs = self.client.jobs.get("a", "b", "c", fields=["state", "history"])
+        self.assertEqual([job.jid for job in jobs], ["a", "b"])
+        self.assertEqual([job.state for job in jobs], ["waiting", "waiting"])
+        assert isinstance(jobs[0], Job)
+        self.assertEqual(len(jobs[0].history), 1)
+        with self.assertRaises(KeyError):
+            jobs[0].dependents
+        jobs = self.client.jobs.get("a", lite=True)
+        assert isinstance(jobs[0], Job)
+        with self.assertRaises(KeyError):
+            jobs[0].history
+        self.assertEqual(jobs[0].queue_name, "foo")
+
+    def test_next_due(self) -> None:
+        """Reports when the next job in any of the queues comes due"""
+        self.assertIsNone(self.client.queues.next_due())
+        self.assertIsNone(self.client.queues.next_due("foo", "bar"))
+        before = time.time()
+        self.client.queues["foo"].put("reqless_test.common.NoopJob", "{}", delay=100)
+        self.client.queues["bar"].put("reqless_test.common.NoopJob", "{}", delay=10)
+        due = self.client.queues.next_due("foo", "bar")
+        assert due is not None
+        self.assertAlmostEqual(due, before + 10, delta=1)
+        due = self.client.queues.next_due("foo")
+        assert due is not None
+        self.assertAlmostEqual(due, before + 100, delta=1)
+
     def test_attribute_error(self) -> None:
         """Raises AttributeErrors for non-attributes"""
         self.assertRaises(
@@ -0,0 +1,59 @@
+"""Tests for the JSON codecs"""
+
+import unittest
+
+import reqless
+from reqless.codec import CODECS, JSONCodec, get_codec
+from reqless_test.common import TestReqless
+
+
+class TestCodec(unittest.TestCase):
+    """Test encoding and decoding JSON"""
+
+    def codecs(self) -> list:
+        codecs = []
+        for name in CODECS:
+            try:
+                codecs.append(get_codec(name))
+            except ImportError:
+                pass
+        return codecs
+
+    def test_round_trip(self) -> None:
+        """Every installed codec encodes and decodes the same way"""
+        value = {"jid": "jid", "history": [{"what": "put", "when": 1.5}], "tags": []}
+        for codec in self.codecs():
+            with self.subTest(codec=codec.name):
+                self.assertEqual(codec.loads(codec.dumps(value)), value)
+                self.assertIsInstance(codec.dumps(value), str)
+                self.assertEqual(codec.loads('{"a": "é"}'), {"a": "é"})
+                self.assertEqual(codec.loads(b'{"a": [1, 2]}'), {"a": [1, 2]})
+
+    def test_default(self) -> None:
+        """The standard library is the default, whatever else is installed"""
+        self.assertEqual(get_codec().name, "json")
+        self.assertEqual(reqless.Client().codec.name, "json")
+
+    def test_unknown(self) -> None:
+        """Asking for a codec that doesn't exist is an error"""
+        with self.assertRaises(ValueError):
+            get_codec("yaml")
+
+
+class TestClientCodec(TestReqless):
+    """Test choosing the codec for a client"""
+
+    def test_by_name(self) -> None:
+        """A client can be given the name of a codec"""
+        client = reqless.Client(codec="json")
+        self.assertIsInstance(client.codec, JSONCodec)
+        self.assertEqual(client.codec.name, "json")
+        jid = client.queues["foo"].put("Foo", "{}", tags=["tag"])
+        job = client.jobs[jid]
+        assert job is not None
+        self.assertEqual(job.tags, ["tag"])
+
+    def test_instance(self) -> None:
+        """A client can be given a codec"""
+        codec = JSONCodec()
+        self.assertIs(reqless.Client(codec=codec).codec, codec)
@@ -1,6 +1,9 @@
 """Tests about the config class"""
 
+import reqless
+from reqless.config import CachedConfig
 from reqless_test.common import TestReqless
+from reqless_test.test_helpers import wait_for_condition
 
 
 class TestConfig(TestReqless):
@@ -82,3 +85,44 @@ class TestConfig(TestReqless):
     def test_default_config(self) -> None:
         """We can get default config values."""
         self.assertEqual(self.client.config["heartbeat"], 60)
+
+
+class TestCachedConfig(TestReqless):
+    """Test the config cached on the client"""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.cached = reqless.Client(
+            "redis://localhost:6379", hostname="cached", config_ttl=60
+        )
+
+    def test_cached(self) -> None:
+        """Reads are served from the local copy"""
+        self.assertIsInstance(self.cached.config, CachedConfig)
+        self.assertEqual(self.cached.config["heartbeat"], 60)
+        # A write that bypasses reqless entirely isn't announced
+        self.database.hset("ql:config", "heartbeat", 10)
+        self.assertEqual(self.cached.config["heartbeat"], 60)
+
+    def test_own_writes(self) -> None:
+        """Writes through the caching client are seen right away"""
+        self.assertEqual(self.cached.config["foo"], None)
+        self.cached.config["foo"] = 5
+        self.assertEqual(self.cached.config["foo"], 5)
+        del self.cached.config["foo"]
+        self.assertEqual(self.cached.config["foo"], None)
+
+    def test_other_writes(self) -> None:
+        """Writes through other clients drop the local copy"""
+        self.assertEqual(self.cached.config["heartbeat"], 60)
+        self.client.config["heartbeat"] = 10
+        wait_for_condition(lambda: self.cached.config["heartbeat"] == 10)
+        del self.client.config["heartbeat"]
+        wait_for_condition(lambda: self.cached.config["heartbeat"] == 60)
+
+    def test_ttl(self) -> None:
+        """The local copy expires after the ttl"""
+        config = CachedConfig(self.client, ttl=0)
+        self.assertEqual(config["heartbeat"], 60)
+        self.database.hset("ql:config", "heartbeat", 10)
+        self.assertEqual(config["heartbeat"], 10)
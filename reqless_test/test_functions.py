@@ -0,0 +1,114 @@
+"""Tests for loading reqless as a function library"""
+
+import pkgutil
+import time
+from typing import List
+
+import reqless
+from reqless.functions import (
+    DISPATCH_MARKER,
+    LIBRARIES_KEY,
+    LIBRARY_MAX_AGE,
+    build_library,
+)
+from reqless_test.common import USE_FUNCTIONS, TestReqless
+
+
+class TestFunctions(TestReqless):
+    """Test the function library backend"""
+
+    def setUp(self) -> None:
+        TestReqless.setUp(self)
+        script = pkgutil.get_data("reqless", "lua/reqless.lua")
+        assert script is not None
+        self.script: bytes = script
+
+    def supports_functions(self) -> bool:
+        version = self.client.database.info("server")["redis_version"]
+        return int(version.split(".")[0]) >= 7
+
+    def require_functions(self) -> None:
+        """Skip the test if the server doesn't support functions, unless
+        we're meant to be testing them"""
+        if USE_FUNCTIONS:
+            self.assertTrue(self.supports_functions())
+        elif not self.supports_functions():
+            self.skipTest("Functions aren't supported by this server")
+
+    def library_names(self) -> List[str]:
+        return [
+            dict(zip(library[::2], library[1::2]))["library_name"]
+            for library in self.database.execute_command("FUNCTION", "LIST")
+        ]
+
+    def test_build_library(self) -> None:
+        """Replaces the EVALSHA dispatch with a registered function"""
+        name, code = build_library(self.script)
+        self.assertTrue(name.startswith("reqless_"))
+        self.assertTrue(code.startswith("#!lua name=%s\n" % name))
+        self.assertIn("redis.register_function('%s'" % name, code)
+        self.assertNotIn(DISPATCH_MARKER, code)
+        self.assertEqual(build_library(self.script)[0], name)
+
+    def test_build_library_without_dispatch(self) -> None:
+        """Refuses scripts it doesn't know how to convert"""
+        self.assertRaises(ValueError, build_library, b"return 1")
+
+    def test_use_functions(self) -> None:
+        """Commands work with functions, or fall back to EVALSHA without"""
+        client = reqless.Client(use_functions=True)
+        if self.supports_functions():
+            self.assertTrue(client.uses_functions)
+        else:
+            self.assertFalse(client.uses_functions)
+        jid = client.queues["foo"].put("reqless_test.common.NoopJob", "{}")
+        job = client.queues["foo"].pop()
+        assert job is not None and not isinstance(job, list)
+        self.assertEqual(job.jid, jid)
+        self.assertRaises(reqless.ReqlessError, client, "foo")
+
+    def test_reloads_flushed_library(self) -> None:
+        """Reloads the library if the server lost it"""
+        self.require_functions()
+        client = reqless.Client(use_functions=True)
+        client.database.execute_command("FUNCTION", "FLUSH")
+        self.assertEqual(client.queues.counts, [])
+
+    def test_batch_reloads_flushed_library(self) -> None:
+        """Reloads the library if the server lost it while batching"""
+        self.require_functions()
+        client = reqless.Client(use_functions=True)
+        client.database.execute_command("FUNCTION", "FLUSH")
+        with client.batch() as batch:
+            future = batch("queues.counts")
+        self.assertEqual(client.codec.loads(future.result()), [])
+
+    def test_config_unset(self) -> None:
+        """Unset config isn't remembered by the library between calls"""
+        self.require_functions()
+        client = reqless.Client(use_functions=True)
+        client.config["foo"] = "bar"
+        self.assertEqual(client.config.all["foo"], "bar")
+        del client.config["foo"]
+        self.assertNotIn("foo", client.config.all)
+        self.assertIsNone(client.config["foo"])
+
+    def test_prunes_stale_libraries(self) -> None:
+        """Libraries that haven't been loaded in a while are deleted"""
+        self.require_functions()
+        self.database.execute_command(
+            "FUNCTION",
+            "LOAD",
+            "REPLACE",
+            "#!lua name=reqless_old\n"
+            "redis.register_function('reqless_old', function() return 1 end)",
+        )
+        self.database.hset(
+            LIBRARIES_KEY, "reqless_old", time.time() - LIBRARY_MAX_AGE - 1
+        )
+        client = reqless.Client(use_functions=True)
+        assert client._library is not None
+        name = client._library[0]
+        self.assertNotIn("reqless_old", self.library_names())
+        self.assertIn(name, self.library_names())
+        self.assertEqual(list(self.database.hgetall(LIBRARIES_KEY)), [name])
@@ -1,5 +1,7 @@
 from threading import Thread
 
+import pytest
+
 from reqless.future import Future
 from reqless_test.test_helpers import wait_for_condition
 
@@ -47,3 +49,11 @@ def test_set_result_makes_the_result_retrievable() -> None:
     subject.set_result(True)
     assert subject.done()
     assert subject.result()
+
+
+def test_set_exception_makes_result_raise() -> None:
+    subject = Future[bool]()
+    subject.set_exception(ValueError("boom"))
+    assert subject.done()
+    with pytest.raises(ValueError, match="boom"):
+        subject.result()
@@ -121,6 +121,38 @@ class TestJob(TestReqless):
             lambda: job.foo,  # type: ignore[attr-defined]
         )
 
+    def test_slots(self) -> None:
+        """Jobs don't have an instance dict"""
+        self.client.queues["foo"].put(Job, "{}", jid="jid")
+        job = self.get_job("jid")
+        self.assertFalse(hasattr(job, "__dict__"))
+        with self.assertRaises(AttributeError):
+            job.foo = "bar"  # type: ignore[attr-defined]
+
+    def test_empty_lists(self) -> None:
+        """Empty lists that Lua encodes as objects are lists once accessed, and
+        lists left out raise a KeyError like other fields"""
+        job = Job(
+            self.client,
+            jid="jid",
+            data="{}",
+            klass="Foo",
+            priority=0,
+            queue="foo",
+            tags={},
+            dependents={},
+            dependencies={},
+            history={},
+        )
+        self.assertEqual(job.tags, [])
+        job.tags.append("tag")
+        self.assertEqual(job.tags, ["tag"])
+        self.assertEqual(job.dependents, [])
+        self.assertEqual(job.dependencies, [])
+        self.assertEqual(job.history, [])
+        with self.assertRaises(KeyError):
+            job.throttles
+
     def test_cancel(self) -> None:
         """Exposes the cancel method"""
         self.client.queues["foo"].put("reqless_test.test_job.Foo", "{}", jid="jid")
@@ -154,6 +186,25 @@ class TestJob(TestReqless):
         queue_throttle = queue.throttle.name
         self.assertEqual(job.throttles, ["throttle", queue_throttle])
 
+    def test_history_collapses(self) -> None:
+        """The oldest history entries are collapsed into a summary"""
+        self.client.config["max-job-history"] = 5
+        self.client.queues["foo"].put(Job, "{}", jid="jid")
+        for _ in range(4):
+            job = self.client.queues["foo"].pop()
+            assert isinstance(job, Job)
+            job.move("foo")
+        history = self.get_job("jid").history
+        self.assertEqual(len(history), 5)
+        self.assertEqual(history[0]["what"], "put")
+        self.assertEqual(history[1]["what"], "collapsed")
+        self.assertEqual(history[1]["count"], 5)
+        self.assertEqual(history[1]["counts"], {"popped": 3, "put": 2})
+        self.assertLessEqual(history[1]["first"], history[1]["when"])
+        self.assertEqual(
+            [entry["what"] for entry in history[2:]], ["put", "popped", "put"]
+        )
+
     def test_complete(self) -> None:
         """Able to complete a job"""
         self.client.queues["foo"].put("reqless_test.test_job.Foo", "{}", jid="jid")
@@ -171,6 +222,7 @@ class TestJob(TestReqless):
         job.complete("bar")
         job = self.get_job("jid")
         self.assertEqual(job.state, "waiting")
+        self.assertEqual(job.queue_name, "bar")
 
     def test_heartbeat(self) -> None:
         """Provides access to heartbeat"""
@@ -225,6 +277,52 @@ class TestJob(TestReqless):
         job = self.get_job("c")
         self.assertEqual(job.dependencies, [])
 
+    def test_release_dependents_in_batches(self) -> None:
+        """Dependents of a completed job are released a batch at a time"""
+        self.client.config["dependents-release-batch"] = 2
+        queue = self.client.queues["foo"]
+        queue.put("reqless_test.test_job.Foo", "{}", jid="a")
+        for jid in ["b", "c", "d", "e", "f"]:
+            queue.put("reqless_test.test_job.Foo", "{}", jid=jid, depends=["a"])
+        job = queue.pop()
+        assert isinstance(job, Job)
+        job.complete()
+        self.assertEqual(len(self.get_job("a").dependents), 3)
+        self.assertEqual(len(queue), 2)
+        # Popping releases another batch before popping
+        self.assertEqual(len(queue.pop(4)), 4)  # type: ignore[arg-type]
+        self.assertEqual(len(self.get_job("a").dependents), 1)
+        self.assertEqual(self.client.release_dependents(), 1)
+        self.assertEqual(self.get_job("a").dependents, [])
+        self.assertEqual(self.client.release_dependents(), 0)
+        self.assertEqual(self.database.llen("ql:releasing"), 0)
+
+    def test_release_only_waiting_dependents(self) -> None:
+        """Dependents that were undepended or cancelled while waiting to be
+        released, or are no longer waiting on dependencies, aren't queued"""
+        self.client.config["dependents-release-batch"] = 0
+        queue = self.client.queues["foo"]
+        queue.put("reqless_test.test_job.Foo", "{}", jid="a")
+        for jid in ["b", "c", "d", "e"]:
+            queue.put("reqless_test.test_job.Foo", "{}", jid=jid, depends=["a"])
+        job = queue.pop()
+        assert isinstance(job, Job)
+        job.complete()
+        self.assertEqual(self.database.scard("ql:j:a-releasing"), 4)
+        self.get_job("d").undepend(all=True)
+        self.get_job("e").cancel()
+        self.assertEqual(self.database.scard("ql:j:a-releasing"), 2)
+        popped = queue.pop()
+        assert isinstance(popped, Job)
+        self.assertEqual(popped.jid, "d")
+        # Even if it were still set aside, the running job isn't queued again
+        self.database.sadd("ql:j:a-releasing", "d")
+        self.assertEqual(self.client.release_dependents(), 3)
+        self.assertEqual(self.get_job("b").state, "waiting")
+        self.assertEqual(self.get_job("c").state, "waiting")
+        self.assertEqual(self.get_job("d").state, "running")
+        self.assertEqual(queue.counts["waiting"], 2)
+
     def test_retry_fail(self) -> None:
         """Retry raises an error if retry fails"""
         from reqless.exceptions import ReqlessError
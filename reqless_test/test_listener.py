@@ -75,3 +75,29 @@ class TestListener(TestReqless):
         listener.unlisten()
         thread.join()
         self.assertEqual(count, 1)
+
+    def test_subscribe(self) -> None:
+        """Channels subscribed to from another thread are listened to"""
+        channels = []
+        listener = Listener(channels=["ql:popped"], database=self.client.database)
+
+        def listen() -> None:
+            for message in listener.listen():
+                channels.append(message["channel"])
+
+        thread = Thread(target=listen)
+        thread.start()
+        listener.wait_until_listening()
+        listener.subscribe("ql:completed")
+        listener.unsubscribe("ql:popped")
+        wait_for_condition(
+            lambda: self.database.pubsub_numsub("ql:completed")[0][1] == 1
+            and self.database.pubsub_numsub("ql:popped")[0][1] == 0
+        )
+        job = self.client.queues["foo"].pop()
+        assert isinstance(job, AbstractJob)
+        job.complete()
+
+        listener.unlisten()
+        thread.join()
+        self.assertEqual(channels, ["ql:completed"])
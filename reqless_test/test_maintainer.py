@@ -0,0 +1,165 @@
+"""Tests for housekeeping"""
+
+import time
+from typing import List
+
+from reqless.job import Job
+from reqless.maintainer import Maintainer
+from reqless_test.common import TestReqless
+
+
+class TestMaintainer(TestReqless):
+    """Test deleting expired jobs and releasing dependents"""
+
+    def setUp(self) -> None:
+        TestReqless.setUp(self)
+        self.queue = self.client.queues["foo"]
+
+    def complete(self, count: int) -> List[str]:
+        """Put, pop and complete jobs, returning their jids"""
+        jids = [self.queue.put("reqless.Job", "{}") for _ in range(count)]
+        for job in self.queue.pop(count):  # type: ignore[union-attr]
+            job.complete()
+        return jids
+
+    def test_complete_is_bounded(self) -> None:
+        """Completing a job only deletes a few expired jobs"""
+        self.client.config["jobs-gc-on-complete"] = 0
+        jids = self.complete(5)
+        self.client.config["jobs-history-count"] = 1
+        self.client.config["jobs-gc-on-complete"] = 2
+        self.complete(1)
+        self.assertEqual(self.database.zcard("ql:completed"), 4)
+        self.assertIsNone(self.client.jobs[jids[0]])
+        self.assertIsNone(self.client.jobs[jids[1]])
+        self.assertIsNotNone(self.client.jobs[jids[2]])
+
+    def test_gc_by_count(self) -> None:
+        """Jobs beyond the most recent `jobs-history-count` are deleted"""
+        self.client.config["jobs-gc-on-complete"] = 0
+        jids = self.complete(5)
+        self.client.config["jobs-history-count"] = 2
+        self.assertEqual(self.client.gc(2), 2)
+        self.assertEqual(self.client.gc(2), 1)
+        self.assertEqual(self.client.gc(2), 0)
+        self.assertEqual(
+            [jid for jid in jids if self.client.jobs[jid] is not None], jids[3:]
+        )
+
+    def test_gc_by_time(self) -> None:
+        """Jobs completed more than `jobs-history` seconds ago are deleted"""
+        self.client.config["jobs-gc-on-complete"] = 0
+        jids = self.complete(3)
+        self.database.zadd("ql:completed", {jids[0]: 0})
+        self.assertEqual(self.client.gc(), 1)
+        self.assertIsNone(self.client.jobs[jids[0]])
+        self.assertIsNotNone(self.client.jobs[jids[1]])
+
+    def test_maintainer(self) -> None:
+        """The maintainer keeps going while there's a backlog"""
+        self.client.config["jobs-gc-on-complete"] = 0
+        self.complete(5)
+        self.client.config["jobs-history-count"] = 0
+        maintainer = Maintainer(self.client, gc_limit=3)
+        self.assertTrue(maintainer.run_once())
+        self.assertFalse(maintainer.run_once())
+        self.assertEqual(self.database.zcard("ql:completed"), 0)
+
+    def test_maintainer_releases_dependents(self) -> None:
+        """The maintainer releases the dependents of completed jobs"""
+        self.client.config["dependents-release-batch"] = 1
+        self.queue.put("reqless.Job", "{}", jid="a")
+        for jid in ["b", "c", "d"]:
+            self.queue.put("reqless.Job", "{}", jid=jid, depends=["a"])
+        job = self.queue.pop()
+        assert isinstance(job, Job)
+        job.complete()
+        self.assertEqual(len(self.queue), 1)
+        maintainer = Maintainer(self.client, release_limit=2)
+        self.assertTrue(maintainer.run_once())
+        self.assertFalse(maintainer.run_once())
+        self.assertEqual(len(self.queue), 3)
+
+    def test_maintain_scheduled(self) -> None:
+        """Scheduled jobs are made available when due, without popping"""
+        self.client.config["maintain-on-pop"] = 0
+        self.assertIsNone(self.client.next_maintenance())
+        before = time.time()
+        self.queue.put("reqless.Job", "{}", jid="a", delay=10)
+        due = self.client.next_maintenance()
+        assert due is not None
+        self.assertAlmostEqual(due, before + 10, delta=1)
+        self.assertEqual(self.client.maintain(), 0)
+        # Pretend that it's come due
+        self.database.zadd("ql:q:foo-scheduled", {"a": 0})
+        self.database.zadd("ql:due", {"foo": 0})
+        self.assertIsNone(self.queue.pop())
+        self.assertEqual(self.client.maintain(), 1)
+        job = self.client.jobs["a"]
+        assert isinstance(job, Job)
+        self.assertEqual(job.state, "waiting")
+        self.assertIsNone(self.client.next_maintenance())
+        popped = self.queue.pop()
+        assert isinstance(popped, Job)
+        self.assertEqual(popped.jid, "a")
+
+    def test_maintain_expired_locks(self) -> None:
+        """Jobs whose locks expired are made available to be popped again"""
+        self.client.config["maintain-on-pop"] = 0
+        self.client.config["grace-period"] = 0
+        self.client.config["heartbeat"] = -10
+        self.queue.put("reqless.Job", "{}", jid="a")
+        self.assertIsNotNone(self.queue.pop())
+        self.assertIsNone(self.queue.pop())
+        self.assertEqual(self.client.maintain(), 1)
+        job = self.client.jobs["a"]
+        assert isinstance(job, Job)
+        self.assertEqual(job.state, "waiting")
+        self.assertEqual(job.worker_name, "")
+        popped = self.queue.pop()
+        assert isinstance(popped, Job)
+        self.assertEqual(popped.jid, "a")
+
+    def test_maintain_is_bounded(self) -> None:
+        """Only `limit` jobs are handled at once"""
+        for jid in ["a", "b", "c"]:
+            self.queue.put("reqless.Job", "{}", jid=jid, delay=10)
+            self.database.zadd("ql:q:foo-scheduled", {jid: 0})
+        self.database.zadd("ql:due", {"foo": 0})
+        self.assertEqual(self.client.maintain(2), 2)
+        self.assertEqual(self.client.maintain(2), 1)
+        self.assertEqual(self.client.maintain(2), 0)
+
+    def test_maintainer_waits_until_due(self) -> None:
+        """The maintainer doesn't wait past when the next queue is due"""
+        maintainer = Maintainer(self.client, interval=60)
+        self.assertEqual(maintainer.wait_time(), 60)
+        self.queue.put("reqless.Job", "{}", delay=5)
+        self.assertLessEqual(maintainer.wait_time(), 5)
+
+    def test_reap_dead_workers(self) -> None:
+        """The jobs of workers whose leases ran out are reclaimed right away,
+        without waiting out the grace period"""
+        self.client.config["maintain-on-pop"] = 0
+        self.queue.put("reqless.Job", "{}", jid="a")
+        self.client.workers.lease(self.client.worker_name, 60)
+        self.assertIsNotNone(self.queue.pop())
+        self.assertEqual(self.client.maintain(), 0)
+        # Pretend that the lease has run out
+        self.database.zadd("ql:workers:leases", {self.client.worker_name: 0})
+        self.assertEqual(self.client.maintain(), 2)
+        job = self.client.jobs["a"]
+        assert isinstance(job, Job)
+        self.assertEqual(job.state, "waiting")
+        self.assertEqual(
+            self.client.workers.counts,
+            [
+                {
+                    "name": self.client.worker_name,
+                    "jobs": 0,
+                    "stalled": 0,
+                    "alive": False,
+                }
+            ],
+        )
+        self.assertEqual(self.client.maintain(), 0)
@@ -1,7 +1,10 @@
 """Basic tests about the Job class"""
 
+import time
 from typing import List
+from unittest.mock import patch
 
+from reqless.job import Job
 from reqless_test.common import TestReqless
 
 
@@ -74,6 +77,30 @@ class TestQueue(TestReqless):
         assert job is not None and not isinstance(job, List)
         self.assertEqual(job.jid, "jid")
 
+    def test_pop_lite(self) -> None:
+        """Jobs can be popped without their history"""
+        self.client.queues["foo"].put("reqless_test.common.NoopJob", "{}", jid="jid")
+        job = self.client.queues["foo"].pop(lite=True)
+        assert isinstance(job, Job)
+        self.assertEqual(job.jid, "jid")
+        self.assertEqual(job.worker_name, self.client.worker_name)
+        with self.assertRaises(KeyError):
+            job.history
+        job.complete()
+        self.assertEqual(self.client.jobs["jid"].state, "complete")  # type: ignore
+
+    def test_peek_fields(self) -> None:
+        """Peeked jobs can be limited to some fields"""
+        self.client.queues["foo"].put(
+            "reqless_test.common.NoopJob", "{}", jid="jid", tags=["tag"]
+        )
+        job = self.client.queues["foo"].peek(fields=["tags"])
+        assert job is not None and not isinstance(job, List)
+        self.assertEqual(job.jid, "jid")
+        self.assertEqual(job.tags, ["tag"])
+        with self.assertRaises(KeyError):
+            job.klass_name
+
     def test_peek_many(self) -> None:
         """Exposes multi-peek"""
         self.client.queues["foo"].put("reqless_test.common.NoopJob", "{}")
@@ -109,6 +136,101 @@ class TestQueue(TestReqless):
         queue_throttle = queue.throttle.name
         self.assertEqual(job.throttles, ["throttle", queue_throttle])
 
+    def test_put_many(self) -> None:
+        """Puts many jobs, returning their jids in order"""
+        queue = self.client.queues["foo"]
+        jids = queue.put_many(
+            [
+                {"klass": "reqless_test.common.NoopJob", "data": "{}", "jid": "a"},
+                {
+                    "klass": "reqless_test.common.NoopJob",
+                    "data": '{"key": "value"}',
+                    "jid": "b",
+                    "priority": 10,
+                    "tags": ["tag"],
+                    "throttles": ["throttle"],
+                },
+                {"klass": "reqless_test.common.NoopJob", "data": "{}", "delay": 60},
+            ],
+            chunk_size=2,
+        )
+        self.assertEqual(jids[:2], ["a", "b"])
+        self.assertEqual(len(jids), 3)
+        self.assertEqual(queue.counts["waiting"], 2)
+        self.assertEqual(queue.counts["scheduled"], 1)
+        job = self.client.jobs["b"]
+        assert isinstance(job, Job)
+        self.assertEqual(job.data, '{"key": "value"}')
+        self.assertEqual(job.priority, 10)
+        self.assertEqual(job.tags, ["tag"])
+        self.assertEqual(job.throttles, ["throttle", queue.throttle.name])
+
+    def test_put_many_with_depends(self) -> None:
+        """Jobs put together may depend on one another"""
+        queue = self.client.queues["foo"]
+        queue.put_many(
+            [
+                {"klass": "reqless_test.common.NoopJob", "data": "{}", "jid": "a"},
+                {
+                    "klass": "reqless_test.common.NoopJob",
+                    "data": "{}",
+                    "jid": "b",
+                    "depends": ["a"],
+                },
+            ]
+        )
+        self.assertEqual(queue.jobs.depends(), ["b"])
+
+    def test_put_many_publishes_available(self) -> None:
+        """Workers are told a queue has work once per call, while asked to be"""
+        pubsub = self.database.pubsub()
+        pubsub.subscribe("ql:available:foo")
+        queue = self.client.queues["foo"]
+        jobs = [{"klass": "reqless_test.common.NoopJob", "data": "{}"}] * 5
+        queue.put_many(jobs)
+        self.client.queues.wake_on_put(10, "foo")
+        queue.put_many(jobs)
+        with patch("time.time", return_value=time.time() + 20):
+            queue.put_many(jobs)
+        messages = []
+        while True:
+            message = pubsub.get_message(timeout=0.1)
+            if message is None:
+                break
+            if message["type"] == "message":
+                messages.append(message)
+        pubsub.close()
+        self.assertEqual(len(messages), 1)
+
+    def test_put_many_budget(self) -> None:
+        """Calls stop once they've used up their budget, and the rest of the
+        jobs are put by later calls"""
+        queue = self.client.queues["foo"]
+        jobs = [{"klass": "reqless_test.common.NoopJob", "data": "{}"}] * 5
+        put = self.client.codec.loads(
+            self.client(
+                "queue.putMulti",
+                "worker",
+                "foo",
+                self.client.codec.dumps(
+                    [dict(job, jid=str(i)) for i, job in enumerate(jobs)]
+                ),
+                0.000001,
+            )
+        )
+        self.assertEqual(put, ["0"])
+        self.assertEqual(len(queue.put_many(jobs, budget=0.000001)), 5)
+        self.assertEqual(len(queue), 6)
+
+    def test_put_many_empty(self) -> None:
+        """Putting no jobs is a no-op"""
+        self.assertEqual(self.client.queues["foo"].put_many([]), [])
+
+    def test_put_many_invalid_chunk_size(self) -> None:
+        """The chunk size must be positive"""
+        queue = self.client.queues["foo"]
+        self.assertRaises(ValueError, queue.put_many, [], chunk_size=0)
+
     def test_requeue_with_throttles(self) -> None:
         """Test requeue with throttles given"""
         queue = self.client.queues["foo"]
@@ -0,0 +1,64 @@
+"""Tests for reading from replicas"""
+
+import pkgutil
+import re
+
+from redis import Redis
+
+import reqless
+from reqless.replicas import READ_ONLY_COMMANDS, Replicas
+from reqless_test.common import TestReqless
+
+
+class TestReplicas(TestReqless):
+    """Test routing reads to replicas"""
+
+    def setUp(self) -> None:
+        TestReqless.setUp(self)
+        # An empty database stands in for a replica, so that we can tell
+        # which commands were sent to it
+        self.replica = Redis(db=3)
+        assert not self.replica.keys("*")
+
+    def tearDown(self) -> None:
+        self.replica.flushdb()
+        TestReqless.tearDown(self)
+
+    def test_read_only_commands_exist(self) -> None:
+        """Every read-only command is part of the API"""
+        script = pkgutil.get_data("reqless", "lua/reqless.lua")
+        assert script is not None
+        commands = set(
+            re.findall(r"^ReqlessAPI\[[\"']([^\"']+)[\"']\]", script.decode(), re.M)
+        )
+        self.assertEqual(READ_ONLY_COMMANDS - commands, set())
+
+    def test_round_robin(self) -> None:
+        """Replicas are used in turn, skipping any that are down"""
+        replicas = Replicas(["redis://one", "redis://two", "redis://three"])
+        chosen = [replicas.choose() for _ in range(3)]
+        self.assertEqual(chosen, replicas.databases)
+        replicas.mark_down(replicas.databases[1])
+        chosen = [replicas.choose() for _ in range(3)]
+        self.assertNotIn(replicas.databases[1], chosen)
+        for database in replicas.databases:
+            replicas.mark_down(database)
+        self.assertIsNone(replicas.choose())
+        self.assertIsNone(Replicas([]).choose())
+
+    def test_reads_from_replicas(self) -> None:
+        """Read-only commands go to replicas, and everything else doesn't"""
+        client = reqless.Client(replicas=["redis://localhost:6379/3"])
+        jid = client.queues["foo"].put("reqless_test.common.NoopJob", "{}")
+        self.assertEqual(client.queues.counts, [])
+        self.assertIsNone(client.jobs[jid])
+        job = client.queues["foo"].pop()
+        assert job is not None and not isinstance(job, list)
+        self.assertEqual(job.jid, jid)
+
+    def test_falls_back_to_primary(self) -> None:
+        """Reads go to the primary when replicas are unreachable"""
+        client = reqless.Client(replicas=["redis://localhost:1"])
+        client.queues["foo"].put("reqless_test.common.NoopJob", "{}")
+        self.assertEqual(len(client.queues.counts), 1)
+        self.assertIsNone(client._replicas.choose())
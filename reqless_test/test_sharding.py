@@ -0,0 +1,327 @@
+"""Tests for sharding queues across servers"""
+
+import time
+from typing import Any, List
+from unittest.mock import patch
+
+from redis import Redis
+
+import reqless
+from reqless.abstract import AbstractJob
+from reqless.exceptions import CrossShardError
+from reqless.queue_resolvers.dynamic_mapping_queue_identifiers_transformer import (
+    DynamicMappingQueueIdentifiersTransformer,
+)
+from reqless.sharding import HashRing, ShardedClient
+from reqless.workers.base_worker import BaseWorker
+from reqless_test.common import TestReqless
+from reqless_test.test_helpers import wait_for_condition
+
+
+class RecordingWorker(BaseWorker):
+    """A worker that records the jobs it's told to halt"""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.halted: List[str] = []
+
+    def halt_job_processing(self, jid: str) -> None:
+        self.halted.append(jid)
+
+
+class TestHashRing(TestReqless):
+    """Test the consistent-hash ring"""
+
+    def test_basic(self) -> None:
+        """Keys map to nodes consistently and spread across them"""
+        ring = HashRing(["a", "b", "c"])
+        owners = [ring["queue-%i" % i] for i in range(300)]
+        self.assertEqual(owners, [ring["queue-%i" % i] for i in range(300)])
+        self.assertEqual(set(owners), {"a", "b", "c"})
+
+    def test_adding_nodes(self) -> None:
+        """Adding a node only moves keys to the new node"""
+        before = HashRing(["a", "b", "c"])
+        after = HashRing(["a", "b", "c", "d"])
+        for i in range(300):
+            key = "queue-%i" % i
+            if before[key] != after[key]:
+                self.assertEqual(after[key], "d")
+
+    def test_empty(self) -> None:
+        """A ring needs nodes"""
+        self.assertRaises(ValueError, HashRing, [])
+
+
+class TestShardedClient(TestReqless):
+    """Test the sharded client"""
+
+    def setUp(self) -> None:
+        TestReqless.setUp(self)
+        self.shard_databases = [Redis(db=1), Redis(db=2)]
+        for database in self.shard_databases:
+            assert not database.keys("*")
+        self.urls = {"a": "redis://localhost:6379/1", "b": "redis://localhost:6379/2"}
+        self.sharded = ShardedClient(
+            self.urls,
+            hostname="worker",
+            pinned={"pinned-a": "a", "pinned-b": "b"},
+        )
+        # Queue names that we know land on each shard
+        self.names = {"a": self.queue_on("a"), "b": self.queue_on("b")}
+
+    def tearDown(self) -> None:
+        for database in self.shard_databases:
+            database.flushdb()
+        TestReqless.tearDown(self)
+
+    def queue_on(self, shard_name: str) -> List[str]:
+        return [
+            name
+            for name in ("queue-%i" % i for i in range(100))
+            if self.sharded.shard_name_for_queue(name) == shard_name
+        ][:2]
+
+    def put(self, queue_name: str, **kwargs: Any) -> str:
+        return self.sharded.queues[queue_name].put(
+            "reqless_test.common.NoopJob", "{}", **kwargs
+        )
+
+    def test_invalid_configuration(self) -> None:
+        """Shards and pins must make sense"""
+        self.assertRaises(ValueError, ShardedClient, {})
+        self.assertRaises(ValueError, ShardedClient, {"a:b": "redis://localhost"})
+        self.assertRaises(
+            ValueError, ShardedClient, {"a": "redis://localhost"}, pinned={"foo": "b"}
+        )
+
+    def test_queues_live_on_their_shard(self) -> None:
+        """Jobs are put on the shard that owns the queue, or it's pinned to"""
+        jid = self.put(self.names["a"][0])
+        self.assertTrue(jid.startswith("a:"))
+        self.assertTrue(self.shard_databases[0].exists("ql:j:" + jid))
+        self.assertFalse(self.shard_databases[1].exists("ql:j:" + jid))
+        self.assertTrue(self.put("pinned-b").startswith("b:"))
+        self.assertEqual(self.sharded.shard_name_for_queue("pinned-a"), "a")
+
+    def test_jobs_by_jid(self) -> None:
+        """Jobs are looked up on the shard named in their jid"""
+        jid_a = self.put(self.names["a"][0])
+        jid_b = self.put(self.names["b"][0])
+        unrouted = self.put(self.names["b"][0], jid="unrouted")
+        job = self.sharded.jobs[jid_b]
+        assert job is not None
+        self.assertEqual(job.jid, jid_b)
+        self.assertIsNone(self.sharded.jobs["a:missing"])
+        self.assertIsNotNone(self.sharded.jobs[unrouted])
+        jobs = self.sharded.jobs.get(jid_b, unrouted, jid_a, "missing")
+        self.assertEqual([job.jid for job in jobs], [jid_b, unrouted, jid_a])
+
+    def test_recurring_jobs(self) -> None:
+        """Jobs spawned by recurring jobs are on the same shard"""
+        queue = self.sharded.queues[self.names["b"][0]]
+        jid = queue.recur("reqless_test.common.NoopJob", "{}", 60)
+        self.assertTrue(jid.startswith("b:"))
+        job = queue.pop()
+        assert isinstance(job, AbstractJob)
+        self.assertTrue(job.jid.startswith("b:"))
+        self.assertIsNotNone(self.sharded.jobs[job.jid])
+
+    def test_pop(self) -> None:
+        """Pops from queues on several shards, in the order given"""
+        queue_names = [self.names["b"][0], self.names["a"][0], self.names["b"][1]]
+        for queue_name in queue_names:
+            self.put(queue_name)
+        jobs = self.sharded.queues.pop(queue_names, 2)
+        self.assertEqual([job.queue_name for job in jobs], queue_names[:2])
+        jobs = self.sharded.queues.pop(queue_names, 2)
+        self.assertEqual([job.queue_name for job in jobs], queue_names[2:])
+
+    def test_heartbeat(self) -> None:
+        """Renews locks on every shard"""
+        jids = [self.put(self.names["a"][0]), self.put(self.names["b"][0])]
+        self.sharded.queues.pop([self.names["a"][0], self.names["b"][0]], 2)
+        self.assertEqual(set(self.sharded.jobs.heartbeat(*jids)), set(jids))
+
+    def test_counts(self) -> None:
+        """Queue and worker counts are merged across shards"""
+        self.put(self.names["a"][0])
+        self.put(self.names["b"][0])
+        counts = self.sharded.queues.counts
+        self.assertEqual(
+            [count["name"] for count in counts],
+            sorted([self.names["a"][0], self.names["b"][0]]),
+        )
+        self.sharded.queues.pop([self.names["a"][0], self.names["b"][0]], 2)
+        self.assertEqual(
+            self.sharded.workers.counts, [{"name": "worker", "jobs": 2, "stalled": 0}]
+        )
+        self.assertEqual(len(self.sharded.workers["worker"]["jobs"]), 2)
+
+    def test_names_and_counts_page(self) -> None:
+        """Queue names are merged, and counts can be paged across shards"""
+        queues = self.names["a"][:2] + self.names["b"][:2]
+        for name in queues:
+            self.put(name)
+        self.assertEqual(self.sharded.queues.names, sorted(queues))
+        cursor, counts = self.sharded.queues.counts_page(0, 3)
+        self.assertNotEqual(cursor, 0)
+        cursor, rest = self.sharded.queues.counts_page(cursor, 3)
+        self.assertEqual(cursor, 0)
+        self.assertEqual(
+            sorted(count["name"] for count in counts + rest), sorted(queues)
+        )
+        # A page at a time, with each page only reading from its shards
+        names: List[str] = []
+        cursor = 0
+        while True:
+            cursor, counts = self.sharded.queues.counts_page(cursor, 1)
+            names.extend(count["name"] for count in counts)
+            if not cursor:
+                break
+        self.assertEqual(sorted(names), sorted(queues))
+
+    def test_tagged_and_failed(self) -> None:
+        """Tagged and failed jobs are gathered from all shards"""
+        jids = [
+            self.sharded.queues[queue_name].put(
+                "reqless_test.common.NoopJob", "{}", tags=["foo"]
+            )
+            for queue_name in (self.names["a"][0], self.names["b"][0])
+        ]
+        tagged = self.sharded.jobs.tagged("foo")
+        self.assertEqual(tagged["total"], 2)
+        self.assertEqual(set(tagged["jobs"]), set(jids))
+        self.assertEqual(len(self.sharded.jobs.tagged("foo", 1, 5)["jobs"]), 1)
+        for job in self.sharded.queues.pop([self.names["a"][0], self.names["b"][0]], 2):
+            job.fail("group", "message")
+        self.assertEqual(self.sharded.jobs.failed(), {"group": 2})
+        failed = self.sharded.jobs.failed("group")
+        self.assertEqual(failed["total"], 2)
+        self.assertEqual({job.jid for job in failed["jobs"]}, set(jids))
+
+    def test_listings_in_time_order(self) -> None:
+        """Paginated listings are merged across shards by time"""
+        queue_names = [self.names["b"][0], self.names["a"][0], self.names["b"][1]]
+        jids = [self.put(queue_name, tags=["foo"]) for queue_name in queue_names]
+        self.assertEqual(self.sharded.jobs.tagged("foo")["jobs"], jids)
+        self.assertEqual(self.sharded.jobs.tagged("foo", 1, 1)["jobs"], jids[1:2])
+        for queue_name in queue_names:
+            job = self.sharded.queues[queue_name].pop()
+            assert isinstance(job, AbstractJob)
+            job.complete()
+        self.assertEqual(self.sharded.jobs.complete(), jids[::-1])
+        self.assertEqual(self.sharded.jobs.complete(1, 1), jids[1:2])
+        for queue_name in queue_names:
+            self.put(queue_name, tags=["bar"])
+        # Failures are only timed to the second
+        for index, queue_name in enumerate(queue_names):
+            job = self.sharded.queues[queue_name].pop()
+            assert isinstance(job, AbstractJob)
+            with patch("time.time", return_value=time.time() + 10 * index):
+                job.fail("group", "message")
+        failed = self.sharded.jobs.failed("group")
+        self.assertEqual(failed["total"], 3)
+        self.assertEqual([job.queue_name for job in failed["jobs"]], queue_names[::-1])
+        self.assertEqual(
+            [job.queue_name for job in self.sharded.jobs.failed("group", 1, 1)["jobs"]],
+            queue_names[1:2],
+        )
+
+    def test_config(self) -> None:
+        """Config is written to every shard"""
+        self.sharded.config["heartbeat"] = 10
+        for shard in self.sharded.shards.values():
+            self.assertEqual(shard.config["heartbeat"], 10)
+        del self.sharded.config["heartbeat"]
+        for shard in self.sharded.shards.values():
+            self.assertEqual(shard.config["heartbeat"], 60)
+
+    def test_worker_name(self) -> None:
+        """The worker name is shared by all shards"""
+        self.sharded.worker_name = "other"
+        for shard in self.sharded.shards.values():
+            self.assertEqual(shard.worker_name, "other")
+        renamed = self.sharded.with_worker_name("renamed")
+        self.assertEqual(self.sharded.worker_name, "other")
+        self.assertEqual(renamed.pinned, self.sharded.pinned)
+        for shard in renamed.shards.values():
+            self.assertEqual(shard.worker_name, "renamed")
+        self.assertTrue(renamed.queues["pinned-b"].put("Job", "{}").startswith("b:"))
+
+    def test_named_throttles(self) -> None:
+        """Named throttles limit jobs on every shard, each separately"""
+        throttle = self.sharded.throttles["lim"]
+        throttle.set_maximum(1)
+        for shard in self.sharded.shards.values():
+            self.assertEqual(shard.throttles["lim"].maximum(), 1)
+        self.assertEqual(throttle.maximum(), 1)
+        for shard_name in ("a", "b"):
+            for _ in range(3):
+                self.put(self.names[shard_name][0], throttles=["lim"])
+        queue_names = [self.names["a"][0], self.names["b"][0]]
+        popped = self.sharded.queues.pop(queue_names, 6)
+        self.assertEqual(len(popped), 2)
+        self.assertEqual(set(throttle.locks()), {job.jid for job in popped})
+        self.assertEqual(len(throttle.pending()), 4)
+        throttle.delete()
+        for shard in self.sharded.shards.values():
+            self.assertEqual(shard.throttles["lim"].maximum(), 0)
+
+    def test_queue_throttles(self) -> None:
+        """A queue's throttle lives on the queue's shard"""
+        queue = self.sharded.queues[self.names["b"][0]]
+        self.sharded.throttles["ql:q:" + queue.name].set_maximum(2)
+        self.assertEqual(queue.throttle.maximum(), 2)
+        self.assertEqual(
+            self.sharded.shards["a"].queues[queue.name].throttle.maximum(), 0
+        )
+
+    def test_cross_shard_moves(self) -> None:
+        """Moving a job to a queue on another shard is refused"""
+        self.put("pinned-a")
+        job = self.sharded.queues["pinned-a"].pop()
+        assert isinstance(job, AbstractJob)
+        self.assertRaises(CrossShardError, job.complete, "pinned-b")
+        self.assertRaises(CrossShardError, job.move, "pinned-b")
+        batch = self.sharded.shards["a"].batch()
+        batch("queue.put", "worker", "pinned-b", "jid", "klass", "{}", 0)
+        self.assertRaises(CrossShardError, batch.execute)
+        self.assertTrue(job.complete(self.names["a"][0]))
+        moved = self.sharded.jobs[job.jid]
+        assert moved is not None
+        self.assertEqual(moved.queue_name, self.names["a"][0])
+
+    def test_client_interface(self) -> None:
+        """The sharded client can be used like a client by queue resolvers"""
+        self.assertIsNone(self.sharded.cache)
+        self.assertFalse(self.sharded.uses_functions)
+        with self.sharded.batch() as batch:
+            future = batch("queues.names")
+        self.assertEqual(self.sharded.codec.loads(future.result()), [])
+        self.sharded.queue_patterns.set_queue_identifier_patterns(
+            {"everything": ["queue-*"]}
+        )
+        self.put(self.names["a"][0])
+        self.put(self.names["b"][0])
+        transformer = DynamicMappingQueueIdentifiersTransformer(self.sharded)
+        self.assertEqual(
+            sorted(transformer.transform(["@everything"])),
+            sorted([self.names["a"][0], self.names["b"][0]]),
+        )
+
+    def test_worker_listens_on_every_shard(self) -> None:
+        """Workers hear about lost locks on jobs on any shard"""
+        queue_names = [self.names["a"][0], self.names["b"][0]]
+        jids = [self.put(queue_name) for queue_name in queue_names]
+        worker = RecordingWorker(queue_names, self.sharded)
+        self.sharded.queues.pop(queue_names, 2)
+        with worker.listener():
+            self.assertEqual(len(worker._listeners), 2)
+            # Another worker taking each job tells this one it lost the lock
+            for shard_name, jid, queue_name in zip("ab", jids, queue_names):
+                other = reqless.Client(self.urls[shard_name], hostname="other")
+                other.queues[queue_name].put(
+                    "reqless_test.common.NoopJob", "{}", jid=jid
+                )
+            wait_for_condition(lambda: set(worker.halted) == set(jids))
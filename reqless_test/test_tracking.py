@@ -0,0 +1,112 @@
+"""Tests for caching reads on the client"""
+
+import pkgutil
+import re
+
+import reqless
+from reqless.queue_resolvers import DynamicMappingQueueIdentifiersTransformer
+from reqless.tracking import CACHEABLE_COMMANDS, INVALIDATING_COMMANDS, TrackingCache
+from reqless_test.common import TestReqless
+from reqless_test.test_helpers import wait_for_condition
+
+
+class TestTracking(TestReqless):
+    """Test the client-side cache"""
+
+    def setUp(self) -> None:
+        TestReqless.setUp(self)
+        self.cached = reqless.Client(hostname="cached", cache_size=4)
+        assert self.cached.cache is not None
+        self.cache: TrackingCache = self.cached.cache
+
+    def test_commands_exist(self) -> None:
+        """Every cached and invalidating command is part of the API"""
+        script = pkgutil.get_data("reqless", "lua/reqless.lua")
+        assert script is not None
+        commands = set(
+            re.findall(r"^ReqlessAPI\[[\"']([^\"']+)[\"']\]", script.decode(), re.M)
+        )
+        self.assertEqual(set(CACHEABLE_COMMANDS) - commands, set())
+        self.assertEqual(INVALIDATING_COMMANDS - commands, set())
+
+    def test_disabled(self) -> None:
+        """There's no cache by default"""
+        self.assertIsNone(self.client.cache)
+
+    def test_hits(self) -> None:
+        """Repeated reads are served from the cache"""
+        self.assertEqual(self.cached.config["heartbeat"], 60)
+        self.assertEqual(self.cached.config["heartbeat"], 60)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_invalidated(self) -> None:
+        """Changes by anyone, even outside of reqless, drop cached reads"""
+        self.assertEqual(self.cached.config["heartbeat"], 60)
+        self.database.hset("ql:config", "heartbeat", 10)
+        wait_for_condition(lambda: self.cached.config["heartbeat"] == 10)
+
+    def test_own_writes(self) -> None:
+        """Writes through the caching client are seen right away"""
+        self.assertEqual(self.cached.config["foo"], None)
+        self.cached.config["foo"] = 5
+        self.assertEqual(self.cached.config["foo"], 5)
+
+    def test_flush(self) -> None:
+        """Flushing the database drops everything"""
+        self.cached.config["foo"] = 5
+        self.assertEqual(self.cached.config["foo"], 5)
+        self.database.flushdb()
+        wait_for_condition(lambda: len(self.cache) == 0)
+
+    def test_lru(self) -> None:
+        """The least recently used entries are evicted"""
+        throttles = [self.cached.throttles["throttle-%d" % i] for i in range(5)]
+        for throttle in throttles:
+            throttle.maximum()
+        self.assertEqual(len(self.cache), 4)
+        throttles[0].maximum()
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 6))
+        throttles[4].maximum()
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_expiring_throttle(self) -> None:
+        """Throttles counting down to expiring aren't cached"""
+        throttle = self.cached.throttles["expiring"]
+        throttle.set_maximum(5, expiration=100)
+        self.assertEqual(throttle.maximum(), 5)
+        self.assertEqual(len(self.cache), 0)
+        self.assertGreater(throttle.ttl(), 0)
+
+    def test_throttle_locks_not_tracked(self) -> None:
+        """Taking and releasing throttle locks doesn't invalidate anything"""
+        throttle = self.cached.throttles["tracked"]
+        throttle.set_maximum(1)
+        self.assertEqual(throttle.maximum(), 1)
+        self.database.zadd("ql:th:tracked-locks", {"jid": 1})
+        self.database.zadd("ql:th:tracked-pending", {"other": 1})
+        self.database.hset("ql:config", "heartbeat", 10)
+        wait_for_condition(lambda: self.cached.config["heartbeat"] == 10)
+        hits = self.cache.hits
+        self.assertEqual(throttle.maximum(), 1)
+        self.assertEqual(self.cache.hits, hits + 1)
+        self.client.throttles["tracked"].set_maximum(2)
+        wait_for_condition(lambda: throttle.maximum() == 2)
+
+    def test_recurring(self) -> None:
+        """Recurring jobs are invalidated when updated"""
+        jid = self.cached.queues["foo"].recur("reqless.Job", "{}", interval=60)
+        job = self.cached.jobs[jid]
+        assert isinstance(job, reqless.RecurringJob)
+        job.priority = 5
+        job = self.cached.jobs[jid]
+        assert isinstance(job, reqless.RecurringJob)
+        self.assertEqual(job.priority, 5)
+
+    def test_dynamic_mapping(self) -> None:
+        """Queue identifiers are read through the cache instead of a ttl"""
+        subject = DynamicMappingQueueIdentifiersTransformer(client=self.cached)
+        self.assertEqual(subject._get_dynamic_queue_mapping(), {"default": ["*"]})
+        self.client.queue_patterns.set_queue_identifier_patterns({"default": ["a"]})
+        wait_for_condition(
+            lambda: subject._get_dynamic_queue_mapping() == {"default": ["a"]}
+        )
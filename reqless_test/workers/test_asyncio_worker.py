@@ -0,0 +1,140 @@
+"""Test the asyncio worker"""
+
+import asyncio
+import json
+from threading import Thread
+from typing import Any, List, Optional
+
+import reqless
+from reqless.abstract import AbstractJob, AbstractQueue
+from reqless.job import Job
+from reqless.workers.asyncio_worker import AsyncioWorker
+from reqless_test.common import TestReqless
+from reqless_test.test_helpers import wait_for_condition
+
+
+class AsyncioJob:
+    """Dummy class"""
+
+    running: int = 0
+    max_running: int = 0
+
+    @staticmethod
+    async def foo(job: Any) -> None:
+        """Dummy job that records its sandbox and how many ran at once"""
+        AsyncioJob.running += 1
+        AsyncioJob.max_running = max(AsyncioJob.max_running, AsyncioJob.running)
+        await asyncio.sleep(0.1)
+        AsyncioJob.running -= 1
+        data_dict = json.loads(job.data)
+        data_dict["sandbox"] = job.sandbox
+        job.data = json.dumps(data_dict)
+        await job.complete()
+
+
+class SleepingJob:
+    """Dummy class"""
+
+    @staticmethod
+    async def foo(job: Any) -> None:
+        """Dummy job that never finishes on its own"""
+        await asyncio.sleep(60)
+
+
+class TestAsyncioWorker(TestReqless):
+    """Test the worker"""
+
+    def setUp(self) -> None:
+        TestReqless.setUp(self)
+        AsyncioJob.running = AsyncioJob.max_running = 0
+        self.worker = AsyncioWorker(["foo"], self.client, interval=0.1, concurrency=2)
+        self.queue: AbstractQueue = self.client.queues["foo"]
+        self.thread: Optional[Thread] = None
+
+    def tearDown(self) -> None:
+        if self.thread:
+            self.worker.stop()
+            for jid in list(self.worker.tasks):
+                self.worker.halt_job_processing(jid)
+            self.thread.join()
+        TestReqless.tearDown(self)
+
+    def start(self) -> None:
+        self.thread = Thread(target=lambda: asyncio.run(self.worker.run_async()))
+        self.thread.start()
+
+    def states(self, jids: List[str]) -> List[str]:
+        states = []
+        for jid in jids:
+            job = self.client.jobs[jid]
+            assert job is not None and isinstance(job, AbstractJob)
+            states.append(job.state)
+        return states
+
+    def test_create_aio_client(self) -> None:
+        """The asyncio client connects the same way as the synchronous one"""
+        client = reqless.Client(
+            "redis://localhost:6379/3", hostname="other", codec="json", socket_timeout=5
+        )
+        aio_client = AsyncioWorker(["foo"], client).create_aio_client()
+        kwargs = aio_client.database.connection_pool.connection_kwargs
+        self.assertEqual((kwargs["db"], kwargs["socket_timeout"]), (3, 5))
+        self.assertIs(aio_client.codec, client.codec)
+        self.assertEqual(aio_client.worker_name, "other")
+        client = reqless.Client("rediss://localhost:6379")
+        aio_client = AsyncioWorker(["foo"], client).create_aio_client()
+        pool = aio_client.database.connection_pool
+        self.assertEqual(pool.connection_class.__name__, "SSLConnection")
+
+    def test_basic(self) -> None:
+        """Completes jobs concurrently, up to the concurrency limit"""
+        jids = [self.queue.put(AsyncioJob, "{}") for _ in range(5)]
+        self.start()
+        wait_for_condition(lambda: self.states(jids) == ["complete"] * 5)
+        self.assertEqual(AsyncioJob.max_running, 2)
+        for jid in jids:
+            job = self.client.jobs[jid]
+            assert job is not None
+            self.assertIn("reqless-py-workers/task-", json.loads(job.data)["sandbox"])
+
+    def test_halt_job_processing(self) -> None:
+        """Cancels the task processing a job when its lock is lost"""
+        jid = self.queue.put(SleepingJob, "{}")
+        self.start()
+        wait_for_condition(lambda: jid in self.worker.tasks)
+        task = self.worker.tasks[jid]
+        # Another worker moving the job notifies this worker that it no longer
+        # owns it
+        other = reqless.Client(hostname="other")
+        other.queues["bar"].put(SleepingJob, "{}", jid=jid)
+        wait_for_condition(lambda: task.done())
+        self.assertTrue(task.cancelled())
+        self.assertNotIn(jid, self.worker.tasks)
+
+    def test_halt_job_processing_dead(self) -> None:
+        """Does not panic if the task handling a job is no longer around"""
+        # This test succeeds if it finishes without an exception
+        self.worker.halt_job_processing("foo")
+
+    def test_heartbeats_in_background(self) -> None:
+        """Jobs are heartbeated while they're processed"""
+        self.client.config["heartbeat"] = 2
+        jid = self.queue.put(SleepingJob, "{}")
+        self.start()
+        wait_for_condition(lambda: jid in self.worker.tasks)
+        expires_at = self.expires_at(jid)
+        wait_for_condition(lambda: self.expires_at(jid) > expires_at)
+
+    def test_resume(self) -> None:
+        """Resumes jobs this worker had been working on"""
+        jid = self.queue.put(AsyncioJob, "{}")
+        job = self.queue.pop()
+        assert job is not None and isinstance(job, AbstractJob)
+        self.worker = AsyncioWorker(["foo"], self.client, interval=0.1, resume=True)
+        self.start()
+        wait_for_condition(lambda: self.states([jid]) == ["complete"])
+
+    def expires_at(self, jid: str) -> float:
+        job = self.client.jobs[jid]
+        assert isinstance(job, Job)
+        return job.expires_at
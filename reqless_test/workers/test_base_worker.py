@@ -1,5 +1,7 @@
 """Test worker"""
 
+import time
+from threading import Thread
 from typing import List
 
 import reqless
@@ -9,6 +11,7 @@ from reqless.queue_resolvers.transforming_queue_resolver import (
 )
 from reqless.workers.base_worker import BaseWorker
 from reqless_test.common import TestReqless
+from reqless_test.test_helpers import wait_for_condition
 
 
 class TestBaseWorker(TestReqless):
@@ -76,6 +79,197 @@ class TestBaseWorker(TestReqless):
         self.assertEqual(queue_resolver, worker.queue_resolver)
         self.assertEqual(queue_names, worker.queue_resolver.resolve())
 
+    def popped_queue_names(self, worker: BaseWorker, count: int) -> List[str]:
+        jobs = worker.jobs()
+        queue_names = []
+        for _ in range(count):
+            job = next(jobs)
+            assert job is not None
+            queue_names.append(job.queue_name)
+        self.assertIsNone(next(jobs))
+        return queue_names
+
+    def test_jobs_rotate_queues(self) -> None:
+        """The queue popped from first rotates, so busy queues can't starve
+        the ones after them"""
+        for queue_name in ["foo", "foo", "bar"]:
+            self.client.queues[queue_name].put("reqless_test.common.NoopJob", "{}")
+        worker = BaseWorker(["foo", "bar"], self.client)
+        self.assertEqual(self.popped_queue_names(worker, 3), ["foo", "bar", "foo"])
+
+    def test_jobs_in_strict_queue_order(self) -> None:
+        """With strict priority, jobs are popped from earlier queues first"""
+        for queue_name in ["bar", "foo", "foo"]:
+            self.client.queues[queue_name].put("reqless_test.common.NoopJob", "{}")
+        worker = BaseWorker(["foo", "bar"], self.client, strict_priority=True)
+        self.assertEqual(self.popped_queue_names(worker, 3), ["foo", "foo", "bar"])
+
+    def test_lite_jobs(self) -> None:
+        """Lite workers pop jobs without their history"""
+        self.client.queues["foo"].put("reqless_test.common.NoopJob", "{}")
+        job = next(BaseWorker(["foo"], self.client, lite=True).jobs())
+        assert isinstance(job, reqless.Job)
+        with self.assertRaises(KeyError):
+            job.history
+        self.assertEqual(job.worker_name, "worker")
+
+    def test_prefetch_starts_with_one_job(self) -> None:
+        """Without observations, prefetching pops a single job at a time"""
+        queue = self.client.queues["foo"]
+        for _ in range(5):
+            queue.put("reqless_test.common.NoopJob", "{}")
+        worker = BaseWorker(["foo"], self.client, prefetch=10)
+        job = next(worker.jobs())
+        assert job is not None
+        self.assertEqual(len(queue.jobs.running()), 1)
+
+    def test_prefetch_count(self) -> None:
+        """Batches are sized to start within half the lock duration"""
+        worker = BaseWorker(["foo"], self.client, prefetch=10)
+        worker.lock_duration = 60
+        worker.observe_job_interval(10)
+        self.assertEqual(worker.prefetch_count(), 3)
+        worker.observe_job_interval(0)
+        worker.observe_job_interval(0)
+        self.assertEqual(worker.prefetch_count(), 4)
+        worker.job_interval = 0.001
+        self.assertEqual(worker.prefetch_count(), 10)
+
+    def test_prefetch_pops_batches(self) -> None:
+        """Once fast jobs have been observed, several jobs are popped at once"""
+        queue = self.client.queues["foo"]
+        jids = [queue.put("reqless_test.common.NoopJob", "{}") for _ in range(5)]
+        worker = BaseWorker(["foo"], self.client, prefetch=3)
+        worker.lock_duration = 60
+        worker.job_interval = 0.001
+        jobs = worker.jobs()
+        job = next(jobs)
+        assert job is not None
+        self.assertEqual(job.jid, jids[0])
+        self.assertEqual(len(queue.jobs.running()), 3)
+        handed_out = [job.jid] + [
+            job.jid for job in (next(jobs) for _ in range(4)) if job is not None
+        ]
+        self.assertEqual(handed_out, jids)
+        self.assertIsNone(next(jobs))
+
+    def test_prefetch_returns_unstarted_jobs(self) -> None:
+        """Prefetched jobs that were never handed out are put back"""
+        queue = self.client.queues["foo"]
+        jids = [queue.put("reqless_test.common.NoopJob", "{}") for _ in range(3)]
+        worker = BaseWorker(["foo"], self.client, prefetch=3)
+        worker.lock_duration = 60
+        worker.job_interval = 0.001
+        jobs = worker.jobs()
+        next(jobs)
+        jobs.close()
+        self.assertEqual(queue.jobs.running(), [jids[0]])
+        self.assertEqual(queue.counts["waiting"], 2)
+
+    def test_prefetch_refreshes_stale_locks(self) -> None:
+        """Prefetched jobs are heartbeated if their locks are running out"""
+        queue = self.client.queues["foo"]
+        for _ in range(2):
+            queue.put("reqless_test.common.NoopJob", "{}")
+        worker = BaseWorker(["foo"], self.client, prefetch=2)
+        worker.lock_duration = 60
+        worker.job_interval = 0.001
+        jobs = worker.jobs()
+        next(jobs)
+        # Pretend the remaining job's lock was much longer than it was
+        worker.lock_duration = 1000
+        job = next(jobs)
+        assert job is not None
+        self.assertGreater(job.ttl, 59)
+
+    def test_prefetch_drops_lost_jobs(self) -> None:
+        """Prefetched jobs whose locks were lost aren't handed out"""
+        queue = self.client.queues["foo"]
+        jids = [queue.put("reqless_test.common.NoopJob", "{}") for _ in range(2)]
+        worker = BaseWorker(["foo"], self.client, prefetch=2)
+        worker.lock_duration = 60
+        worker.job_interval = 0.001
+        jobs = worker.jobs()
+        next(jobs)
+        job = self.client.jobs[jids[1]]
+        assert job is not None and isinstance(job, AbstractJob)
+        job.timeout()
+        worker.lock_duration = 1000
+        # The timed out job is back in the queue, so it's popped again
+        job = next(jobs)
+        assert job is not None
+        self.assertEqual(job.jid, jids[1])
+
+    def test_prefetch_heartbeats_buffered_jobs(self) -> None:
+        """Prefetched jobs are heartbeated while they wait to be handed out,
+        and dropped if their locks are lost"""
+        self.client.config["heartbeat"] = 1
+        queue = self.client.queues["foo"]
+        jids = [queue.put("reqless_test.common.NoopJob", "{}") for _ in range(3)]
+        worker = BaseWorker(["foo"], self.client, prefetch=3)
+        worker.job_interval = 0.001
+        worker.lock_duration = 60
+        with worker.heartbeater():
+            jobs = worker.jobs()
+            next(jobs)
+            time.sleep(1.5)
+            for jid in jids[1:]:
+                job = self.client.jobs[jid]
+                assert isinstance(job, AbstractJob)
+                self.assertEqual(job.state, "running")
+                self.assertGreater(job.ttl, 0)
+            worker.job_lost(jids[1])
+            job = next(jobs)
+            assert job is not None
+            self.assertEqual(job.jid, jids[2])
+            jobs.close()
+
+    def test_wait_for_work(self) -> None:
+        """Sleeps for the interval unless waking on put"""
+        worker = BaseWorker(["foo"], self.client, interval=0.2)
+        before = time.time()
+        worker.wait_for_work()
+        self.assertGreater(time.time() - before, 0.2)
+
+    def test_wake_on_put(self) -> None:
+        """Wakes up as soon as a job is put in one of its queues"""
+        worker = BaseWorker(["foo"], self.client, interval=10, wake_on_put=True)
+        with worker.listener():
+            thread = Thread(target=worker.wait_for_work)
+            before = time.time()
+            thread.start()
+            self.client.queues["foo"].put("reqless_test.common.NoopJob", "{}")
+            thread.join()
+        self.assertLess(time.time() - before, 5)
+
+    def test_wake_on_put_resubscribes(self) -> None:
+        """Listens for puts to the queues it resolves as they change"""
+        worker = BaseWorker(["foo"], self.client, interval=10, wake_on_put=True)
+        with worker.listener():
+            worker.listen_for_puts(["bar"])
+            self.client.queues.wake_on_put(10, "bar")
+            # The listener thread subscribes shortly after
+            wait_for_condition(
+                lambda: self.database.pubsub_numsub("ql:available:bar")[0][1] == 1
+            )
+            thread = Thread(target=worker.wakeup.wait, args=(10,))
+            before = time.time()
+            thread.start()
+            self.client.queues["bar"].put("reqless_test.common.NoopJob", "{}")
+            thread.join()
+        self.assertLess(time.time() - before, 5)
+        self.assertEqual(worker._available, ["bar"])
+
+    def test_wake_when_due(self) -> None:
+        """Wakes up when a job in one of its queues comes due"""
+        worker = BaseWorker(["foo"], self.client, interval=10, wake_on_put=True)
+        self.client.queues["foo"].put("reqless_test.common.NoopJob", "{}", delay=1)
+        with worker.listener():
+            before = time.time()
+            worker.wait_for_work()
+        self.assertLess(time.time() - before, 5)
+        self.assertIsNotNone(worker.client.queues["foo"].pop())
+
     def pop_one(self, client: AbstractClient, queue_name: str) -> AbstractJob:
         job = client.queues[queue_name].pop()
         assert job is not None and not isinstance(job, List)
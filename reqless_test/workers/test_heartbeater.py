@@ -0,0 +1,129 @@
+"""Test the background heartbeater"""
+
+import time
+from typing import List
+
+import reqless
+from reqless.abstract import AbstractJob
+from reqless.job import Job
+from reqless.workers.heartbeater import Heartbeater
+from reqless.workers.serial_worker import SerialWorker
+from reqless_test.common import TestReqless
+from reqless_test.test_helpers import wait_for_condition
+
+
+class TestHeartbeater(TestReqless):
+    """Test the heartbeater"""
+
+    def setUp(self) -> None:
+        TestReqless.setUp(self)
+        self.lost: List[str] = []
+        self.heartbeater = Heartbeater(self.client, self.lost.append)
+        self.queue = self.client.queues["foo"]
+
+    def tearDown(self) -> None:
+        self.heartbeater.stop()
+        TestReqless.tearDown(self)
+
+    def pop(self) -> Job:
+        job = self.queue.pop()
+        assert isinstance(job, Job)
+        return job
+
+    def expires_at(self, jid: str) -> float:
+        job = self.client.jobs[jid]
+        assert isinstance(job, Job)
+        return job.expires_at
+
+    def test_interval(self) -> None:
+        """Beats at a fraction of the shortest lock duration"""
+        self.assertEqual(self.heartbeater.interval, self.heartbeater.idle_interval)
+        self.client.config["heartbeat"] = 30
+        self.queue.put("Foo", "{}")
+        job = self.pop()
+        self.heartbeater.add(job)
+        self.assertAlmostEqual(self.heartbeater.interval, 10, delta=0.1)
+        self.heartbeater.remove(job.jid)
+        self.assertEqual(self.heartbeater.interval, self.heartbeater.idle_interval)
+
+    def test_beat(self) -> None:
+        """Renews the locks on all registered jobs in one go"""
+        jids = [self.queue.put("Foo", "{}") for _ in range(3)]
+        jobs = [self.pop() for _ in jids]
+        before = {jid: self.expires_at(jid) for jid in jids}
+        for job in jobs:
+            self.heartbeater.add(job)
+        time.sleep(0.01)
+        self.heartbeater.beat()
+        for jid in jids:
+            self.assertGreater(self.expires_at(jid), before[jid])
+        self.assertEqual(self.lost, [])
+
+    def test_lost(self) -> None:
+        """Reports and forgets jobs whose locks it couldn't renew"""
+        jid = self.queue.put("Foo", "{}")
+        self.heartbeater.add(self.pop())
+        other = reqless.Client(hostname="other")
+        other.queues["bar"].put("Foo", "{}", jid=jid)
+        self.heartbeater.beat()
+        self.assertEqual(self.lost, [jid])
+        self.heartbeater.beat()
+        self.assertEqual(self.lost, [jid])
+
+    def test_max_lifetime(self) -> None:
+        """Stops renewing a job's lock once it has been registered too long"""
+        self.heartbeater.max_lifetime = 0
+        jid = self.queue.put("Foo", "{}")
+        job = self.pop()
+        self.heartbeater.add(job)
+        time.sleep(0.01)
+        self.heartbeater.beat()
+        self.assertEqual(self.expires_at(jid), job.expires_at)
+        self.assertEqual(self.heartbeater._durations, {})
+        self.assertEqual(self.lost, [])
+
+    def test_background(self) -> None:
+        """Heartbeats registered jobs in a thread"""
+        self.client.config["heartbeat"] = 2
+        jid = self.queue.put("Foo", "{}")
+        job = self.pop()
+        expires_at = job.expires_at
+        self.heartbeater.start()
+        self.heartbeater.add(job)
+        wait_for_condition(lambda: self.expires_at(jid) > expires_at)
+
+
+class TestWorkerHeartbeating(TestReqless):
+    """Test how workers use the heartbeater"""
+
+    def test_heartbeating(self) -> None:
+        """Jobs are registered with the heartbeater while being processed"""
+        worker = SerialWorker(["foo"], self.client)
+        self.client.queues["foo"].put("Foo", "{}")
+        job = self.client.queues["foo"].pop()
+        assert isinstance(job, AbstractJob)
+        with worker.heartbeater():
+            heartbeats = worker.heartbeats
+            assert heartbeats is not None
+            with worker.heartbeating(job):
+                self.assertEqual(list(heartbeats._durations), [job.jid])
+            self.assertEqual(list(heartbeats._durations), [])
+        self.assertIsNone(worker.heartbeats)
+
+    def test_disabled(self) -> None:
+        """Workers can be told not to heartbeat in the background"""
+        worker = SerialWorker(["foo"], self.client, auto_heartbeat=False)
+        with worker.heartbeater():
+            self.assertIsNone(worker.heartbeats)
+
+    def test_halts_lost_job(self) -> None:
+        """The serial worker flags a job it lost as halted"""
+        worker = SerialWorker(["foo"], self.client)
+        self.client.queues["foo"].put("Foo", "{}")
+        job = self.client.queues["foo"].pop()
+        assert isinstance(job, AbstractJob)
+        worker.job = job
+        worker.halt_job_processing("other")
+        self.assertFalse(job.halted)
+        worker.halt_job_processing(job.jid)
+        self.assertTrue(job.halted)
@@ -0,0 +1,95 @@
+"""Test the background liveness lease"""
+
+import os
+from typing import Any, Dict, Optional
+
+from reqless.workers.lease import Lease, process_name
+from reqless.workers.serial_worker import SerialWorker
+from reqless_test.common import TestReqless
+from reqless_test.test_helpers import wait_for_condition
+
+
+class TestLease(TestReqless):
+    """Test the lease"""
+
+    def setUp(self) -> None:
+        TestReqless.setUp(self)
+        # Workers are only reported once they've popped
+        self.client.queues["foo"].pop()
+
+    def worker(self) -> Optional[Dict[str, Any]]:
+        for worker in self.client.workers.counts:
+            if worker["name"] == self.client.worker_name:
+                found: Dict[str, Any] = worker
+                return found
+        return None
+
+    def alive(self) -> Optional[bool]:
+        worker = self.worker()
+        assert worker is not None
+        return worker.get("alive")
+
+    def test_alive(self) -> None:
+        """Workers with leases are reported as alive until they run out"""
+        worker = self.worker()
+        assert worker is not None
+        self.assertNotIn("alive", worker)
+        self.client.workers.lease(self.client.worker_name, 60)
+        self.assertEqual(self.worker(), dict(worker, alive=True))
+        self.client.workers.lease(self.client.worker_name, -1)
+        self.assertEqual(self.worker(), dict(worker, alive=False))
+        self.client.workers.unlease(self.client.worker_name)
+        self.assertEqual(self.worker(), worker)
+
+    def test_renews(self) -> None:
+        """The lease is renewed until stopped, and then given up"""
+        lease = Lease(self.client, 0.3)
+        lease.start()
+        try:
+            score = self.database.zscore("ql:workers:leases", self.client.worker_name)
+            assert score is not None
+            wait_for_condition(
+                lambda: self.database.zscore(
+                    "ql:workers:leases", self.client.worker_name
+                )
+                != score
+            )
+        finally:
+            lease.stop()
+        self.assertIsNone(
+            self.database.zscore("ql:workers:leases", self.client.worker_name)
+        )
+
+    def lease(self, worker_name: str) -> Optional[float]:
+        return self.database.zscore("ql:workers:leases", worker_name)
+
+    def test_process_name(self) -> None:
+        """Each process gets its own name, which is only added once"""
+        name = process_name("worker")
+        self.assertEqual(name, "worker-%d" % os.getpid())
+        self.assertEqual(process_name(name), name)
+
+    def test_worker(self) -> None:
+        """Workers take a lease of their process's own while listening when
+        asked to, with a client of their own"""
+        name = self.client.worker_name
+        worker = SerialWorker(["foo"], self.client, lease_ttl=60)
+        self.assertEqual(worker.client.worker_name, process_name(name))
+        self.assertEqual(self.client.worker_name, name)
+        with worker.listener():
+            self.assertIsNotNone(self.lease(process_name(name)))
+        self.assertIsNone(self.lease(process_name(name)))
+        worker = SerialWorker(["foo"], self.client)
+        self.assertIs(worker.client, self.client)
+        with worker.listener():
+            self.assertIsNone(self.alive())
+
+    def test_worker_resumes(self) -> None:
+        """Leased workers resume the jobs held under their process's name"""
+        jid = self.client.queues["foo"].put("reqless_test.common.NoopJob", "{}")
+        worker = SerialWorker(["foo"], self.client, lease_ttl=60)
+        job = next(worker.jobs())
+        assert job is not None
+        self.assertEqual(job.jid, jid)
+        worker = SerialWorker(["foo"], self.client, lease_ttl=60, resume=True)
+        self.assertEqual([job.jid for job in worker.resume], [jid])
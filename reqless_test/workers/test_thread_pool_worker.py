@@ -0,0 +1,98 @@
+"""Test the thread pool worker"""
+
+import json
+import threading
+import time
+from typing import Generator, List, Optional
+
+from reqless.abstract import AbstractJob, AbstractQueue
+from reqless.workers.thread_pool_worker import ThreadPoolWorker
+from reqless_test.common import TestReqless
+
+
+class ThreadPoolJob:
+    """Dummy class"""
+
+    lock = threading.Lock()
+    running: int = 0
+    max_running: int = 0
+
+    @staticmethod
+    def foo(job: AbstractJob) -> None:
+        """Dummy job that records its sandbox and how many ran at once"""
+        with ThreadPoolJob.lock:
+            ThreadPoolJob.running += 1
+            ThreadPoolJob.max_running = max(
+                ThreadPoolJob.max_running, ThreadPoolJob.running
+            )
+        time.sleep(0.1)
+        with ThreadPoolJob.lock:
+            ThreadPoolJob.running -= 1
+        data_dict = json.loads(job.data)
+        data_dict["sandbox"] = job.sandbox
+        job.data = json.dumps(data_dict)
+        job.complete()
+
+
+class PatchedThreadPoolWorker(ThreadPoolWorker):
+    """A worker that limits the number of jobs it runs"""
+
+    def jobs(self) -> Generator[Optional[AbstractJob], None, None]:
+        """Yield only a few jobs"""
+        generator = ThreadPoolWorker.jobs(self)
+        for _ in range(5):
+            yield next(generator)
+
+
+class TestThreadPoolWorker(TestReqless):
+    """Test the worker"""
+
+    def setUp(self) -> None:
+        TestReqless.setUp(self)
+        ThreadPoolJob.running = ThreadPoolJob.max_running = 0
+        self.worker = PatchedThreadPoolWorker(
+            ["foo"], self.client, threads=2, interval=0.2
+        )
+        self.queue: AbstractQueue = self.client.queues["foo"]
+
+    def states(self, jids: List[str]) -> List[str]:
+        states = []
+        for jid in jids:
+            job = self.client.jobs[jid]
+            assert job is not None and isinstance(job, AbstractJob)
+            states.append(job.state)
+        return states
+
+    def test_basic(self) -> None:
+        """Can complete jobs concurrently in a basic way"""
+        jids = [self.queue.put(ThreadPoolJob, "{}") for _ in range(5)]
+        self.worker.run()
+        self.assertEqual(self.states(jids), ["complete"] * 5)
+        self.assertEqual(ThreadPoolJob.max_running, 2)
+        for jid in jids:
+            job = self.client.jobs[jid]
+            assert job is not None
+            self.assertIn("reqless-py-workers/thread-", json.loads(job.data)["sandbox"])
+
+    def test_sleeps(self) -> None:
+        """Make sure the worker sleeps if there aren't jobs to be had"""
+        for _ in range(4):
+            self.queue.put(ThreadPoolJob, "{}")
+        before = time.time()
+        self.worker.run()
+        self.assertGreater(time.time() - before, 0.2)
+
+    def test_halt_job_processing(self) -> None:
+        """Flags the job as halted when it loses its lock"""
+        jid = self.queue.put(ThreadPoolJob, "{}")
+        job = self.queue.pop()
+        assert job is not None and isinstance(job, AbstractJob)
+        self.worker.jobs_in_progress[jid] = job
+        self.assertFalse(job.halted)
+        self.worker.halt_job_processing(jid)
+        self.assertTrue(job.halted)
+
+    def test_halt_job_processing_dead(self) -> None:
+        """Does not panic if the job is no longer being processed"""
+        # This test succeeds if it finishes without an exception
+        self.worker.halt_job_processing("foo")
@@ -0,0 +1,104 @@
+#! /usr/bin/env python
+
+"""Time resolving and prioritizing queue names with many queues and patterns.
+This doesn't need a server, since it calls the transformers' static methods
+directly."""
+
+import argparse
+import random
+import time
+from typing import Any, Callable, Dict, List
+
+from reqless.models import QueuePriorityPattern
+from reqless.queue_resolvers import (
+    DynamicMappingQueueIdentifiersTransformer,
+    DynamicPriorityQueueIdentifiersTransformer,
+)
+
+
+parser = argparse.ArgumentParser(
+    description="Benchmark resolving queue names against queue patterns."
+)
+parser.add_argument(
+    "--queues",
+    dest="numQueues",
+    default=10000,
+    type=int,
+    help="How many known queues there are",
+)
+parser.add_argument(
+    "--patterns",
+    dest="numPatterns",
+    default=200,
+    type=int,
+    help="How many patterns to resolve and prioritize them with",
+)
+parser.add_argument(
+    "--iterations",
+    dest="iterations",
+    default=20,
+    type=int,
+    help="How many times to resolve them with the same queues and patterns",
+)
+args = parser.parse_args()
+
+random.seed(0)
+groups = ["group-%d" % i for i in range(max(args.numPatterns // 4, 1))]
+known_queue_names: List[str] = [
+    "%s.queue-%d" % (random.choice(groups), i) for i in range(args.numQueues)
+]
+
+
+def make_pattern(index: int) -> str:
+    """A mix of exact names, prefixes, infixes and negations"""
+    group = random.choice(groups)
+    kind = index % 4
+    if kind == 0:
+        return random.choice(known_queue_names)
+    if kind == 1:
+        return group + ".*"
+    if kind == 2:
+        return group + ".queue-*" + str(random.randint(0, 9))
+    return "!" + group + ".queue-1*"
+
+
+patterns: List[str] = [make_pattern(i) for i in range(args.numPatterns)]
+mapping: Dict[str, List[str]] = {"default": patterns}
+priorities: List[QueuePriorityPattern] = [
+    QueuePriorityPattern(
+        patterns=patterns[i : i + 10], should_distribute_fairly=bool(i % 20)
+    )
+    for i in range(0, len(patterns), 10)
+] + [QueuePriorityPattern(patterns=["default"], should_distribute_fairly=True)]
+
+
+def timed(label: str, function: Callable[[], Any]) -> None:
+    started = time.perf_counter()
+    function()
+    first = time.perf_counter() - started
+    started = time.perf_counter()
+    for _ in range(args.iterations):
+        function()
+    repeated = (time.perf_counter() - started) / max(args.iterations, 1)
+    print(
+        "%-20s first %10.2f msec, then %10.2f msec"
+        % (label, first * 1000, repeated * 1000)
+    )
+
+
+print("%d queues, %d patterns:" % (args.numQueues, args.numPatterns))
+timed(
+    "resolve_queue_names",
+    lambda: DynamicMappingQueueIdentifiersTransformer.resolve_queue_names(
+        mapping, list(known_queue_names), ["@default"]
+    ),
+)
+resolved: List[str] = DynamicMappingQueueIdentifiersTransformer.resolve_queue_names(
+    mapping, known_queue_names, ["@default"]
+)
+timed(
+    "prioritize_queues",
+    lambda: DynamicPriorityQueueIdentifiersTransformer.prioritize_queues(
+        list(resolved), priorities
+    ),
+)